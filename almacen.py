@@ -0,0 +1,483 @@
+"""Almacén columnar en disco para las fuentes CSV del tablero.
+
+Cada CSV se convierte una vez en un archivo Feather (Arrow IPC) con un
+esquema fijo: dimensiones categóricas, notas en ``float32`` y fechas ya
+interpretadas. Las lecturas posteriores usan ese archivo y solo lo
+reconstruyen cuando cambia el CSV de origen (primero se compara mtime y
+tamaño; si difieren, el hash SHA-256 del contenido decide).
+
+Los archivos se guardan sin compresión y se leen con ``memory_map``: las
+columnas numéricas, de fecha y de texto del DataFrame apuntan directamente
+a las páginas del archivo en la caché del sistema operativo, de modo que
+varios procesos de Streamlit comparten la misma memoria física en lugar de
+tener cada uno su copia. Esas columnas son además de solo lectura.
+
+Cada archivo lleva en su esquema Arrow la versión de su contenido (el hash
+de la tabla, o la huella de una derivada), y el DataFrame leído la conserva
+(``version_de``): quien guarda algo calculado a partir de una tabla usa la
+versión de la tabla que de verdad cargó, no la que haya en disco después.
+
+Si ``pyarrow`` no está instalado, la tabla se lee directamente del CSV
+aplicando el mismo esquema.
+
+Una tabla puede además copiarse particionada al estilo Hive
+(``particionar``): un archivo por combinación de valores de las claves, de
+modo que un motor que filtra por esas claves lee solo las particiones que
+pueden tener filas de la selección (``podar``).
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from codificacion import alinear_diccionarios
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = feather = None
+
+
+# Cambiar este número obliga a reconstruir todos los archivos columnares.
+VERSION_ALMACEN = 3
+
+# Clave del metadato del esquema Arrow con la versión del contenido.
+CLAVE_VERSION = b"uev.version"
+
+# En pandas < 3 el texto se convertiría en objetos de Python (una copia por
+# proceso); con el dtype "string" respaldado por Arrow se queda en el mapa.
+# En pandas >= 3 ese ya es el tipo por defecto y pasar ``types_mapper``
+# haría que pyarrow tomara un camino que sí copia.
+_TEXTO_ARROW = int(pd.__version__.split(".")[0]) < 3
+
+DIR_ALMACEN = Path(__file__).resolve().parent / ".almacen"
+
+
+# ================== ESQUEMA ==================
+def aplicar_esquema(df, tipos, fechas=None):
+    """Convierte las columnas del DataFrame a los tipos del esquema.
+
+    ``tipos`` es un diccionario columna -> dtype de pandas y ``fechas`` un
+    diccionario columna -> formato ``strptime``.
+    """
+    df = df.astype(tipos)
+    for columna, formato in (fechas or {}).items():
+        df[columna] = pd.to_datetime(df[columna], format=formato)
+    return df
+
+
+def leer_csv_tipado(ruta_csv, tipos, fechas=None, derivar=None):
+    """Lee el CSV, aplica ``derivar`` sobre los valores crudos y luego el esquema."""
+    df = pd.read_csv(ruta_csv)
+    if derivar is not None:
+        df = derivar(df)
+    return aplicar_esquema(df, tipos, fechas)
+
+
+# ================== HUELLA DEL CSV ==================
+def hash_archivo(ruta, bloque=1 << 20):
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(bloque), b""):
+            sha.update(trozo)
+    return sha.hexdigest()
+
+
+def huella_esquema(tipos, fechas=None, derivar=None):
+    """Resume el esquema para reconstruir el archivo si cambian los tipos."""
+    texto = repr((sorted((c, str(t)) for c, t in tipos.items()),
+                  sorted((fechas or {}).items()),
+                  getattr(derivar, "__qualname__", None)))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+
+def _firma(ruta_csv):
+    estado = os.stat(ruta_csv)
+    return {"mtime_ns": estado.st_mtime_ns, "tamano": estado.st_size}
+
+
+def _leer_meta(ruta_meta):
+    try:
+        return json.loads(ruta_meta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_atomico(ruta, escribir):
+    # Se escribe a un temporal y se reemplaza: otro proceso que esté leyendo
+    # nunca ve un archivo a medio escribir.
+    temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    escribir(temporal)
+    os.replace(temporal, ruta)
+
+
+# ================== LECTURA MAPEADA EN MEMORIA ==================
+def _tipo_texto(tipo):
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+_OPCIONES_PANDAS = {"types_mapper": _tipo_texto} if _TEXTO_ARROW else {}
+
+
+def _sin_copia(columna):
+    tipo = columna.type
+    return (
+        columna.num_chunks == 1
+        and columna.null_count == 0
+        and (
+            pa.types.is_integer(tipo)
+            or pa.types.is_floating(tipo)
+            or pa.types.is_timestamp(tipo)
+        )
+    )
+
+
+def arrow_a_pandas(tabla):
+    """Convierte una tabla Arrow a pandas sin copiar las columnas que lo permiten.
+
+    Las columnas numéricas y de fecha sin nulos se envuelven tal cual (arreglos
+    de NumPy sobre el buffer de Arrow); el texto queda en arreglos de Arrow.
+    Solo los booleanos (empaquetados en bits) y los códigos de las
+    categóricas se materializan.
+    """
+    columnas = {}
+    for nombre in tabla.column_names:
+        columna = tabla.column(nombre)
+        if _sin_copia(columna):
+            columnas[nombre] = columna.chunk(0).to_numpy(zero_copy_only=True)
+        else:
+            columnas[nombre] = columna.to_pandas(**_OPCIONES_PANDAS)
+    df = pd.DataFrame(columnas, copy=False)
+    version = (tabla.schema.metadata or {}).get(CLAVE_VERSION)
+    if version is not None:
+        df.attrs["version"] = version.decode("ascii")
+    return df
+
+
+def version_de(df):
+    """Versión del archivo del almacén del que se leyó ``df`` (``None`` sin almacén)."""
+    return df.attrs.get("version")
+
+
+def tabla_arrow(nombre):
+    """Abre el archivo columnar como tabla Arrow mapeada en memoria."""
+    ruta_columnar, _ = rutas_tabla(nombre)
+    return feather.read_table(ruta_columnar, memory_map=True)
+
+
+# ================== CONVERSIÓN CSV -> COLUMNAR ==================
+def rutas_tabla(nombre):
+    return DIR_ALMACEN / f"{nombre}.feather", DIR_ALMACEN / f"{nombre}.json"
+
+
+def version_tabla(nombre):
+    """Hash del contenido guardado ahora en disco (``None`` si no está en el almacén).
+
+    Puede ser más nuevo que el de una tabla ya cargada: para esa, ``version_de``.
+    """
+    return (_leer_meta(rutas_tabla(nombre)[1]) or {}).get("sha256")
+
+
+def estado_tabla(nombre, ruta_csv, esquema=None):
+    """Indica si el archivo columnar está al día: 'vigente', 'tocado' u 'obsoleto'.
+
+    'tocado' significa que cambió el mtime del CSV pero no su contenido.
+    ``esquema`` es la huella de ``huella_esquema``; si se indica y no
+    coincide con la guardada, el archivo se considera obsoleto.
+    """
+    ruta_columnar, ruta_meta = rutas_tabla(nombre)
+    meta = _leer_meta(ruta_meta)
+    if (
+        meta is None
+        or meta.get("version") != VERSION_ALMACEN
+        or (esquema is not None and meta.get("esquema") != esquema)
+        or not ruta_columnar.exists()
+    ):
+        return "obsoleto", meta
+    firma = _firma(ruta_csv)
+    if all(meta.get(k) == v for k, v in firma.items()):
+        return "vigente", meta
+    if meta.get("sha256") == hash_archivo(ruta_csv):
+        return "tocado", meta
+    return "obsoleto", meta
+
+
+def convertir_csv(nombre, ruta_csv, tipos, fechas=None, derivar=None):
+    """Lee el CSV, aplica el esquema y guarda el archivo columnar."""
+    df = leer_csv_tipado(ruta_csv, tipos, fechas, derivar)
+    meta = {
+        "version": VERSION_ALMACEN,
+        "esquema": huella_esquema(tipos, fechas, derivar),
+        "origen": str(ruta_csv),
+        "sha256": hash_archivo(ruta_csv),
+        "filas": len(df),
+        **_firma(ruta_csv),
+    }
+    _guardar(nombre, df, meta)
+
+
+def _guardar(nombre, df, meta):
+    DIR_ALMACEN.mkdir(parents=True, exist_ok=True)
+    ruta_columnar, ruta_meta = rutas_tabla(nombre)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({
+        **(tabla.schema.metadata or {}), CLAVE_VERSION: meta["sha256"].encode("ascii"),
+    })
+    # Sin compresión y en un único lote: así cada columna es un solo buffer
+    # contiguo que se puede mapear sin copiarlo ni concatenarlo.
+    _escribir_atomico(
+        ruta_columnar,
+        lambda p: feather.write_feather(
+            tabla, p, compression="uncompressed", chunksize=max(len(df), 1)
+        ),
+    )
+    _escribir_atomico(
+        ruta_meta, lambda p: p.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    )
+
+
+def leer_tabla(nombre, ruta_csv, tipos, fechas=None, derivar=None):
+    """Devuelve la tabla tipada, reconstruyendo el archivo columnar si hace falta."""
+    if feather is None:
+        return leer_csv_tipado(ruta_csv, tipos, fechas, derivar)
+
+    estado, meta = estado_tabla(nombre, ruta_csv, huella_esquema(tipos, fechas, derivar))
+    if estado == "obsoleto":
+        convertir_csv(nombre, ruta_csv, tipos, fechas, derivar)
+    elif estado == "tocado":
+        # Mismo contenido con otro mtime: basta con actualizar la firma.
+        meta.update(_firma(ruta_csv))
+        _, ruta_meta = rutas_tabla(nombre)
+        _escribir_atomico(
+            ruta_meta, lambda p: p.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        )
+    return arrow_a_pandas(tabla_arrow(nombre))
+
+
+# ================== TABLAS DERIVADAS ==================
+def leer_derivada(nombre, origenes, construir, version=1):
+    """Devuelve una tabla calculada a partir de otras tablas del almacén.
+
+    ``origenes`` asocia cada tabla de la que depende con la versión que se
+    cargó de ella (``version_de``) y ``construir`` es una función sin
+    argumentos que produce el DataFrame a partir de esas tablas. La guardada
+    se usa solo si se calculó de las mismas versiones (y la misma
+    ``version``). Si los orígenes cargados ya no son los del almacén (llegó
+    un lote después de cargarlos), se calcula en memoria sin pisar la
+    guardada, que corresponde a los datos nuevos.
+    """
+    if feather is None:
+        return construir()
+
+    huella = _huella_derivada(origenes, version)
+    firma = _firma_huella(huella)
+    df = _mapear(nombre)
+    if df is not None and version_de(df) == firma:
+        return df
+    construida = construir()
+    construida.attrs["version"] = firma
+    if any(version_tabla(o) != v for o, v in origenes.items()):
+        return construida
+    _guardar(nombre, construida, {**huella, "filas": len(construida), "sha256": firma})
+    # Otro proceso pudo reemplazarla entretanto: se devuelve la propia.
+    df = _mapear(nombre)
+    return df if df is not None and version_de(df) == firma else construida
+
+
+def _mapear(nombre):
+    try:
+        return arrow_a_pandas(tabla_arrow(nombre))
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def guardar_derivada(nombre, origenes, df, version=1):
+    """Guarda ``df`` como la derivada de las versiones en disco de ``origenes`` (nombres).
+
+    La usa la ingesta incremental, que calcula la derivada nueva a partir
+    de la anterior en lugar de llamar a ``construir``.
+    """
+    huella = _huella_derivada({o: version_tabla(o) for o in origenes}, version)
+    _guardar(nombre, df, {**huella, "filas": len(df), "sha256": _firma_huella(huella)})
+
+
+def _huella_derivada(origenes, version):
+    return {
+        "version": VERSION_ALMACEN,
+        "version_derivada": version,
+        "origenes": dict(origenes),
+    }
+
+
+def _firma_huella(huella):
+    # La huella hace de hash del contenido: así una derivada puede ser a su
+    # vez origen de otra.
+    return hashlib.sha256(json.dumps(huella, sort_keys=True).encode()).hexdigest()
+
+
+# ================== FILAS ANEXADAS ==================
+def anexar(nombre, ruta_csv, ruta_lote, lote):
+    """Anexa un lote de filas nuevas a la fuente ``nombre`` sin releer su CSV.
+
+    ``ruta_lote`` es un CSV con el mismo encabezado que ``ruta_csv`` y
+    ``lote`` sus filas ya tipadas (``leer_csv_tipado``). Sus líneas se
+    agregan al final del CSV de origen, que sigue siendo la fuente
+    completa, y el archivo columnar se reescribe con las filas anteriores
+    (leídas del mapa, sin volver a interpretar texto) más las del lote.
+
+    El contenido nuevo no se vuelve a hashear: su versión encadena la
+    anterior con el hash del lote. Si luego el CSV cambia por fuera, las
+    huellas no coinciden y la tabla se reconvierte completa, como antes.
+
+    Devuelve la tabla completa y el lote, ambos con los diccionarios de las
+    categóricas ya alineados.
+    """
+    ruta_columnar, ruta_meta = rutas_tabla(nombre)
+    meta = _leer_meta(ruta_meta)
+    actual, lote = alinear_diccionarios(arrow_a_pandas(tabla_arrow(nombre)), lote)
+    completa = pd.concat([actual, lote], ignore_index=True)
+
+    # Primero el CSV: si algo falla después, la firma guardada ya no
+    # coincide con él y la próxima lectura reconvierte todo desde el CSV.
+    with open(ruta_lote, "rb") as origen:
+        origen.readline()
+        lineas = origen.read()
+    if lineas and not lineas.endswith(b"\n"):
+        lineas += b"\n"
+    with open(ruta_csv, "ab") as destino:
+        destino.write(lineas)
+
+    version = hashlib.sha256((meta["sha256"] + hash_archivo(ruta_lote)).encode()).hexdigest()
+    _guardar(nombre, completa, {
+        **meta, "sha256": version, "filas": len(completa), **_firma(ruta_csv),
+    })
+    return completa, lote
+
+
+# ================== PARTICIONES HIVE ==================
+# Claves de partición del almacén: los filtros más selectivos de las
+# páginas. Las usan el motor de Polars y la ingesta incremental.
+PARTICIONES = ["semestre", "facultad"]
+
+# Segmento de las filas cuya clave de partición es nula (convención Hive).
+VALOR_NULO = "__HIVE_DEFAULT_PARTITION__"
+
+
+def ruta_particiones(nombre):
+    return DIR_ALMACEN / f"{nombre}.particiones", DIR_ALMACEN / f"{nombre}.particiones.json"
+
+
+def _segmento(clave, valor):
+    return f"{clave}={VALOR_NULO if pd.isna(valor) else quote(str(valor), safe='')}"
+
+
+def _escribir_particiones(destino, df, claves):
+    for valores, parte in df.groupby(claves, observed=True, dropna=False, sort=True):
+        carpeta = destino.joinpath(*(_segmento(c, v) for c, v in zip(claves, valores)))
+        carpeta.mkdir(parents=True)
+        # Cada parte guarda solo las categorías que usa; si no, cada archivo
+        # repetiría el diccionario completo (p. ej. todos los id_estudiante).
+        parte = parte.reset_index(drop=True)
+        parte = parte.assign(**{
+            c: parte[c].cat.remove_unused_categories()
+            for c in parte.columns if isinstance(parte[c].dtype, pd.CategoricalDtype)
+        })
+        feather.write_feather(
+            parte, carpeta / "parte.feather",
+            compression="uncompressed", chunksize=max(len(parte), 1),
+        )
+
+
+def particionar(nombre, claves, df):
+    """Copia la tabla ``nombre``, ya cargada en ``df``, a un directorio Hive por ``claves``.
+
+    Queda en ``<nombre>.particiones/clave1=valor/clave2=valor/parte.feather``
+    (valores codificados como en una URL; ``anexar_particiones`` agrega más
+    archivos por partición) y se reconstruye solo si cambia la versión de
+    ``df`` (``version_de``) o las claves. Devuelve lo mismo que
+    ``listar_particiones``.
+    """
+    directorio, ruta_meta = ruta_particiones(nombre)
+    huella = {"version": VERSION_ALMACEN, "claves": list(claves), "origen": version_de(df)}
+    meta = _leer_meta(ruta_meta)
+    if meta != huella or not directorio.exists():
+        temporal = directorio.with_name(f"{directorio.name}.{os.getpid()}.tmp")
+        shutil.rmtree(temporal, ignore_errors=True)
+        _escribir_particiones(temporal, df, list(claves))
+        # Se intercambian directorios completos: un lector nunca ve una
+        # mezcla de particiones viejas y nuevas.
+        viejo = directorio.with_name(f"{directorio.name}.{os.getpid()}.viejo")
+        if directorio.exists():
+            os.replace(directorio, viejo)
+        os.replace(temporal, directorio)
+        shutil.rmtree(viejo, ignore_errors=True)
+        _escribir_atomico(ruta_meta, lambda p: p.write_text(json.dumps(huella), encoding="utf-8"))
+    return listar_particiones(nombre, claves)
+
+
+def anexar_particiones(nombre, claves, lote, origen_anterior):
+    """Agrega las filas de ``lote`` como un archivo más en cada partición que toca.
+
+    Solo si las particiones estaban al día con ``origen_anterior`` (la
+    versión de la tabla antes de anexar el lote); si no, se dejan como
+    están y ``particionar`` las reconstruye la próxima vez.
+    """
+    directorio, ruta_meta = ruta_particiones(nombre)
+    huella = {"version": VERSION_ALMACEN, "claves": list(claves), "origen": origen_anterior}
+    if _leer_meta(ruta_meta) != huella or not directorio.exists():
+        return
+    temporal = directorio.with_name(f"{directorio.name}.{os.getpid()}.tmp")
+    shutil.rmtree(temporal, ignore_errors=True)
+    _escribir_particiones(temporal, lote, list(claves))
+    for ruta in sorted(temporal.rglob("parte.feather")):
+        carpeta = directorio / ruta.parent.relative_to(temporal)
+        carpeta.mkdir(parents=True, exist_ok=True)
+        # parte.feather, parte-1.feather, parte-2.feather...: el número
+        # conserva el orden de llegada de las filas (ver _orden_parte).
+        os.replace(ruta, carpeta / f"parte-{len(list(carpeta.glob('*.feather')))}.feather")
+    shutil.rmtree(temporal, ignore_errors=True)
+    _escribir_atomico(
+        ruta_meta,
+        lambda p: p.write_text(json.dumps({**huella, "origen": version_tabla(nombre)}), encoding="utf-8"),
+    )
+
+
+def _orden_parte(ruta):
+    _, _, numero = ruta.stem.partition("-")
+    return ruta.parent, int(numero or 0)
+
+
+def listar_particiones(nombre, claves):
+    """Lista de (clave -> valor, ruta) de cada archivo de partición; el valor nulo es ``None``."""
+    directorio, _ = ruta_particiones(nombre)
+    particiones = []
+    archivos = directorio.glob("/".join(["*"] * len(claves) + ["*.feather"]))
+    for ruta in sorted(archivos, key=_orden_parte):
+        segmentos = ruta.relative_to(directorio).parts[:-1]
+        valores = {}
+        for segmento in segmentos:
+            clave, _, texto = segmento.partition("=")
+            valores[clave] = None if texto == VALOR_NULO else unquote(texto)
+        particiones.append((valores, ruta))
+    return particiones
+
+
+def podar(particiones, selecciones):
+    """Rutas de las particiones que pueden tener filas de ``selecciones``.
+
+    Solo se miran las dimensiones que son claves de partición; las demás
+    se filtran al leer. Como en ``facetas.filtrar``, un valor nulo nunca
+    está en la selección.
+    """
+    elegidos = {clave: {str(v) for v in valores} for clave, valores in selecciones.items()}
+    return [
+        ruta for valores, ruta in particiones
+        if all(valores[clave] in elegidos[clave] for clave in valores if clave in elegidos)
+    ]
@@ -0,0 +1,357 @@
+"""Cálculos de las páginas del tablero como funciones puras.
+
+Cada función recibe tablas ya cargadas (y filtradas) y devuelve un agregado
+o un diccionario de indicadores; ninguna importa Streamlit ni lee datos.
+Las páginas solo filtran con ``datos.py``, llaman a estas funciones (con la
+caché de ``resultados.py`` cuando el cálculo depende de los filtros) y
+dibujan el resultado, así que cada cálculo se puede medir, cachear o
+paralelizar por separado.
+
+Las tablas de entrada son de solo lectura (ver ``datos.py``): las columnas
+nuevas se asignan solo sobre agregados recién creados.
+
+Los agregados por programa, curso, docente y segmento que recorren filas se
+calculan en dos pasos: ``estado_*`` resume las filas en un estado parcial
+combinable (``estados.py``) y ``*_de_estado`` arma la tabla de la página a
+partir de él. Así un agregado sobre varias particiones, lotes o procesos
+es la combinación de sus estados, sin volver a recorrer filas.
+"""
+import pandas as pd
+
+import cubo
+import estados
+import periodos
+
+
+# ================== ESTADOS PARCIALES ==================
+CLAVES_CURSO_DOCENTE = [
+    "id_curso",
+    "nombre_curso",
+    "id_docente",
+    "facultad",
+    "programa",
+    "antiguedad_docente_semestres",  # viene del CSV de docentes
+]
+CLAVES_DOCENTE = ["id_docente", "facultad", "antiguedad_docente_semestres"]
+CLAVES_SEGMENTO = ["semestre", "facultad", "programa"]
+
+# Medidas de resultado de cada matrícula: nota y tasas (medias de booleanos).
+MEDIDAS_RESULTADO = ["nota_final", "es_reprob", "es_desercion"]
+
+# Estado de cada agregado por filas: (claves, medidas, columnas de conteo distinto).
+ESTADOS = {
+    "programas": (
+        ["programa"], ["es_desercion_o_reprob", "es_desercion", "es_reprob"], ["id_estudiante"],
+    ),
+    "cursos": (["nombre_curso"], ["es_desercion", "es_reprob"], []),
+    "curso_docente": (CLAVES_CURSO_DOCENTE, MEDIDAS_RESULTADO, ["id_estudiante"]),
+    "docente": (CLAVES_DOCENTE, MEDIDAS_RESULTADO, ["id_curso", "id_estudiante"]),
+    "segmentos_matricula": (CLAVES_SEGMENTO, ["es_desercion"], []),
+    "segmentos_soporte": (
+        CLAVES_SEGMENTO, ["tiempo_respuesta_horas", "satisfaccion_estudiante"], [],
+    ),
+}
+
+
+def columnas_estado(nombre):
+    """Columnas que lee el estado ``nombre``."""
+    claves, medidas, distintos = ESTADOS[nombre]
+    return [*claves, *medidas, *distintos]
+
+
+def calcular_estado(nombre, df):
+    claves, medidas, distintos = ESTADOS[nombre]
+    return estados.parcial(df, claves, medidas, distintos)
+
+
+def _entero(serie):
+    # Las sumas de un estado son float64; los conteos de booleanos vuelven a ser enteros.
+    return serie.astype("int64")
+
+
+# ================== DESCRIPCIÓN GENERAL ==================
+def totales_generales(mat, doc, sup):
+    """Conteos y tasas globales de la operación virtual."""
+    return {
+        "estudiantes": mat["id_estudiante"].nunique(),
+        "matriculas": len(mat),
+        "programas": mat["programa"].nunique(),
+        "cursos": doc["id_curso"].nunique(),
+        "docentes": doc["id_docente"].nunique(),
+        "casos_soporte": sup["id_caso"].nunique(),
+        "tasa_desercion": mat["es_desercion"].mean() * 100,
+        "tasa_reprob": mat["es_reprob"].mean() * 100,
+        "nota_promedio": mat["nota_final"].mean(),
+    }
+
+
+def estado_programas(mat):
+    return calcular_estado("programas", mat)
+
+
+def programas_en_riesgo(mat, n=3):
+    """Los ``n`` programas con mayor tasa combinada de deserción y reprobación."""
+    return programas_en_riesgo_de_estado(estado_programas(mat), n)
+
+
+def programas_en_riesgo_de_estado(estado, n=3):
+    prog_agg = pd.DataFrame({
+        "estudiantes": estados.distintos(estado, "id_estudiante"),
+        "desertores": _entero(estados.suma(estado, "es_desercion_o_reprob")),
+        "cancelados": _entero(estados.suma(estado, "es_desercion")),
+        "reprobados": _entero(estados.suma(estado, "es_reprob")),
+    })
+    prog_agg["tasa_desercion_reprob"] = (
+        prog_agg["desertores"] / prog_agg["estudiantes"] * 100
+    )
+    return (
+        prog_agg.sort_values("tasa_desercion_reprob", ascending=False)
+        .head(n)
+        .reset_index()
+    )
+
+
+# ================== MATRÍCULAS Y DESEMPEÑO ==================
+def resumen_matriculas(cubo_f):
+    """KPIs del segmento a partir de las celdas filtradas del cubo."""
+    return cubo.kpis(cubo_f)
+
+
+def estados_por_programa(cubo_f):
+    """Matrículas (``n``) por programa y estado académico."""
+    return (
+        cubo.enrollar(cubo_f, ["programa", "estado_academico"])["matriculas"]
+        .reset_index(name="n")
+    )
+
+
+def indicadores_programa(cubo_f):
+    """Deserciones, reprobaciones y sus tasas (%) por programa."""
+    prog_ind = cubo.enrollar(cubo_f, "programa")[["matriculas", "deserciones", "reprobaciones"]]
+    prog_ind["tasa_desercion_%"] = prog_ind["deserciones"] / prog_ind["matriculas"] * 100
+    prog_ind["tasa_reprob_%"] = prog_ind["reprobaciones"] / prog_ind["matriculas"] * 100
+    return prog_ind.sort_values("tasa_desercion_%", ascending=False)
+
+
+def estado_cursos(hechos_f):
+    return calcular_estado("cursos", hechos_f)
+
+
+def indicadores_curso(hechos_f):
+    """Lo mismo por asignatura; necesita las filas de la tabla de hechos."""
+    return indicadores_curso_de_estado(estado_cursos(hechos_f))
+
+
+def indicadores_curso_de_estado(estado):
+    curso_ind = pd.DataFrame({
+        "matriculas": estados.filas(estado),
+        "deserciones": _entero(estados.suma(estado, "es_desercion")),
+        "reprobaciones": _entero(estados.suma(estado, "es_reprob")),
+    }).reset_index()
+    curso_ind["tasa_desercion_%"] = curso_ind["deserciones"] / curso_ind["matriculas"] * 100
+    curso_ind["tasa_reprob_%"] = curso_ind["reprobaciones"] / curso_ind["matriculas"] * 100
+    return curso_ind
+
+
+def cursos_en_riesgo(curso_ind, n=10):
+    return curso_ind.sort_values("tasa_desercion_%", ascending=False).head(n)
+
+
+def segmentos_riesgo(cubo_f):
+    """Tasa de deserción + reprobación por modalidad y subperiodo."""
+    seg = (
+        cubo.enrollar(cubo_f, ["modalidad", "subperiodo"])[["matriculas", "desercion_o_reprob"]]
+        .rename(columns={"desercion_o_reprob": "deserciones"})
+        .reset_index()
+    )
+    seg["tasa_desercion_reprob_%"] = seg["deserciones"] / seg["matriculas"] * 100
+    return seg
+
+
+# ================== DOCENTES Y CURSOS ==================
+def estado_curso_docente(hechos_f):
+    return calcular_estado("curso_docente", hechos_f)
+
+
+def estado_docente(hechos_f):
+    return calcular_estado("docente", hechos_f)
+
+
+def _resultados(estado):
+    """Nota promedio y tasas (%) de reprobación y deserción por grupo."""
+    return {
+        "nota_promedio": estados.media(estado, "nota_final"),
+        "tasa_reprobacion": estados.media(estado, "es_reprob") * 100,
+        "tasa_desercion": estados.media(estado, "es_desercion") * 100,
+    }
+
+
+def agregar_curso_docente(hechos_f):
+    """Por curso-docente: tamaño de grupo, nota promedio y tasas (%)."""
+    return curso_docente_de_estado(estado_curso_docente(hechos_f))
+
+
+def curso_docente_de_estado(estado):
+    return pd.DataFrame({
+        "estudiantes": estados.distintos(estado, "id_estudiante"),
+        **_resultados(estado),
+    }).reset_index()
+
+
+def agregar_docente(hechos_f):
+    """Por docente: consolidado de cursos, estudiantes y resultados."""
+    return docente_de_estado(estado_docente(hechos_f))
+
+
+def docente_de_estado(estado):
+    return pd.DataFrame({
+        "cursos": estados.distintos(estado, "id_curso"),
+        "estudiantes": estados.distintos(estado, "id_estudiante"),
+        **_resultados(estado),
+    }).reset_index()
+
+
+def resumen_cursos(curso_doc):
+    """Promedios por curso de la tabla de ``agregar_curso_docente``."""
+    if curso_doc.empty:
+        return {
+            "cursos": 0, "docentes": 0, "tam_grupo": 0,
+            "nota_promedio": 0, "tasa_reprob": 0, "tasa_desercion": 0,
+        }
+    return {
+        "cursos": len(curso_doc),
+        "docentes": curso_doc["id_docente"].nunique(),
+        "tam_grupo": curso_doc["estudiantes"].mean(),
+        "nota_promedio": curso_doc["nota_promedio"].mean(),
+        "tasa_reprob": curso_doc["tasa_reprobacion"].mean(),
+        "tasa_desercion": curso_doc["tasa_desercion"].mean(),
+    }
+
+
+def docentes_en_riesgo(doc_agg, n=10):
+    return (
+        doc_agg.sort_values("tasa_reprobacion", ascending=False)
+        .head(n)
+        .reset_index(drop=True)
+    )
+
+
+# ================== SOPORTE Y ATENCIONES ==================
+def resumen_soporte(sup_f, mat_f):
+    """Casos, tiempo de respuesta y satisfacción promedio, y deserción de las matrículas."""
+    total_casos = len(sup_f)
+    return {
+        "casos": total_casos,
+        "tiempo_respuesta": sup_f["tiempo_respuesta_horas"].mean() if total_casos > 0 else 0,
+        "satisfaccion": sup_f["satisfaccion_estudiante"].mean() if total_casos > 0 else 0,
+        "tasa_desercion": mat_f["es_desercion"].mean() * 100 if not mat_f.empty else 0,
+    }
+
+
+def casos_por_motivo(sup_f):
+    return (
+        sup_f.groupby("motivo", observed=True)
+        .size()
+        .reset_index(name="casos")
+        .sort_values("casos", ascending=False)
+    )
+
+
+def tiempo_por_tipo_atencion(sup_f):
+    return (
+        sup_f.groupby("tipo_atencion", as_index=False, observed=True)["tiempo_respuesta_horas"]
+        .mean()
+    )
+
+
+def satisfaccion_por_region(sup_f):
+    return (
+        sup_f.groupby("region", as_index=False, observed=True)["satisfaccion_estudiante"]
+        .mean()
+    )
+
+
+def estado_segmentos_matricula(mat_f):
+    return calcular_estado("segmentos_matricula", mat_f)
+
+
+def estado_segmentos_soporte(sup_f):
+    return calcular_estado("segmentos_soporte", sup_f)
+
+
+def cruzar_segmentos(mat_f, sup_f):
+    """Une deserción (mat_seg) y soporte (sup_seg) por semestre-facultad-programa."""
+    return segmentos_de_estado(estado_segmentos_matricula(mat_f), estado_segmentos_soporte(sup_f))
+
+
+def segmentos_de_estado(estado_mat, estado_sup):
+    mat_seg = pd.DataFrame({
+        "matriculas": estados.filas(estado_mat),
+        "desertores": _entero(estados.suma(estado_mat, "es_desercion")),
+    })
+    mat_seg["tasa_desercion_%"] = mat_seg["desertores"] / mat_seg["matriculas"] * 100
+
+    sup_seg = pd.DataFrame({
+        "casos_soporte": estados.filas(estado_sup),
+        "tiempo_resp_prom": estados.media(estado_sup, "tiempo_respuesta_horas"),
+        "satis_prom": estados.media(estado_sup, "satisfaccion_estudiante"),
+    })
+
+    return mat_seg.reset_index().merge(
+        sup_seg.reset_index(),
+        on=CLAVES_SEGMENTO,
+        how="inner",
+    )
+
+
+# ================== COMPARACIÓN ENTRE PERIODOS ==================
+# Indicador -> (etiqueta, True si un valor menor es mejor).
+INDICADORES_PERIODO = {
+    "tasa_desercion": ("Deserción (%)", True),
+    "tasa_reprob": ("Reprobación (%)", True),
+    "nota_promedio": ("Nota final promedio", False),
+    "tiempo_respuesta": ("Tiempo de respuesta (h)", True),
+}
+
+
+def indicadores_por_periodo(cubo_f, cubo_sop_f):
+    """Indicadores de cada semestre, enrollando los cubos de matrículas y soporte.
+
+    Un periodo sin matrículas o sin casos de soporte queda con ``NaN`` en
+    los indicadores que no tiene.
+    """
+    mat = cubo.enrollar(cubo_f, "semestre")
+    sop = cubo.enrollar(cubo_sop_f, "semestre", cubo.MEDIDAS_SOPORTE)
+    ind = pd.concat(
+        [
+            pd.DataFrame({
+                "matriculas": mat["matriculas"],
+                "tasa_desercion": mat["deserciones"] / mat["matriculas"] * 100,
+                "tasa_reprob": mat["reprobaciones"] / mat["matriculas"] * 100,
+                "nota_promedio": mat["suma_nota"] / mat["notas"],
+            }),
+            pd.DataFrame({
+                "casos_soporte": sop["casos"],
+                "tiempo_respuesta": sop["suma_tiempo"] / sop["tiempos"],
+                "satisfaccion": sop["suma_satisfaccion"] / sop["satisfacciones"],
+            }),
+        ],
+        axis=1,
+    )
+    ind.index = ind.index.astype(str)
+    return ind.reindex(periodos.ordenar(ind.index)).rename_axis("semestre")
+
+
+def comparar_periodos(ind, base, comparado):
+    """Valor de cada indicador comparable en dos periodos y su diferencia.
+
+    ``ind`` es la tabla de ``indicadores_por_periodo``; la diferencia es
+    ``comparado - base`` (en puntos porcentuales para las tasas).
+    """
+    valores = ind.reindex([base, comparado])[list(INDICADORES_PERIODO)]
+    comp = pd.DataFrame({
+        "base": valores.iloc[0].to_numpy(),
+        "comparado": valores.iloc[1].to_numpy(),
+    }, index=pd.Index(list(INDICADORES_PERIODO), name="indicador"))
+    comp["diferencia"] = comp["comparado"] - comp["base"]
+    return comp
@@ -0,0 +1,209 @@
+"""API HTTP local con los agregados del tablero, en JSON o Arrow IPC.
+
+Expone los mismos cálculos de las páginas (``consultas.py``) sin abrir una
+sesión de Streamlit: las tablas se cargan una vez por proceso desde el
+almacén columnar y los resultados pasan por la caché de ``resultados.py``.
+Además, cada respuesta ya serializada se guarda por ruta, formato, versión
+de los datos y filtros, así que una consulta repetida solo copia bytes.
+
+Rutas (``GET``; ``/`` lista cada una con sus filtros)::
+
+    /kpis/general  /kpis/periodos  /kpis/matriculas  /kpis/docentes  /kpis/soporte
+    /top_prog_riesgo  /estados_prog  /prog_ind  /curso_ind  /segmentos_matricula
+    /curso_doc  /doc_agg
+    /soporte/motivos  /soporte/tipo_atencion  /soporte/satisfaccion_region
+    /soporte/segmentos
+
+Los filtros van como parámetros repetibles con el nombre de la dimensión
+(``?facultad=Ingeniería&semestre=2024-1&semestre=2024-2``); una dimensión
+ausente no restringe. ``formato=arrow`` (o ``Accept:
+application/vnd.apache.arrow.stream``) devuelve un stream Arrow IPC en lugar
+de JSON; requiere ``pyarrow``.
+
+Uso:
+    python api.py --puerto 8765
+    python api.py --puerto 8765 --metricas-puerto 9465   # además, /metrics
+"""
+import argparse
+import json
+import math
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import consultas
+import datos
+import metricas
+from resultados import CacheLRU, MAXIMO_RESULTADOS, normalizar_selecciones
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+
+TIPO_JSON = "application/json; charset=utf-8"
+TIPO_ARROW = "application/vnd.apache.arrow.stream"
+
+DIM_HECHOS = datos.FACETAS["hechos_matricula"]
+DIM_MATRICULAS = datos.FACETAS["matriculas"]
+DIM_SOPORTE = datos.FACETAS["soporte"]
+
+# Ruta -> (función de consultas.py, dimensiones que acepta como filtro).
+RUTAS = {
+    "/kpis/general": (consultas.totales_generales, []),
+    "/kpis/periodos": (consultas.indicadores_periodo, ["facultad", "programa"]),
+    "/kpis/matriculas": (consultas.resumen_matriculas, DIM_HECHOS),
+    "/kpis/docentes": (consultas.resumen_docentes, DIM_HECHOS),
+    "/kpis/soporte": (consultas.resumen_soporte, DIM_SOPORTE),
+    "/top_prog_riesgo": (consultas.programas_en_riesgo, DIM_MATRICULAS),
+    "/estados_prog": (consultas.estados_por_programa, DIM_HECHOS),
+    "/prog_ind": (consultas.indicadores_programa, DIM_HECHOS),
+    "/curso_ind": (consultas.indicadores_curso, DIM_HECHOS),
+    "/segmentos_matricula": (consultas.segmentos_riesgo, DIM_HECHOS),
+    "/curso_doc": (consultas.agregar_curso_docente, DIM_HECHOS),
+    "/doc_agg": (consultas.agregar_docente, DIM_HECHOS),
+    "/soporte/motivos": (consultas.agregar_motivos, DIM_SOPORTE),
+    "/soporte/tipo_atencion": (consultas.agregar_tipo_atencion, DIM_SOPORTE),
+    "/soporte/satisfaccion_region": (consultas.agregar_satisfaccion_region, DIM_SOPORTE),
+    "/soporte/segmentos": (consultas.cruzar_segmentos, DIM_SOPORTE),
+}
+
+RESPUESTAS = CacheLRU(MAXIMO_RESULTADOS)
+
+
+class ErrorConsulta(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# ================== SERIALIZACIÓN ==================
+def _como_tabla(resultado):
+    """DataFrame plano: los KPIs (diccionario) quedan como una sola fila."""
+    if isinstance(resultado, dict):
+        return pd.DataFrame([resultado])
+    if not isinstance(resultado.index, pd.RangeIndex):
+        return resultado.reset_index()
+    return resultado.reset_index(drop=True)
+
+
+def _valor_json(valor):
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    return valor
+
+
+def a_json(resultado):
+    if isinstance(resultado, dict):
+        cuerpo = {clave: _valor_json(valor) for clave, valor in resultado.items()}
+        return json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+    return _como_tabla(resultado).to_json(orient="records", force_ascii=False).encode("utf-8")
+
+
+def a_arrow(resultado):
+    tabla = pa.Table.from_pandas(_como_tabla(resultado), preserve_index=False)
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_stream(destino, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    return destino.getvalue().to_pybytes()
+
+
+# ================== CONSULTA ==================
+def leer_consulta(url, aceptar=""):
+    """(ruta, formato, selecciones) de una URL; valida filtros y formato."""
+    partes = urlsplit(url)
+    ruta = partes.path.rstrip("/") or "/"
+    if ruta != "/" and ruta not in RUTAS:
+        raise ErrorConsulta(404, f"Ruta desconocida: {ruta}")
+    parametros = parse_qs(partes.query, keep_blank_values=True)
+
+    formato = parametros.pop("formato", [None])[-1]
+    if formato is None:
+        formato = "arrow" if TIPO_ARROW in aceptar else "json"
+    if formato not in ("json", "arrow"):
+        raise ErrorConsulta(400, f"Formato desconocido: {formato}")
+    if formato == "arrow" and pa is None:
+        raise ErrorConsulta(406, "El formato arrow requiere pyarrow")
+
+    dimensiones = RUTAS[ruta][1] if ruta in RUTAS else []
+    desconocidas = sorted(set(parametros) - set(dimensiones))
+    if desconocidas:
+        raise ErrorConsulta(
+            400, f"Filtros no admitidos en {ruta}: {', '.join(desconocidas)} "
+                 f"(admite: {', '.join(dimensiones) or 'ninguno'})"
+        )
+    return ruta, formato, parametros
+
+
+def responder(ruta, formato, selecciones):
+    """Cuerpo serializado de la consulta, desde la caché de respuestas si ya existe."""
+    if ruta == "/":
+        indice = {r: {"filtros": dims} for r, (_, dims) in RUTAS.items()}
+        return json.dumps(indice, ensure_ascii=False).encode("utf-8")
+    funcion = RUTAS[ruta][0]
+    serializar = a_arrow if formato == "arrow" else a_json
+    clave = (ruta, formato, datos.version_datos(), normalizar_selecciones(selecciones))
+    return RESPUESTAS.obtener(clave, lambda: serializar(funcion(selecciones)))
+
+
+# ================== SERVIDOR ==================
+class Manejador(BaseHTTPRequestHandler):
+    # Conexiones persistentes; encabezados y cuerpo salen en un solo envío
+    # (sin esperar el ACK retardado de la respuesta anterior).
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def do_GET(self):
+        try:
+            ruta, formato, selecciones = leer_consulta(self.path, self.headers.get("Accept", ""))
+            cuerpo = responder(ruta, formato, selecciones)
+        except ErrorConsulta as error:
+            self._enviar(error.estado, TIPO_JSON, json.dumps({"error": str(error)}).encode("utf-8"))
+            return
+        self._enviar(200, TIPO_ARROW if formato == "arrow" else TIPO_JSON, cuerpo)
+
+    def _enviar(self, estado, tipo, cuerpo):
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def servir(host="127.0.0.1", puerto=8765, puerto_metricas=None):
+    if puerto_metricas:
+        metricas.iniciar_servidor(puerto_metricas)
+    datos.precargar()
+    datos.version_datos()  # carga las tablas antes de aceptar conexiones
+    servidor = ThreadingHTTPServer((host, puerto), Manejador)
+    servidor.daemon_threads = True
+    print(f"API del tablero en http://{host}:{puerto}/", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--metricas-puerto", type=int, default=None,
+                        help="sirve /metrics de este proceso en ese puerto")
+    args = parser.parse_args()
+    servir(args.host, args.puerto, args.metricas_puerto)
+
+
+if __name__ == "__main__":
+    main()
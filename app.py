@@ -1,5 +1,15 @@
 import streamlit as st
 
+import metricas
+from datos import precargar, texto_periodos
+
+# Todas las tablas empiezan a cargarse en hilos (ver datos.py); cada página
+# espera solo las suyas.
+precargar()
+
+# /metrics en UEV_METRICAS_PUERTO, si está configurado (una vez por proceso).
+metricas.iniciar_servidor()
+
 
 # ================== CONFIGURACIÓN GENERAL ==================
 st.set_page_config(
@@ -71,7 +81,7 @@ header_html = (
                 'Proyecto analítico · Unidad de Educación Virtual – ITM'
             '</div>'
             '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                f'Periodo de análisis: <b>{texto_periodos()}</b>'
             '</div>'
         '</div>'
     '</div>'
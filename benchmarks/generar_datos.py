@@ -0,0 +1,262 @@
+"""Genera un juego sintético de matrículas, docentes y soporte a escala.
+
+Las distribuciones se ajustan a los CSV del repositorio, conservando sus
+relaciones conjuntas:
+
+- docentes: cada curso copia una fila real (nombre, semestre, facultad,
+  programa, antigüedad, créditos) con nuevos ``id_curso``/``id_docente``;
+- matrículas: cada matrícula elige un curso (tamaños de grupo variables) y
+  hereda su semestre, facultad y programa; el estado sigue la distribución
+  por programa y la nota la distribución observada para ese estado;
+- soporte: semestre-facultad-programa conjuntos, tiempo de respuesta según
+  el tipo de atención (con la asimetría de la muestra) y satisfacción
+  según la región.
+
+Con la misma semilla y los mismos argumentos la salida es idéntica. Los CSV
+se escriben por bloques (sirve para 10^8 filas) con los nombres que espera
+``datos.py``, y luego se convierten al almacén columnar de la carpeta de
+destino. Para abrir el tablero sobre ellos:
+
+    UEV_DIR_DATOS=/tmp/uev_1m streamlit run app.py
+
+Uso:
+    python benchmarks/generar_datos.py --matriculas 1000000 --destino /tmp/uev_1m
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import almacen  # noqa: E402
+import datos  # noqa: E402
+
+
+# Proporciones de la muestra: matrículas por curso, cursos por docente,
+# matrículas por estudiante y casos de soporte por matrícula.
+MATRICULAS_POR_CURSO = 10
+CURSOS_POR_DOCENTE = 1.37
+MATRICULAS_POR_ESTUDIANTE = 2.69
+CASOS_POR_MATRICULA = 0.8
+
+FORMATO_FECHA = "%d/%m/%Y"
+
+
+# ================== MODELO AJUSTADO A LA MUESTRA ==================
+def _dias(fechas, semestres):
+    """Días posibles de cada semestre (entre la primera y la última fecha vista)."""
+    fechas = pd.to_datetime(fechas, format=FORMATO_FECHA)
+    rangos = fechas.groupby(semestres).agg(["min", "max"])
+    return {
+        semestre: pd.date_range(fila["min"], fila["max"]).strftime(FORMATO_FECHA).to_numpy()
+        for semestre, fila in rangos.iterrows()
+    }
+
+
+def _empirica(serie):
+    valores = serie.value_counts(normalize=True)
+    return valores.index.to_numpy(), valores.to_numpy()
+
+
+def _condicional(df, condicion, columna):
+    return {clave: _empirica(grupo[columna]) for clave, grupo in df.groupby(condicion)}
+
+
+def ajustar_modelo():
+    mat = pd.read_csv(datos.BASE_DIR / "matriculaslimpias.csv")
+    doc = pd.read_csv(datos.BASE_DIR / "docenteslimpios.csv")
+    sup = pd.read_csv(datos.BASE_DIR / "soporte_atenciones_focus.csv")
+
+    tiempos = {}
+    for tipo, grupo in sup.groupby("tipo_atencion"):
+        valores = grupo["tiempo_respuesta_horas"].to_numpy()
+        # Ancho de banda de Silverman para suavizar el remuestreo.
+        tiempos[tipo] = (valores, 1.06 * valores.std() * len(valores) ** -0.2)
+
+    return {
+        "cursos": doc.drop(columns=["id_curso", "id_docente"]),
+        "modalidad": _empirica(mat["modalidad"]),
+        "subperiodo": _empirica(mat["subperiodo"]),
+        "estado_por_programa": _condicional(mat, "programa", "estado_academico"),
+        "notas_por_estado": {e: g["nota_final"].to_numpy() for e, g in mat.groupby("estado_academico")},
+        "dias_matricula": _dias(mat["fecha_matricula"], mat["semestre"]),
+        "segmentos_soporte": sup[["semestre", "facultad", "programa"]].value_counts(normalize=True),
+        "motivo": _empirica(sup["motivo"]),
+        "tipo_atencion": _empirica(sup["tipo_atencion"]),
+        "tiempos_por_tipo": tiempos,
+        "satisfaccion_por_region": _condicional(sup, "region", "satisfaccion_estudiante"),
+        "region": _empirica(sup["region"]),
+        "dias_soporte": _dias(sup["fecha_solicitud"], sup["semestre"]),
+    }
+
+
+# ================== MUESTREO ==================
+def _elegir(rng, distribucion, n):
+    valores, probabilidades = distribucion
+    return valores[rng.choice(len(valores), size=n, p=probabilidades)]
+
+
+def _por_grupo(rng, claves, funcion):
+    """Aplica ``funcion(rng, clave, n)`` a cada grupo de filas con la misma clave."""
+    salida = None
+    codigos, unicos = pd.factorize(claves)
+    for i, clave in enumerate(unicos):
+        filas = np.flatnonzero(codigos == i)
+        valores = funcion(rng, clave, len(filas))
+        if salida is None:
+            salida = np.empty(len(claves), dtype=np.asarray(valores).dtype)
+        salida[filas] = valores
+    return salida
+
+
+def _ids(prefijo, numeros, total):
+    ancho = max(4, len(str(total)))
+    return np.char.add(prefijo, np.char.zfill(numeros.astype(str), ancho))
+
+
+def generar_docentes(modelo, n_cursos, rng):
+    cursos = modelo["cursos"]
+    filas = cursos.iloc[rng.integers(0, len(cursos), size=n_cursos)].reset_index(drop=True)
+    n_docentes = max(1, round(n_cursos / CURSOS_POR_DOCENTE))
+    filas.insert(0, "id_curso", _ids("CUR", np.arange(1, n_cursos + 1), n_cursos))
+    filas.insert(2, "id_docente", _ids("DOC", rng.integers(1, n_docentes + 1, size=n_cursos), n_docentes))
+    return filas
+
+
+def generar_matriculas(modelo, doc, pesos, n, n_estudiantes, rng):
+    curso = rng.choice(len(doc), size=n, p=pesos)
+    programa = doc["programa"].to_numpy()[curso]
+    semestre = doc["semestre"].to_numpy()[curso]
+    estado = _por_grupo(rng, programa, lambda r, p, k: _elegir(r, modelo["estado_por_programa"][p], k))
+
+    def notas(r, e, k):
+        observadas = modelo["notas_por_estado"][e]
+        valores = r.choice(observadas, size=k)
+        # Cancelado y en curso tienen una nota imputada fija: se conserva.
+        if len(np.unique(observadas)) == 1:
+            return valores
+        return np.clip(valores + r.normal(0, 0.1, size=k), 0, 5).round(2)
+
+    return pd.DataFrame({
+        "id_estudiante": _ids("EST", rng.integers(1, n_estudiantes + 1, size=n), n_estudiantes),
+        "id_curso": doc["id_curso"].to_numpy()[curso],
+        "semestre": semestre,
+        "facultad": doc["facultad"].to_numpy()[curso],
+        "programa": programa,
+        "modalidad": _elegir(rng, modelo["modalidad"], n),
+        "subperiodo": _elegir(rng, modelo["subperiodo"], n),
+        "estado_academico": estado,
+        "nota_final": _por_grupo(rng, estado, notas),
+        "fecha_matricula": _por_grupo(
+            rng, semestre, lambda r, s, k: r.choice(modelo["dias_matricula"][s], size=k)
+        ),
+    })
+
+
+def generar_soporte(modelo, inicio, n, total, rng):
+    segmentos = modelo["segmentos_soporte"]
+    elegidos = segmentos.index.to_frame(index=False).iloc[
+        rng.choice(len(segmentos), size=n, p=segmentos.to_numpy())
+    ]
+    tipo = _elegir(rng, modelo["tipo_atencion"], n)
+    region = _elegir(rng, modelo["region"], n)
+    semestre = elegidos["semestre"].to_numpy()
+
+    def tiempos(r, t, k):
+        observados, ancho = modelo["tiempos_por_tipo"][t]
+        valores = r.choice(observados, size=k) + r.normal(0, ancho, size=k)
+        return np.clip(valores, observados.min(), None).round(1)
+
+    return pd.DataFrame({
+        "id_caso": _ids("CASO", np.arange(inicio + 1, inicio + n + 1), total),
+        "fecha_solicitud": _por_grupo(
+            rng, semestre, lambda r, s, k: r.choice(modelo["dias_soporte"][s], size=k)
+        ),
+        "semestre": semestre,
+        "facultad": elegidos["facultad"].to_numpy(),
+        "programa": elegidos["programa"].to_numpy(),
+        "motivo": _elegir(rng, modelo["motivo"], n),
+        "tipo_atencion": tipo,
+        "tiempo_respuesta_horas": _por_grupo(rng, tipo, tiempos),
+        "satisfaccion_estudiante": _por_grupo(
+            rng, region, lambda r, g, k: _elegir(r, modelo["satisfaccion_por_region"][g], k)
+        ),
+        "region": region,
+    })
+
+
+# ================== ESCRITURA ==================
+def _escribir_por_bloques(ruta, total, bloque, generar_bloque):
+    for inicio in range(0, total, bloque):
+        df = generar_bloque(inicio, min(bloque, total - inicio))
+        df.to_csv(ruta, mode="w" if inicio == 0 else "a", header=inicio == 0, index=False)
+
+
+def generar(destino, n_matriculas, n_soporte=None, semilla=20241, bloque=1_000_000, columnar=True):
+    """Escribe los tres CSV en ``destino`` y, si se pide, su almacén columnar."""
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    if n_soporte is None:
+        n_soporte = round(n_matriculas * CASOS_POR_MATRICULA)
+
+    modelo = ajustar_modelo()
+    # Una semilla independiente por tabla y por bloque.
+    raiz = np.random.SeedSequence(semilla)
+    semilla_doc, semilla_mat, semilla_sup = raiz.spawn(3)
+
+    rng = np.random.default_rng(semilla_doc)
+    n_cursos = max(1, round(n_matriculas / MATRICULAS_POR_CURSO))
+    doc = generar_docentes(modelo, n_cursos, rng)
+    doc.to_csv(destino / datos.RUTA_DOCENTES.name, index=False)
+    # Tamaños de grupo dispersos como en la muestra (desviación ~30 %).
+    pesos = rng.gamma(10, size=n_cursos)
+    pesos /= pesos.sum()
+
+    n_estudiantes = max(1, round(n_matriculas / MATRICULAS_POR_ESTUDIANTE))
+    semillas = iter(semilla_mat.spawn(-(-n_matriculas // bloque)))
+    _escribir_por_bloques(
+        destino / datos.RUTA_MATRICULAS.name, n_matriculas, bloque,
+        lambda inicio, n: generar_matriculas(
+            modelo, doc, pesos, n, n_estudiantes, np.random.default_rng(next(semillas))
+        ),
+    )
+
+    semillas_sup = iter(semilla_sup.spawn(-(-n_soporte // bloque)))
+    _escribir_por_bloques(
+        destino / datos.RUTA_SOPORTE.name, n_soporte, bloque,
+        lambda inicio, n: generar_soporte(
+            modelo, inicio, n, n_soporte, np.random.default_rng(next(semillas_sup))
+        ),
+    )
+
+    if columnar:
+        almacen.DIR_ALMACEN = destino / ".almacen"
+        for nombre, fuente in datos.FUENTES.items():
+            datos.leer_fuente(nombre, destino / Path(fuente["ruta"]).name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matriculas", type=int, default=100_000)
+    parser.add_argument("--soporte", type=int, default=None,
+                        help=f"Casos de soporte (por defecto {CASOS_POR_MATRICULA} por matrícula)")
+    parser.add_argument("--destino", required=True)
+    parser.add_argument("--semilla", type=int, default=20241)
+    parser.add_argument("--bloque", type=int, default=1_000_000,
+                        help="Filas generadas y escritas por bloque")
+    parser.add_argument("--solo-csv", action="store_true",
+                        help="No convertir al almacén columnar")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    generar(args.destino, args.matriculas, args.soporte, args.semilla, args.bloque,
+            columnar=not args.solo_csv)
+    print(f"Juego generado en {args.destino} ({time.perf_counter() - inicio:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Mide lo que cuesta cada rerun al leer matrículas desde la caché.
+
+Compara el esquema anterior (``st.cache_data``: cada rerun recibe una copia
+deserializada con pickle y vuelve a construir los indicadores booleanos) con
+el actual (``st.cache_resource``: todas las sesiones reciben la misma tabla,
+con los indicadores ya materializados).
+
+Uso:
+    python benchmarks/medir_cache_datos.py --reruns 200 --escala 100
+"""
+import argparse
+import pickle
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from datos import RUTA_MATRICULAS, agregar_indicadores  # noqa: E402
+
+
+def rerun_cache_data(serializado):
+    # Lo que hacía cada página: copia desde la caché + columnas derivadas.
+    mat = pickle.loads(serializado)
+    mat["es_desercion"] = mat["estado_academico"] == "Cancelado"
+    mat["es_reprob"] = mat["estado_academico"] == "Reprobado"
+    mat["es_desercion_o_reprob"] = mat["es_desercion"] | mat["es_reprob"]
+    return mat
+
+
+def rerun_cache_resource(compartida):
+    # Lo que hace ahora cada página: usar la referencia compartida.
+    return compartida
+
+
+def medir(funcion, argumento, reruns):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    for _ in range(reruns):
+        resultado = funcion(argumento)
+        del resultado
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracion / reruns * 1000, pico / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=100)
+    parser.add_argument("--escala", type=int, default=1,
+                        help="Veces que se replica matriculaslimpias.csv")
+    args = parser.parse_args()
+
+    base = pd.read_csv(RUTA_MATRICULAS)
+    if args.escala > 1:
+        base = pd.concat([base] * args.escala, ignore_index=True)
+
+    serializado = pickle.dumps(base)
+    compartida = agregar_indicadores(base.copy())
+    tamano_mb = compartida.memory_usage(deep=True).sum() / 1024 ** 2
+
+    ms_antes, pico_antes = medir(rerun_cache_data, serializado, args.reruns)
+    ms_despues, pico_despues = medir(rerun_cache_resource, compartida, args.reruns)
+
+    print(f"Filas de matrículas:          {len(compartida):,}")
+    print(f"Tamaño de la tabla:           {tamano_mb:.2f} MB")
+    print(f"cache_data     por rerun:     {ms_antes:.3f} ms · pico {pico_antes:.2f} MB")
+    print(f"cache_resource por rerun:     {ms_despues:.3f} ms · pico {pico_despues:.2f} MB")
+    print(f"Ahorro por rerun y sesión:    {ms_antes - ms_despues:.3f} ms · "
+          f"{pico_antes - pico_despues:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
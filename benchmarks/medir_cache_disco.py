@@ -0,0 +1,80 @@
+"""Arranque de cada página con y sin la caché de resultados en disco.
+
+Simula el primer usuario después de un reinicio o despliegue: cada página
+corre con ``AppTest`` en un proceso nuevo (tablas leídas del almacén,
+caché en memoria vacía) en tres situaciones:
+
+- sin disco: ``UEV_CACHE_DISCO_MB=0``, todo se calcula;
+- disco vacío: la caché en disco recién borrada (calcula y escribe);
+- disco caliente: otro proceso nuevo, con lo que escribió el anterior.
+
+Se reporta la duración de la primera ejecución de cada página, cuántos
+resultados salieron del disco y lo que ocupa la caché en disco.
+
+Uso:
+    python benchmarks/medir_cache_disco.py --escala 1000000
+    python benchmarks/medir_cache_disco.py --escala 100000 --motor duckdb
+"""
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from suite_paginas import PAGINAS, RAIZ, en_proceso, juego_de_datos  # noqa: E402
+
+
+SITUACIONES = {
+    "sin disco": {"UEV_CACHE_DISCO_MB": "0"},
+    "disco vacío": {},
+    "disco caliente": {},
+}
+
+
+def primera_ejecucion(pagina, cola):
+    """Duración (ms) de la primera ejecución de la página y aciertos en disco."""
+    from streamlit.testing.v1 import AppTest
+
+    import resultados
+
+    prueba = AppTest.from_file(str(RAIZ / pagina), default_timeout=3600)
+    inicio = time.perf_counter()
+    prueba.run()
+    ms = (time.perf_counter() - inicio) * 1000
+    if prueba.exception:
+        raise RuntimeError(f"{pagina}: {prueba.exception[0].value}")
+    cola.put({"ms": ms, **resultados.estadisticas_disco()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", type=int, default=1000000,
+                        help="Matrículas del juego sintético")
+    parser.add_argument("--motor", default="pandas")
+    parser.add_argument("--dir-datos", default="/tmp/uev_bench")
+    parser.add_argument("--semilla", type=int, default=20241)
+    args = parser.parse_args()
+
+    destino = juego_de_datos(args.dir_datos, args.escala, args.semilla, [args.motor])
+    directorio = destino / ".almacen" / "resultados"
+    print(f"{args.escala:,} matrículas, motor {args.motor}\n")
+    print(f"{'página':<45}" + "".join(f"{s:>16}" for s in SITUACIONES) + f"{'en disco':>12}")
+    for pagina in PAGINAS:
+        # Cada página parte sin nada en disco, para no aprovechar lo que
+        # escribieron las anteriores.
+        shutil.rmtree(directorio, ignore_errors=True)
+        fila = []
+        for variables in SITUACIONES.values():
+            medido = en_proceso(primera_ejecucion, pagina, entorno={
+                "UEV_DIR_DATOS": str(destino), "UEV_MOTOR": args.motor, **variables,
+            })
+            fila.append(f"{medido['ms']:>10.0f} ms ({medido['aciertos']}a)")
+        ocupado = sum(r.stat().st_size for r in directorio.glob("*/*.pkl"))
+        print(f"{pagina:<45}" + "".join(f"{c:>16}" for c in fila) + f"{ocupado / 1024:>9.0f} KB",
+              flush=True)
+    print("\n(Na: resultados leídos de la caché en disco)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compara memoria y tiempos de agrupación: columnas object vs codificadas.
+
+La versión "object" reproduce las tablas que cargaban las páginas antes
+(texto como objetos de Python). La versión "codificada" aplica el esquema
+de ``datos.py``: identificadores y dimensiones como categóricas, cuyas
+claves enteras se usan en ``groupby``, ``isin``, ``nunique`` y ``merge``.
+
+Uso:
+    python benchmarks/medir_codificacion.py --escala 500
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import almacen  # noqa: E402
+import datos  # noqa: E402
+
+
+def tablas_object(escala):
+    tablas = {}
+    for nombre, fuente in datos.FUENTES.items():
+        df = pd.read_csv(fuente["ruta"])
+        df = df.astype({c: object for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])})
+        if escala > 1 and nombre != "docentes":
+            df = pd.concat([df] * escala, ignore_index=True)
+        tablas[nombre] = df
+    tablas["matriculas"] = datos.agregar_indicadores(tablas["matriculas"])
+    return tablas
+
+
+def tablas_codificadas(escala):
+    tablas = {}
+    for nombre, fuente in datos.FUENTES.items():
+        df = pd.read_csv(fuente["ruta"])
+        if escala > 1 and nombre != "docentes":
+            df = pd.concat([df] * escala, ignore_index=True)
+        if fuente.get("derivar") is not None:
+            df = fuente["derivar"](df)
+        tablas[nombre] = almacen.aplicar_esquema(df, fuente["tipos"], fuente.get("fechas"))
+    return tablas
+
+
+# ================== OPERACIONES DE LAS PÁGINAS ==================
+def op_nunique(t):
+    t["matriculas"]["id_estudiante"].nunique()
+
+
+def op_prog_agg(t):
+    t["matriculas"].groupby("programa", observed=True).agg(
+        estudiantes=("id_estudiante", "nunique"),
+        desertores=("es_desercion_o_reprob", "sum"),
+    )
+
+
+def op_filtro(t):
+    mat = t["matriculas"]
+    mat[
+        mat["semestre"].isin(["2024-2"])
+        & mat["facultad"].isin(["Ingeniería", "Ciencias Económicas"])
+        & mat["modalidad"].isin(["AMV"])
+    ]
+
+
+def op_merge(t):
+    t["matriculas"].merge(t["docentes"], on="id_curso", how="left", suffixes=("", "_doc"))
+
+
+def op_curso_doc(t):
+    t["curso_doc_base"].groupby(
+        ["id_curso", "nombre_curso", "id_docente", "facultad", "programa"],
+        observed=True,
+    ).agg(
+        estudiantes=("id_estudiante", "nunique"),
+        nota_promedio=("nota_final", "mean"),
+    )
+
+
+def op_motivos(t):
+    t["soporte"].groupby(["semestre", "facultad", "programa", "motivo"], observed=True).size()
+
+
+OPERACIONES = {
+    "nunique id_estudiante": op_nunique,
+    "prog_agg (página 1)": op_prog_agg,
+    "filtro isin (página 2)": op_filtro,
+    "merge matrícula-docente": op_merge,
+    "curso_doc (página 3)": op_curso_doc,
+    "motivos por segmento (página 4)": op_motivos,
+}
+
+
+def cronometrar(funcion, tablas, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(tablas)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", type=int, default=100,
+                        help="Veces que se replican matrículas y soporte "
+                             "(docentes no: id_curso debe seguir siendo único)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    variantes = {"object": tablas_object(args.escala), "codificada": tablas_codificadas(args.escala)}
+    for tablas in variantes.values():
+        tablas["curso_doc_base"] = tablas["matriculas"].merge(
+            tablas["docentes"], on="id_curso", how="left", suffixes=("", "_doc")
+        )
+
+    print("Memoria (MB, deep):")
+    for nombre in datos.FUENTES:
+        mb = {
+            v: t[nombre].memory_usage(deep=True).sum() / 1024 ** 2
+            for v, t in variantes.items()
+        }
+        print(f"  {nombre:<12}{mb['object']:>10.2f} -> {mb['codificada']:>8.2f}"
+              f"  ({mb['object'] / mb['codificada']:.1f}x)")
+
+    print(f"\nTiempos (ms, mejor de {args.repeticiones}):")
+    for etiqueta, funcion in OPERACIONES.items():
+        ms = {v: cronometrar(funcion, t, args.repeticiones) for v, t in variantes.items()}
+        print(f"  {etiqueta:<34}{ms['object']:>9.1f} -> {ms['codificada']:>8.1f}"
+              f"  ({ms['object'] / ms['codificada']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compara el filtrado con ``isin`` encadenados contra el índice de facetas.
+
+Se replican las matrículas, se construye la tabla de hechos y su índice de
+bitmaps (``facetas.py``) y se miden selecciones típicas de la página 2:
+todo seleccionado (el caso por defecto), una faceta restringida y varias
+facetas restringidas a la vez.
+
+Uso:
+    python benchmarks/medir_facetas.py --escala 1000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import almacen  # noqa: E402
+import datos  # noqa: E402
+import facetas  # noqa: E402
+import hechos  # noqa: E402
+
+
+def tabla_hechos(escala):
+    fuentes = {}
+    for nombre in ("matriculas", "docentes"):
+        fuente = datos.FUENTES[nombre]
+        df = pd.read_csv(fuente["ruta"])
+        if escala > 1 and nombre == "matriculas":
+            df = pd.concat([df] * escala, ignore_index=True)
+        df = fuente["derivar"](df)
+        fuentes[nombre] = almacen.aplicar_esquema(df, fuente["tipos"], fuente.get("fechas"))
+    return hechos.construir_hechos(fuentes["matriculas"], fuentes["docentes"])
+
+
+def selecciones(df):
+    todos = {d: list(df[d].cat.categories) for d in datos.FACETAS["hechos_matricula"]}
+    una = {**todos, "facultad": todos["facultad"][:1]}
+    varias = {
+        "semestre": todos["semestre"][-1:],
+        "facultad": todos["facultad"][:2],
+        "programa": todos["programa"][: len(todos["programa"]) // 2],
+        "modalidad": todos["modalidad"][:1],
+    }
+    return {"todo seleccionado": todos, "una faceta": una, "varias facetas": varias}
+
+
+def filtrar_isin(df, seleccion):
+    mascara = np.ones(len(df), dtype=bool)
+    for dimension, valores in seleccion.items():
+        mascara &= df[dimension].isin(valores).to_numpy()
+    return df[mascara]
+
+
+def cronometrar(funcion, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", type=int, default=100,
+                        help="Veces que se replican las matrículas")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    df = tabla_hechos(args.escala)
+    inicio = time.perf_counter()
+    indice = facetas.construir_indice(df, datos.FACETAS["hechos_matricula"])
+    construccion = (time.perf_counter() - inicio) * 1000
+    print(f"{len(df):,} filas; índice: {indice.shape[1]} bitmaps, "
+          f"{indice.memory_usage().sum() / 1024 ** 2:.1f} MB, {construccion:.0f} ms")
+
+    print(f"\nTiempos (ms, mejor de {args.repeticiones}):")
+    for etiqueta, seleccion in selecciones(df).items():
+        assert facetas.filtrar(df, indice, seleccion).equals(filtrar_isin(df, seleccion))
+        ms_isin = cronometrar(lambda: filtrar_isin(df, seleccion), args.repeticiones)
+        ms_bits = cronometrar(lambda: facetas.filtrar(df, indice, seleccion), args.repeticiones)
+        print(f"  {etiqueta:<20}{ms_isin:>9.1f} -> {ms_bits:>8.1f}  ({ms_isin / ms_bits:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
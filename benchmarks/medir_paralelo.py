@@ -0,0 +1,108 @@
+"""Escalamiento del motor paralelo con el número de procesos.
+
+Para un juego sintético (``generar_datos.py``, reutilizado si ya existe)
+mide las consultas que reparte ``motor_paralelo.py`` (curso-docente,
+docente y cruce de segmentos) con pandas en un solo hilo y con
+``UEV_MOTOR=paralelo`` para cada número de procesos y cada criterio de
+partición. Cada configuración corre en un proceso nuevo, con el pool ya
+arrancado y las tablas cargadas; se reporta el mejor de varios intentos
+sin la caché de resultados, sin filtros y con una facultad, y la
+aceleración respecto de pandas.
+
+Con menos núcleos que procesos el pool no puede acelerar: el reporte
+incluye los núcleos de la máquina para leer los números.
+
+Uso:
+    python benchmarks/medir_paralelo.py --escala 1000000 --procesos 1,2,4,8
+    python benchmarks/medir_paralelo.py --particiones id_curso,semestre,facultad
+"""
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from suite_paginas import en_proceso, juego_de_datos  # noqa: E402
+
+
+CONSULTAS = ["agregar_curso_docente", "agregar_docente", "cruzar_segmentos"]
+
+
+def medir(repeticiones, cola):
+    """Mejor tiempo (ms) de cada consulta y selección con el motor del entorno."""
+    import consultas
+    import datos
+    import motores
+
+    motores.preparar()
+    facultad = str(datos.cargar_matriculas()["facultad"].cat.categories[0])
+    selecciones = {"sin filtros": {}, "una facultad": {"facultad": [facultad]}}
+    tiempos = {}
+    for nombre in CONSULTAS:
+        # Sin la caché de resultados ni el registro de perfil.
+        funcion = inspect.unwrap(getattr(consultas, nombre))
+        for etiqueta, seleccion in selecciones.items():
+            mejor = float("inf")
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                funcion(seleccion)
+                mejor = min(mejor, time.perf_counter() - inicio)
+            tiempos[f"{nombre} ({etiqueta})"] = mejor * 1000
+    if hasattr(motores._modulo, "cerrar"):
+        motores._modulo.cerrar()
+    cola.put(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", type=int, default=1000000,
+                        help="Matrículas del juego sintético")
+    parser.add_argument("--procesos", default="1,2,4",
+                        help="Números de procesos a medir, separados por coma")
+    parser.add_argument("--particiones", default="id_curso",
+                        help="Criterios de partición (id_curso, semestre, facultad)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--dir-datos", default="/tmp/uev_bench")
+    parser.add_argument("--semilla", type=int, default=20241)
+    parser.add_argument("--salida", default=None, help="JSON opcional con los resultados")
+    args = parser.parse_args()
+
+    destino = juego_de_datos(args.dir_datos, args.escala, args.semilla, ["pandas"])
+    print(f"{args.escala:,} matrículas, {os.cpu_count()} núcleos")
+
+    base = en_proceso(medir, args.repeticiones,
+                      entorno={"UEV_DIR_DATOS": str(destino), "UEV_MOTOR": "pandas"})
+    resultados = [{"motor": "pandas", "procesos": 1, "particion": None, "ms": base}]
+    for particion in args.particiones.split(","):
+        for procesos in (int(x) for x in args.procesos.split(",")):
+            medido = en_proceso(medir, args.repeticiones, entorno={
+                "UEV_DIR_DATOS": str(destino),
+                "UEV_MOTOR": "paralelo",
+                "UEV_PROCESOS": str(procesos),
+                "UEV_PARTICION": particion,
+            })
+            resultados.append(
+                {"motor": "paralelo", "procesos": procesos, "particion": particion, "ms": medido}
+            )
+
+    print(f"\n{'consulta':<48}{'motor':<24}{'ms':>10}{'vs pandas':>11}")
+    for consulta in base:
+        for r in resultados:
+            etiqueta = r["motor"] if r["particion"] is None else (
+                f"paralelo {r['procesos']}p {r['particion']}"
+            )
+            ms = r["ms"][consulta]
+            print(f"{consulta:<48}{etiqueta:<24}{ms:>10.1f}{base[consulta] / ms:>10.2f}x")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"escala": args.escala, "cpus": os.cpu_count(), "resultados": resultados}, f,
+                      ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
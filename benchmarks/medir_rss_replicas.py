@@ -0,0 +1,114 @@
+"""Mide la memoria total de N réplicas que cargan las tres tablas a la vez.
+
+Cada réplica es un proceso independiente (como un servidor de Streamlit
+detrás del balanceador). Se compara la lectura mapeada del almacén Arrow
+con un ``read_csv`` tipado por proceso; el modo "base" no carga tablas y
+sirve para descontar el intérprete y las librerías. Para cada número de
+réplicas se reporta la suma de RSS y la suma de PSS (memoria proporcional:
+las páginas compartidas se reparten entre los procesos que las usan, así
+que es la cifra que de verdad crece con las réplicas). Solo funciona en
+Linux.
+
+Uso:
+    python benchmarks/medir_rss_replicas.py --escala 200 --replicas 1,2,4,8
+"""
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import almacen  # noqa: E402
+import datos  # noqa: E402
+
+
+def memoria_proceso():
+    valores = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+        for linea in f:
+            partes = linea.split()
+            if partes[0] in ("Rss:", "Pss:"):
+                valores[partes[0][:-1].lower()] = int(partes[1]) / 1024
+    return valores
+
+
+def replica(modo, dir_trabajo, barrera, cola):
+    almacen.DIR_ALMACEN = Path(dir_trabajo) / "almacen"
+    tablas = []
+    for nombre, fuente in datos.FUENTES.items():
+        ruta = Path(dir_trabajo) / Path(fuente["ruta"]).name
+        if modo == "base":
+            continue
+        if modo == "mmap":
+            tablas.append(datos.leer_fuente(nombre, ruta))
+        else:
+            tablas.append(
+                almacen.leer_csv_tipado(
+                    ruta, fuente["tipos"], fuente.get("fechas"), fuente.get("derivar")
+                )
+            )
+    # Recorremos todas las columnas para que sus páginas queden residentes,
+    # sin crear copias: un elemento por página de 4 KB basta.
+    for tabla in tablas:
+        for columna in tabla.columns:
+            serie = tabla[columna]
+            if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie):
+                serie.to_numpy()[::512].tolist()
+            else:
+                serie.iloc[::512].tolist()
+    barrera.wait()
+    cola.put(memoria_proceso())
+    barrera.wait()
+
+
+def preparar(dir_trabajo, escala):
+    for nombre, fuente in datos.FUENTES.items():
+        base = pd.read_csv(fuente["ruta"])
+        destino = Path(dir_trabajo) / Path(fuente["ruta"]).name
+        pd.concat([base] * escala, ignore_index=True).to_csv(destino, index=False)
+        # Conversión previa para que ninguna réplica pague la ingesta.
+        almacen.DIR_ALMACEN = Path(dir_trabajo) / "almacen"
+        datos.leer_fuente(nombre, destino)
+
+
+def medir(modo, replicas, dir_trabajo):
+    ctx = mp.get_context("spawn")
+    barrera = ctx.Barrier(replicas)
+    cola = ctx.Queue()
+    procesos = [
+        ctx.Process(target=replica, args=(modo, dir_trabajo, barrera, cola))
+        for _ in range(replicas)
+    ]
+    for p in procesos:
+        p.start()
+    resultados = [cola.get() for _ in procesos]
+    for p in procesos:
+        p.join()
+    return (
+        sum(r["rss"] for r in resultados),
+        sum(r["pss"] for r in resultados),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", type=int, default=100,
+                        help="Veces que se replica cada CSV")
+    parser.add_argument("--replicas", default="1,2,4")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dir_trabajo:
+        preparar(dir_trabajo, args.escala)
+        print(f"{'modo':<6}{'réplicas':>10}{'RSS total (MB)':>18}{'PSS total (MB)':>18}")
+        for modo in ("base", "csv", "mmap"):
+            for n in [int(x) for x in args.replicas.split(",")]:
+                rss, pss = medir(modo, n, dir_trabajo)
+                print(f"{modo:<6}{n:>10}{rss:>18.1f}{pss:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
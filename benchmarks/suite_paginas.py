@@ -0,0 +1,270 @@
+"""Suite sin navegador: tiempos y memoria de cada página a distintas escalas.
+
+Para cada escala se genera (o reutiliza) un juego sintético con
+``generar_datos.py`` y cada página se ejecuta con ``AppTest`` de Streamlit
+en un proceso propio, sin servidor ni navegador. Los tiempos se cortan en
+las mismas marcas ``perfil.seccion(...)`` de las páginas, así que cada
+sección ("2. Indicadores por programa", "4. Relación entre tiempo de
+respuesta y deserción (P5)", ...) incluye su cálculo y la construcción de
+sus gráficos. Lo que ocurre antes de la primera marca aparece como
+"(arranque)".
+
+Con ``--motores pandas,duckdb,polars`` cada página se mide una vez por motor de
+cálculo (``UEV_MOTOR``, ver ``motores.py``) sobre el mismo juego de datos;
+cada registro lleva su ``motor``.
+
+Escenarios por página:
+
+- frio: primera ejecución del proceso (tablas leídas del almacén);
+- sin_cache: tablas en memoria, caché de resultados vacía;
+- con_cache: rerun con la misma selección (caché de resultados caliente);
+- filtrado: solo la primera facultad, con la caché de resultados vacía.
+
+Por sección se reporta el tiempo y el pico de memoria asignada
+(``tracemalloc``, cubre pandas/NumPy) y los pasos que la página mide con
+``perfil.paso`` (carga, agregación, Altair, st.dataframe) se agregan como
+registros con ``paso``; por página, el pico de RSS del proceso. Todo se escribe en un JSON para comparar corridas.
+
+Uso:
+    python benchmarks/suite_paginas.py --escalas 1000,100000,1000000 --salida bench.json
+    python benchmarks/suite_paginas.py --escalas 10000000 --motores pandas,duckdb,polars
+"""
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generar_datos  # noqa: E402
+
+
+PAGINAS = ["app.py"] + sorted(str(p.relative_to(RAIZ)) for p in (RAIZ / "pages").glob("*.py"))
+
+INICIO = "(arranque)"
+
+
+# ================== CRONÓMETRO POR SECCIÓN ==================
+class Cronometro:
+    """Corta el tiempo y el pico de memoria en cada encabezado de sección."""
+
+    def __init__(self):
+        self.secciones = []
+        self._actual = None
+        self._inicio = None
+
+    def empezar(self):
+        self.secciones = []
+        self._actual = INICIO
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+        self._inicio = time.perf_counter()
+
+    def cortar(self, siguiente=None):
+        ahora = time.perf_counter()
+        actual, pico = tracemalloc.get_traced_memory()
+        self.secciones.append({
+            "seccion": self._actual,
+            "ms": (ahora - self._inicio) * 1000,
+            "pico_mb": max(0, pico - self._base) / 1024 ** 2,
+        })
+        self._actual = siguiente
+        tracemalloc.reset_peak()
+        self._base = actual
+        self._inicio = time.perf_counter()
+
+    def envolver(self, seccion):
+        def envoltura(nombre):
+            self.cortar(nombre)
+            return seccion(nombre)
+        return envoltura
+
+
+class _Captura(logging.Handler):
+    def __init__(self, destino):
+        super().__init__()
+        self.destino = destino
+
+    def emit(self, record):
+        self.destino.append(json.loads(record.getMessage()))
+
+
+# ================== PROCESO POR PÁGINA ==================
+def medir_pagina(pagina, cola):
+    os.chdir(RAIZ)
+    from streamlit.testing.v1 import AppTest
+
+    import perfil
+    import resultados
+
+    # Los pasos que las páginas marcan con perfil.py (carga, agregación,
+    # Altair, st.dataframe) se toman de su registro estructurado.
+    pasos = []
+    perfil.registro.addHandler(_Captura(pasos))
+    perfil.registro.setLevel(logging.INFO)
+
+    cronometro = Cronometro()
+    perfil.seccion = cronometro.envolver(perfil.seccion)
+    tracemalloc.start()
+    registros = []
+
+    def correr(escenario, prueba):
+        cronometro.empezar()
+        prueba.run()
+        cronometro.cortar()
+        if prueba.exception:
+            raise RuntimeError(f"{pagina} ({escenario}): {prueba.exception[0].value}")
+        for seccion in cronometro.secciones:
+            registros.append({"escenario": escenario, **seccion})
+        for resumen in pasos:
+            for t in resumen["tiempos"]:
+                if t["paso"] is not None:
+                    registros.append({"escenario": escenario, **t, "pico_mb": None})
+        pasos.clear()
+
+    prueba = AppTest.from_file(str(RAIZ / pagina), default_timeout=3600)
+    correr("frio", prueba)
+    resultados.RESULTADOS.limpiar()
+    correr("sin_cache", prueba)
+    correr("con_cache", prueba)
+    if len(prueba.multiselect) > 1:
+        facultad = prueba.multiselect[1]
+        facultad.set_value(facultad.options[:1])
+        resultados.RESULTADOS.limpiar()
+        correr("filtrado", prueba)
+
+    tracemalloc.stop()
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    cola.put({"registros": registros, "rss_pico_mb": rss_pico})
+
+
+def en_proceso(funcion, *args, entorno=None):
+    """Ejecuta ``funcion(*args, cola)`` en un proceso nuevo con las variables ``entorno``.
+
+    Se fijan antes de arrancarlo: el proceso hijo importa este módulo (y con
+    él ``datos.py``, que lee ``UEV_DIR_DATOS`` al importarse) antes de
+    llamar a ``funcion``.
+    """
+    entorno = entorno or {}
+    anterior = {clave: os.environ.get(clave) for clave in entorno}
+    ctx = mp.get_context("spawn")
+    cola = ctx.Queue()
+    proceso = ctx.Process(target=funcion, args=(*args, cola))
+    os.environ.update(entorno)
+    try:
+        proceso.start()
+    finally:
+        for clave, valor in anterior.items():
+            if valor is None:
+                os.environ.pop(clave, None)
+            else:
+                os.environ[clave] = valor
+    resultado = cola.get()
+    proceso.join()
+    return resultado
+
+
+def preparar_tablas(motores, cola):
+    """Construye las tablas derivadas del almacén (y las de cada motor) antes de medir."""
+    import datos
+    import motores as registro_motores
+
+    mat, doc, sup = datos.leer_matriculas(), datos.leer_docentes(), datos.leer_soporte()
+    hechos = datos.leer_hechos(mat, doc)
+    datos.leer_cubo(mat)
+    for nombre, tabla in (("hechos_matricula", hechos), ("matriculas", mat), ("soporte", sup)):
+        datos.leer_facetas(nombre, tabla)
+    for motor in motores:
+        if registro_motores.MOTORES[motor]:
+            importlib.import_module(registro_motores.MOTORES[motor]).preparar()
+    cola.put(None)
+
+
+# ================== ORQUESTACIÓN ==================
+def juego_de_datos(dir_base, escala, semilla, motores):
+    destino = Path(dir_base) / f"n{escala}"
+    if not (destino / "matriculaslimpias.csv").exists():
+        print(f"  generando {escala:,} matrículas en {destino} ...", flush=True)
+        generar_datos.generar(destino, escala, semilla=semilla)
+    en_proceso(preparar_tablas, motores, entorno={"UEV_DIR_DATOS": str(destino)})
+    return destino
+
+
+def correr_suite(escalas, paginas, dir_base, semilla, motores=("pandas",)):
+    registros = []
+    for escala in escalas:
+        print(f"escala {escala:,}", flush=True)
+        destino = juego_de_datos(dir_base, escala, semilla, motores)
+        for pagina in paginas:
+            for motor in motores:
+                # Sin la caché en disco: cada escenario mide el cálculo (el
+                # arranque con ella lo mide medir_cache_disco.py).
+                medido = en_proceso(medir_pagina, pagina, entorno={
+                    "UEV_DIR_DATOS": str(destino), "UEV_MOTOR": motor, "UEV_CACHE_DISCO_MB": "0",
+                })
+                base = {"escala": escala, "pagina": pagina, "motor": motor}
+                for registro in medido["registros"]:
+                    registros.append({**base, **registro})
+                total = sum(r["ms"] for r in medido["registros"] if r["escenario"] == "sin_cache")
+                print(f"  {pagina:<45}{motor:<8}{total:>10.1f} ms (sin_cache)"
+                      f"{medido['rss_pico_mb']:>10.0f} MB RSS pico", flush=True)
+                registros.append({
+                    **base, "escenario": "proceso",
+                    "seccion": "(rss pico)", "ms": None, "pico_mb": medido["rss_pico_mb"],
+                })
+    return registros
+
+
+def entorno(motores):
+    import numpy
+    import pandas
+    import streamlit
+
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "motores": list(motores),
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "streamlit": streamlit.__version__,
+        "maquina": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escalas", default="1000,10000,100000,1000000",
+                        help="Matrículas por juego (hasta 10000000)")
+    parser.add_argument("--paginas", default=None,
+                        help="Subconjunto de páginas separadas por coma (por defecto todas)")
+    parser.add_argument("--dir-datos", default="/tmp/uev_bench",
+                        help="Carpeta donde se generan y reutilizan los juegos")
+    parser.add_argument("--motores", default="pandas",
+                        help="Motores de cálculo a comparar, separados por coma (pandas, duckdb, polars, paralelo)")
+    parser.add_argument("--semilla", type=int, default=20241)
+    parser.add_argument("--salida", default="bench_paginas.json")
+    args = parser.parse_args()
+
+    escalas = [int(x) for x in args.escalas.split(",")]
+    paginas = args.paginas.split(",") if args.paginas else PAGINAS
+    motores = args.motores.split(",")
+    registros = correr_suite(escalas, paginas, args.dir_datos, args.semilla, motores)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump({"entorno": entorno(motores), "registros": registros}, f, ensure_ascii=False, indent=1)
+    print(f"\n{len(registros)} registros en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
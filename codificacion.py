@@ -0,0 +1,110 @@
+"""Codificación por diccionario de identificadores y dimensiones.
+
+Las columnas listadas aquí se almacenan como categóricas (diccionario Arrow
+en disco): cada valor distinto se guarda una vez y las filas solo llevan un
+código entero. Ese código es la clave sustituta de la columna y el
+diccionario (``.cat.categories``) es la tabla inversa para mostrar el texto
+original. ``groupby``, ``isin``, ``nunique`` y ``merge`` trabajan así sobre
+enteros en lugar de hashear cadenas.
+"""
+import numpy as np
+import pandas as pd
+
+
+# ================== COLUMNAS CODIFICADAS ==================
+COLUMNAS_ID = ["id_estudiante", "id_curso", "id_docente", "id_caso"]
+
+COLUMNAS_DIMENSION = [
+    "semestre",
+    "facultad",
+    "programa",
+    "modalidad",
+    "subperiodo",
+    "estado_academico",
+    "nombre_curso",
+    "motivo",
+    "tipo_atencion",
+    "region",
+]
+
+COLUMNAS_CODIFICADAS = COLUMNAS_ID + COLUMNAS_DIMENSION
+
+
+# ================== CLAVES Y DICCIONARIOS ==================
+def claves(serie):
+    """Clave sustituta ``int32`` de cada fila (-1 para valores nulos)."""
+    return serie.cat.codes.to_numpy().astype(np.int32, copy=False)
+
+
+def diccionario(serie):
+    """Diccionario inverso clave -> valor original de una columna codificada."""
+    return serie.cat.categories
+
+
+def decodificar(codigos, dicc):
+    """Traduce claves sustitutas a sus valores originales."""
+    return pd.Categorical.from_codes(np.asarray(codigos), categories=dicc)
+
+
+def tabla_claves(df):
+    """DataFrame con la clave ``int32`` de cada columna codificada presente."""
+    return pd.DataFrame(
+        {c: claves(df[c]) for c in COLUMNAS_CODIFICADAS if c in df.columns},
+        index=df.index,
+    )
+
+
+def diccionarios(df):
+    return {c: diccionario(df[c]) for c in COLUMNAS_CODIFICADAS if c in df.columns}
+
+
+def alinear_diccionarios(*dfs):
+    """Los DataFrames con el mismo diccionario (la unión, ordenada) en cada categórica.
+
+    Así se pueden concatenar sin perder el tipo categórico, y el resultado
+    queda con las categorías ordenadas como si se hubiera leído de una vez.
+    """
+    columnas = [c for c in dfs[0].columns if isinstance(dfs[0][c].dtype, pd.CategoricalDtype)]
+    categorias = {}
+    for columna in columnas:
+        # Trozos de una misma tabla ya comparten el diccionario: no se recodifican.
+        if all(df[columna].dtype == dfs[0][columna].dtype for df in dfs[1:]):
+            continue
+        unidas = dfs[0][columna].cat.categories
+        for df in dfs[1:]:
+            unidas = unidas.union(df[columna].cat.categories)
+        categorias[columna] = unidas.sort_values()
+    return [
+        df.assign(**{c: df[c].cat.set_categories(v) for c, v in categorias.items()})
+        for df in dfs
+    ]
+
+
+def concatenar(*dfs):
+    """Concatena tablas codificadas conservando las categóricas (ver ``alinear_diccionarios``)."""
+    return pd.concat(alinear_diccionarios(*dfs), ignore_index=True)
+
+
+# ================== ETIQUETAS CANÓNICAS ==================
+# Las fuentes no coinciden en mayúsculas ("Artes Y Humanidades" en matrículas
+# y docentes, "Artes y Humanidades" en soporte), lo que rompe los cruces por
+# facultad o programa. Todas se llevan a la misma forma antes de codificar.
+CONECTORES = {"a", "con", "de", "del", "e", "el", "en", "la", "las", "los", "o", "para", "u", "y"}
+
+COLUMNAS_ETIQUETA = ["facultad", "programa"]
+
+
+def etiqueta_canonica(texto):
+    palabras = str(texto).split()
+    return " ".join(
+        p.lower() if i > 0 and p.lower() in CONECTORES else p[:1].upper() + p[1:]
+        for i, p in enumerate(palabras)
+    )
+
+
+def normalizar_etiquetas(df):
+    for columna in COLUMNAS_ETIQUETA:
+        if columna in df.columns:
+            unicos = df[columna].dropna().unique()
+            df[columna] = df[columna].map({v: etiqueta_canonica(v) for v in unicos})
+    return df
@@ -0,0 +1,162 @@
+"""Agregados del tablero por combinación de filtros, con caché compartida.
+
+Cada función recibe ``selecciones`` (dimensión -> valores elegidos), filtra
+con los índices de ``datos.py``, calcula con ``analitica.py`` y guarda el
+resultado en la caché de ``resultados.py``. Las usan tanto las páginas
+como la API local (``api.py``), de modo que ambas comparten definición y
+claves de caché. Una dimensión ausente de ``selecciones`` no restringe.
+
+Con ``UEV_MOTOR`` (ver ``motores.py``) el filtro y la agregación de cada
+función corren en otro motor; la caché y el perfil no cambian.
+"""
+import analitica
+import cubo
+import motores
+import perfil
+from datos import (
+    cargar_cubo,
+    cargar_cubo_soporte,
+    cargar_datos,
+    filtrar_hechos,
+    filtrar_matriculas,
+    filtrar_soporte,
+)
+from resultados import por_filtros
+
+
+def _sin_region(selecciones):
+    # Matrículas no tienen región: se filtran con las demás dimensiones.
+    return {d: v for d, v in selecciones.items() if d != "region"}
+
+
+def _solo(selecciones, dimensiones):
+    return {d: v for d, v in selecciones.items() if d in dimensiones}
+
+
+# ================== DESCRIPCIÓN GENERAL ==================
+@perfil.medido("agregación")
+@por_filtros("general.totales")
+@motores.alternativo
+def totales_generales(selecciones):
+    """Totales de toda la operación (no admite filtros)."""
+    return analitica.totales_generales(*cargar_datos())
+
+
+@perfil.medido("agregación")
+@por_filtros("general.prog_riesgo")
+@motores.alternativo
+def programas_en_riesgo(selecciones):
+    return analitica.programas_en_riesgo(filtrar_matriculas(selecciones), n=3)
+
+
+@perfil.medido("agregación")
+@por_filtros("general.periodos")
+@motores.alternativo
+def indicadores_periodo(selecciones):
+    """Indicadores por semestre desde los cubos: no recorre filas de matrícula ni de soporte.
+
+    Cada cubo aplica solo las dimensiones que tiene (modalidad no restringe
+    al soporte ni región a las matrículas).
+    """
+    return analitica.indicadores_por_periodo(
+        cubo.filtrar_cubo(cargar_cubo(), _solo(selecciones, cubo.DIMENSIONES_CUBO)),
+        cubo.filtrar_cubo(
+            cargar_cubo_soporte(), _solo(selecciones, cubo.DIMENSIONES_SOPORTE)
+        ),
+    )
+
+
+# ================== MATRÍCULAS Y DESEMPEÑO ==================
+@perfil.medido("agregación")
+@por_filtros("matriculas.kpis")
+@motores.alternativo
+def resumen_matriculas(selecciones):
+    return analitica.resumen_matriculas(cubo.filtrar_cubo(cargar_cubo(), selecciones))
+
+
+@perfil.medido("agregación")
+@por_filtros("matriculas.estados_prog")
+@motores.alternativo
+def estados_por_programa(selecciones):
+    return analitica.estados_por_programa(cubo.filtrar_cubo(cargar_cubo(), selecciones))
+
+
+@perfil.medido("agregación")
+@por_filtros("matriculas.prog_ind")
+@motores.alternativo
+def indicadores_programa(selecciones):
+    return analitica.indicadores_programa(cubo.filtrar_cubo(cargar_cubo(), selecciones))
+
+
+@perfil.medido("agregación")
+@por_filtros("matriculas.curso_ind")
+@motores.alternativo
+def indicadores_curso(selecciones):
+    return analitica.indicadores_curso(filtrar_hechos(selecciones))
+
+
+@perfil.medido("agregación")
+@por_filtros("matriculas.seg")
+@motores.alternativo
+def segmentos_riesgo(selecciones):
+    return analitica.segmentos_riesgo(cubo.filtrar_cubo(cargar_cubo(), selecciones))
+
+
+# ================== DOCENTES Y CURSOS ==================
+@perfil.medido("agregación")
+@por_filtros("docentes.curso_doc")
+@motores.alternativo
+def agregar_curso_docente(selecciones):
+    return analitica.agregar_curso_docente(filtrar_hechos(selecciones))
+
+
+@perfil.medido("agregación")
+@por_filtros("docentes.doc_agg")
+@motores.alternativo
+def agregar_docente(selecciones):
+    return analitica.agregar_docente(filtrar_hechos(selecciones))
+
+
+def resumen_docentes(selecciones):
+    return analitica.resumen_cursos(agregar_curso_docente(selecciones))
+
+
+# ================== SOPORTE Y ATENCIONES ==================
+@perfil.medido("agregación")
+@por_filtros("soporte.kpis")
+@motores.alternativo
+def resumen_soporte(selecciones):
+    return analitica.resumen_soporte(
+        filtrar_soporte(selecciones), filtrar_matriculas(_sin_region(selecciones))
+    )
+
+
+@perfil.medido("agregación")
+@por_filtros("soporte.motivo_agg")
+@motores.alternativo
+def agregar_motivos(selecciones):
+    return analitica.casos_por_motivo(filtrar_soporte(selecciones))
+
+
+@perfil.medido("agregación")
+@por_filtros("soporte.tipo_agg")
+@motores.alternativo
+def agregar_tipo_atencion(selecciones):
+    return analitica.tiempo_por_tipo_atencion(filtrar_soporte(selecciones))
+
+
+@perfil.medido("agregación")
+@por_filtros("soporte.sat_reg")
+@motores.alternativo
+def agregar_satisfaccion_region(selecciones):
+    return analitica.satisfaccion_por_region(filtrar_soporte(selecciones))
+
+
+@perfil.medido("agregación")
+@por_filtros("soporte.seg")
+@motores.alternativo
+def cruzar_segmentos(selecciones):
+    """Une deserción y soporte por semestre-facultad-programa (P5)."""
+    return analitica.cruzar_segmentos(
+        filtrar_matriculas(_sin_region(selecciones)), filtrar_soporte(selecciones)
+    )
@@ -0,0 +1,119 @@
+"""Cubo OLAP preagregado de matrículas.
+
+Casi todos los KPIs y gráficos de la página 2 son conteos o promedios sobre
+algún subconjunto de estas dimensiones. El cubo guarda, por cada
+combinación observada de ellas, el número de matrículas, la suma y el
+conteo de ``nota_final`` y los conteos de cada resultado. Filtrar y
+enrollar el cubo (unos cientos de celdas) reemplaza recorrer las filas de
+matrícula en cada rerun.
+
+El cubo de soporte hace lo mismo con los casos de soporte. Como ambos
+tienen el semestre como dimensión, también son los agregados por periodo
+con los que se comparan dos periodos (ver ``periodos.py``).
+"""
+import numpy as np
+
+from codificacion import concatenar
+
+
+DIMENSIONES_CUBO = [
+    "semestre",
+    "facultad",
+    "programa",
+    "modalidad",
+    "subperiodo",
+    "estado_academico",
+]
+
+# Medidas aditivas: cualquier enrollado se obtiene sumándolas.
+MEDIDAS = ["matriculas", "suma_nota", "notas", "deserciones", "reprobaciones", "desercion_o_reprob"]
+
+# Cambiar este número obliga a reconstruir el cubo guardado.
+VERSION_CUBO = 1
+
+# Cubo de soporte: por semestre, facultad, programa y región, lo necesario
+# para promediar tiempos de respuesta y satisfacción al enrollar.
+DIMENSIONES_SOPORTE = ["semestre", "facultad", "programa", "region"]
+MEDIDAS_SOPORTE = ["casos", "suma_tiempo", "tiempos", "suma_satisfaccion", "satisfacciones"]
+VERSION_CUBO_SOPORTE = 1
+
+
+# ================== CONSTRUCCIÓN ==================
+def construir_cubo(mat):
+    """Una fila por combinación observada de ``DIMENSIONES_CUBO``."""
+    base = mat[DIMENSIONES_CUBO].assign(
+        nota=mat["nota_final"].astype(np.float64),
+        es_desercion=mat["es_desercion"],
+        es_reprob=mat["es_reprob"],
+        es_desercion_o_reprob=mat["es_desercion_o_reprob"],
+    )
+    return (
+        base.groupby(DIMENSIONES_CUBO, observed=True)
+        .agg(
+            matriculas=("nota", "size"),
+            suma_nota=("nota", "sum"),
+            notas=("nota", "count"),
+            deserciones=("es_desercion", "sum"),
+            reprobaciones=("es_reprob", "sum"),
+            desercion_o_reprob=("es_desercion_o_reprob", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def construir_cubo_soporte(sup):
+    """Una fila por combinación observada de ``DIMENSIONES_SOPORTE``."""
+    base = sup[DIMENSIONES_SOPORTE].assign(
+        tiempo=sup["tiempo_respuesta_horas"].astype(np.float64),
+        satisfaccion=sup["satisfaccion_estudiante"].astype(np.float64),
+    )
+    return (
+        base.groupby(DIMENSIONES_SOPORTE, observed=True)
+        .agg(
+            casos=("tiempo", "size"),
+            suma_tiempo=("tiempo", "sum"),
+            tiempos=("tiempo", "count"),
+            suma_satisfaccion=("satisfaccion", "sum"),
+            satisfacciones=("satisfaccion", "count"),
+        )
+        .reset_index()
+    )
+
+
+def combinar(cubo, otro, dimensiones=DIMENSIONES_CUBO, medidas=MEDIDAS):
+    """Cubo de la unión de las filas de ``cubo`` y ``otro``.
+
+    Como las medidas son aditivas, basta con sumar las celdas de ambos: la
+    ingesta incremental (``ingesta.py``) combina el cubo guardado con el de
+    un lote nuevo sin volver a recorrer las filas anteriores.
+    """
+    return enrollar(concatenar(cubo, otro), dimensiones, medidas).reset_index()
+
+
+# ================== CONSULTA ==================
+def filtrar_cubo(cubo, selecciones):
+    """Celdas del cubo dentro de las selecciones (dimensión -> valores)."""
+    mascara = np.ones(len(cubo), dtype=bool)
+    for dimension, valores in selecciones.items():
+        mascara &= cubo[dimension].isin(valores).to_numpy()
+    return cubo[mascara]
+
+
+def enrollar(cubo, por, medidas=MEDIDAS):
+    """Suma las medidas agrupando solo por las dimensiones ``por``."""
+    return cubo.groupby(por, observed=True)[medidas].sum()
+
+
+def kpis(cubo):
+    """Totales del segmento: matrículas, tasas (%) y nota promedio."""
+    totales = cubo[MEDIDAS].sum()
+    matriculas = int(totales["matriculas"])
+    if matriculas == 0:
+        return {"matriculas": 0, "tasa_desercion": 0, "tasa_reprob": 0, "nota_promedio": 0}
+    return {
+        "matriculas": matriculas,
+        "tasa_desercion": totales["deserciones"] / matriculas * 100,
+        "tasa_reprob": totales["reprobaciones"] / matriculas * 100,
+        "nota_promedio": totales["suma_nota"] / totales["notas"] if totales["notas"] else np.nan,
+    }
+
@@ -0,0 +1,522 @@
+"""Capa única de acceso a datos del tablero UEV-ITM.
+
+Todas las páginas importan sus tablas desde aquí. Cada CSV se lee una sola
+vez por proceso y el DataFrame resultante se comparte entre sesiones y
+reruns sin copiarse (``st.cache_resource``). Por eso las tablas que entrega
+este módulo son de solo lectura: las páginas filtran, agrupan o unen, pero
+nunca asignan columnas sobre ellas. Las fuentes y sus derivadas se cargan
+a la vez en hilos (``precargar``), y cada página espera solo las suyas.
+Si cambian los CSV, un hilo arma las tablas nuevas en segundo plano y las
+cambia de una vez (``refrescar``); hasta entonces se sirven las anteriores.
+
+La lectura pasa por el almacén columnar (``almacen.py``) con el esquema
+tipado definido abajo; ``python datos.py`` ejecuta la ingesta a mano.
+"""
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+import almacen
+import cubo
+import facetas
+import hechos
+import metricas
+import periodos
+from codificacion import diccionario, normalizar_etiquetas
+
+
+# Con copy-on-write, los filtros y merges de las páginas generan vistas
+# baratas y cualquier escritura sobre ellas nunca alcanza la tabla compartida.
+# En pandas >= 3 este comportamiento ya es el único disponible.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# ================== RUTAS DE LAS FUENTES ==================
+BASE_DIR = Path(__file__).resolve().parent
+
+# UEV_DIR_DATOS apunta el tablero a otra carpeta con los mismos tres CSV
+# (por ejemplo, un juego generado con benchmarks/generar_datos.py).
+DIR_DATOS = Path(os.environ.get("UEV_DIR_DATOS") or BASE_DIR)
+
+RUTA_MATRICULAS = DIR_DATOS / "matriculaslimpias.csv"
+RUTA_DOCENTES = DIR_DATOS / "docenteslimpios.csv"
+RUTA_SOPORTE = DIR_DATOS / "soporte_atenciones_focus.csv"
+
+# Cada juego de datos tiene su propio almacén columnar, junto a sus CSV.
+almacen.DIR_ALMACEN = DIR_DATOS / ".almacen"
+
+
+# ================== ESQUEMA TIPADO ==================
+# Identificadores y dimensiones se guardan como categóricas: un diccionario
+# de valores únicos más códigos enteros (ver codificacion.py).
+CODIFICADA = "category"
+
+TIPOS_MATRICULAS = {
+    "id_estudiante": CODIFICADA,
+    "id_curso": CODIFICADA,
+    "semestre": CODIFICADA,
+    "facultad": CODIFICADA,
+    "programa": CODIFICADA,
+    "modalidad": CODIFICADA,
+    "subperiodo": CODIFICADA,
+    "estado_academico": CODIFICADA,
+    "nota_final": "float32",
+}
+FECHAS_MATRICULAS = {"fecha_matricula": "%d/%m/%Y"}
+
+TIPOS_DOCENTES = {
+    "id_curso": CODIFICADA,
+    "nombre_curso": CODIFICADA,
+    "id_docente": CODIFICADA,
+    "semestre": CODIFICADA,
+    "facultad": CODIFICADA,
+    "programa": CODIFICADA,
+    "antiguedad_docente_semestres": "int16",
+    "curso_entregado": "int8",
+    "creditos": "int8",
+}
+
+TIPOS_SOPORTE = {
+    "id_caso": CODIFICADA,
+    "semestre": CODIFICADA,
+    "facultad": CODIFICADA,
+    "programa": CODIFICADA,
+    "motivo": CODIFICADA,
+    "tipo_atencion": CODIFICADA,
+    "tiempo_respuesta_horas": "float64",
+    "satisfaccion_estudiante": "int8",
+    "region": CODIFICADA,
+}
+FECHAS_SOPORTE = {"fecha_solicitud": "%d/%m/%Y"}
+
+
+# ================== COLUMNAS DERIVADAS ==================
+def agregar_indicadores(mat):
+    """Materializa una sola vez los indicadores de resultado por matrícula."""
+    mat["es_desercion"] = mat["estado_academico"] == "Cancelado"
+    mat["es_reprob"] = mat["estado_academico"] == "Reprobado"
+    mat["es_desercion_o_reprob"] = mat["es_desercion"] | mat["es_reprob"]
+    return mat
+
+
+def preparar_matriculas(mat):
+    return agregar_indicadores(normalizar_etiquetas(mat))
+
+
+# ================== REGISTRO DE FUENTES ==================
+FUENTES = {
+    "matriculas": {
+        "ruta": RUTA_MATRICULAS,
+        "tipos": TIPOS_MATRICULAS,
+        "fechas": FECHAS_MATRICULAS,
+        "derivar": preparar_matriculas,
+    },
+    "docentes": {
+        "ruta": RUTA_DOCENTES,
+        "tipos": TIPOS_DOCENTES,
+        "derivar": normalizar_etiquetas,
+    },
+    "soporte": {
+        "ruta": RUTA_SOPORTE,
+        "tipos": TIPOS_SOPORTE,
+        "fechas": FECHAS_SOPORTE,
+        "derivar": normalizar_etiquetas,
+    },
+}
+
+
+# ================== LECTURA DESDE EL ALMACÉN COLUMNAR (SIN CACHÉ) ==================
+def leer_fuente(nombre, ruta=None):
+    """Lee una fuente registrada; ``ruta`` permite apuntar a otro CSV con el mismo esquema."""
+    fuente = FUENTES[nombre]
+    return almacen.leer_tabla(
+        nombre,
+        ruta or fuente["ruta"],
+        fuente["tipos"],
+        fuente.get("fechas"),
+        fuente.get("derivar"),
+    )
+
+
+def leer_matriculas():
+    return leer_fuente("matriculas")
+
+
+def leer_docentes():
+    return leer_fuente("docentes")
+
+
+def leer_soporte():
+    return leer_fuente("soporte")
+
+
+# ================== TABLAS DERIVADAS ==================
+# Dimensiones de los filtros multiselect de cada tabla (ver facetas.py).
+FACETAS = {
+    "hechos_matricula": ["semestre", "facultad", "programa", "modalidad"],
+    "matriculas": ["semestre", "facultad", "programa"],
+    "soporte": ["semestre", "facultad", "programa", "region"],
+}
+
+# Derivada del almacén -> (tablas de origen, versión). Lo comparten las
+# lecturas de abajo y la ingesta incremental (ingesta.py), que guarda las
+# derivadas ya actualizadas con la misma huella.
+DERIVADAS = {
+    "hechos_matricula": (["matriculas", "docentes"], hechos.VERSION_HECHOS),
+    "cubo_matriculas": (["matriculas"], cubo.VERSION_CUBO),
+    "cubo_soporte": (["soporte"], cubo.VERSION_CUBO_SOPORTE),
+    **{
+        f"facetas_{nombre}": ([nombre], [facetas.VERSION_FACETAS, *dimensiones])
+        for nombre, dimensiones in FACETAS.items()
+    },
+}
+
+
+def leer_derivada(nombre, construir, *tablas):
+    """Derivada de ``tablas`` (sus orígenes ya cargados, en el orden de ``DERIVADAS``)."""
+    origenes, version = DERIVADAS[nombre]
+    versiones = {o: almacen.version_de(df) for o, df in zip(origenes, tablas)}
+    return almacen.leer_derivada(nombre, versiones, construir, version=version)
+
+
+def leer_hechos(mat, doc):
+    """Tabla de hechos matrícula × curso × docente (ver hechos.py)."""
+    return leer_derivada("hechos_matricula", lambda: hechos.construir_hechos(mat, doc), mat, doc)
+
+
+def leer_cubo(mat):
+    """Cubo preagregado de matrículas (ver cubo.py)."""
+    return leer_derivada("cubo_matriculas", lambda: cubo.construir_cubo(mat), mat)
+
+
+def leer_cubo_soporte(sup):
+    """Cubo preagregado de casos de soporte (ver cubo.py)."""
+    return leer_derivada("cubo_soporte", lambda: cubo.construir_cubo_soporte(sup), sup)
+
+
+def leer_facetas(nombre, df):
+    """Índice de bitmaps de la tabla ``nombre`` del almacén, ya cargada en ``df``."""
+    return leer_derivada(
+        f"facetas_{nombre}", lambda: facetas.construir_indice(df, FACETAS[nombre]), df
+    )
+
+
+# ================== GENERACIONES ==================
+# Una generación es el juego de tablas cargado de una versión de las
+# fuentes, identificada por la firma (mtime y tamaño) de los tres CSV. Lo
+# que se guarda para una generación (claves de la caché de resultados, la
+# base DuckDB, las particiones) se identifica con la versión del almacén de
+# sus tablas tal como se cargaron (``version_datos``), nunca con la que haya
+# en disco más tarde: un lote puede llegar entre la carga y el refresco. Las
+# tablas de abajo se guardan en la caché de Streamlit bajo su generación y
+# las páginas leen siempre la vigente; el refresco (más abajo) arma la
+# siguiente sin tocar la vigente y solo al final la reemplaza.
+_candado = threading.Lock()
+_vigente = None
+_hilo = threading.local()
+_descartes = []
+
+registro = logging.getLogger("uev.datos")
+
+
+def firma_fuentes():
+    """(mtime_ns, tamaño) de cada CSV de ``FUENTES``."""
+    firmas = []
+    for fuente in FUENTES.values():
+        estado = os.stat(fuente["ruta"])
+        firmas.append((estado.st_mtime_ns, estado.st_size))
+    return tuple(firmas)
+
+
+def generacion():
+    """Generación que lee este hilo: la vigente, o la que arma el refresco."""
+    global _vigente
+    propia = getattr(_hilo, "generacion", None)
+    if propia is not None:
+        return propia
+    if _vigente is None:
+        with _candado:
+            if _vigente is None:
+                _vigente = firma_fuentes()
+    return _vigente
+
+
+@contextlib.contextmanager
+def en_generacion(valor):
+    """Dentro del bloque, este hilo lee las tablas de la generación ``valor``."""
+    anterior = getattr(_hilo, "generacion", None)
+    _hilo.generacion = valor
+    try:
+        yield
+    finally:
+        _hilo.generacion = anterior
+
+
+def al_descartar(funcion):
+    """Registra ``funcion(generacion)``, que libera lo guardado para esa generación."""
+    _descartes.append(funcion)
+    return funcion
+
+
+def cambiar_generacion(nueva):
+    """Vuelve vigente la generación ``nueva`` y descarta la anterior."""
+    global _vigente
+    generacion()
+    with _candado:
+        anterior, _vigente = _vigente, nueva
+    if anterior != nueva:
+        for descartar in _descartes:
+            descartar(anterior)
+
+
+def por_generacion(funcion):
+    """Decorador: ``funcion(generacion, *args)`` en la caché compartida.
+
+    Se llama sin la generación: la envoltura pasa la que lee el hilo y la
+    deja fija mientras corre, así que una tabla y las que carga por dentro
+    (los hechos y sus matrículas) son siempre de la misma generación.
+    """
+    cacheada = st.cache_resource(funcion)
+    llamadas = set()
+
+    @functools.wraps(funcion)
+    def envoltura(*args):
+        actual = generacion()
+        llamadas.add(args)
+        with en_generacion(actual):
+            return cacheada(actual, *args)
+
+    @al_descartar
+    def descartar(vieja):
+        for args in list(llamadas):
+            cacheada.clear(vieja, *args)
+
+    return envoltura
+
+
+# ================== CARGA COMPARTIDA POR TABLA ==================
+def _medir_carga(tabla, leer):
+    """Lee una tabla y registra sus filas y la duración de la carga (metricas.py)."""
+    inicio = time.perf_counter()
+    df = leer()
+    metricas.registrar_carga(tabla, len(df), time.perf_counter() - inicio)
+    return df
+
+
+@por_generacion
+def cargar_matriculas(generacion):
+    return _medir_carga("matriculas", leer_matriculas)
+
+
+@por_generacion
+def cargar_docentes(generacion):
+    return _medir_carga("docentes", leer_docentes)
+
+
+@por_generacion
+def cargar_soporte(generacion):
+    return _medir_carga("soporte", leer_soporte)
+
+
+@por_generacion
+def cargar_hechos(generacion):
+    mat, doc = cargar_matriculas(), cargar_docentes()
+    return _medir_carga("hechos_matricula", lambda: leer_hechos(mat, doc))
+
+
+@por_generacion
+def cargar_indice_cursos(generacion):
+    return hechos.indice_cursos(cargar_hechos())
+
+
+@por_generacion
+def cargar_cubo(generacion):
+    mat = cargar_matriculas()
+    return _medir_carga("cubo_matriculas", lambda: leer_cubo(mat))
+
+
+@por_generacion
+def cargar_cubo_soporte(generacion):
+    sup = cargar_soporte()
+    return _medir_carga("cubo_soporte", lambda: leer_cubo_soporte(sup))
+
+
+@por_generacion
+def cargar_periodos(generacion):
+    """Catálogo de periodos: los semestres con matrículas o casos de soporte.
+
+    Sale de los diccionarios de ``semestre`` de las dos tablas (ver
+    codificacion.py), que tienen solo los valores presentes: no se recorren
+    filas ni se espera a los cubos, y los encabezados salen sin demora.
+    """
+    return periodos.ordenar([
+        *diccionario(cargar_matriculas()["semestre"]),
+        *diccionario(cargar_soporte()["semestre"]),
+    ])
+
+
+def texto_periodos():
+    """Periodo de análisis para los encabezados (``2024-1 y 2024-2``)."""
+    return periodos.etiqueta(cargar_periodos())
+
+
+@por_generacion
+def cargar_facetas(generacion, nombre):
+    tablas = {
+        "hechos_matricula": cargar_hechos,
+        "matriculas": cargar_matriculas,
+        "soporte": cargar_soporte,
+    }
+    return leer_facetas(nombre, tablas[nombre]())
+
+
+def filtrar_hechos(selecciones):
+    """Filtra la tabla de hechos con el índice de facetas (dimensión -> valores)."""
+    return facetas.filtrar(cargar_hechos(), cargar_facetas("hechos_matricula"), selecciones)
+
+
+def filtrar_matriculas(selecciones):
+    return facetas.filtrar(cargar_matriculas(), cargar_facetas("matriculas"), selecciones)
+
+
+def filtrar_soporte(selecciones):
+    return facetas.filtrar(cargar_soporte(), cargar_facetas("soporte"), selecciones)
+
+
+def matriculas_del_curso(id_curso):
+    """Filas de la tabla de hechos de un curso, vía el índice por ``id_curso``."""
+    return hechos.filas_curso(cargar_hechos(), cargar_indice_cursos(), id_curso)
+
+
+def cargar_datos():
+    """Devuelve (matrículas, docentes, soporte) desde la caché compartida.
+
+    Las tres se cargan a la vez (ver ``precargar``): la espera es la de la
+    más lenta, no la suma.
+    """
+    precargar()
+    return cargar_matriculas(), cargar_docentes(), cargar_soporte()
+
+
+@por_generacion
+def version_datos(generacion):
+    """Versión de las fuentes de la generación: el hash de cada una tal como se cargó."""
+    return tuple(almacen.version_de(df) for df in cargar_datos())
+
+
+# ================== CARGA CONCURRENTE ==================
+# Leer y tipar un CSV (o mapear su archivo columnar) suelta el GIL casi todo
+# el tiempo, así que las tres fuentes y sus derivadas se cargan en hilos. Si
+# una página pide una tabla que otro hilo ya está cargando, la caché de
+# Streamlit espera ese mismo resultado (hay un candado por tabla): cada
+# página espera solo sus tablas, no la fuente más lenta.
+PRECARGAS = [
+    cargar_matriculas,
+    cargar_docentes,
+    cargar_soporte,
+    cargar_cubo,
+    cargar_cubo_soporte,
+    cargar_hechos,
+    lambda: cargar_facetas("hechos_matricula"),
+    lambda: cargar_facetas("matriculas"),
+    lambda: cargar_facetas("soporte"),
+]
+
+_precarga = None
+
+
+def cargar_en_hilos(valor):
+    """Lanza en hilos todas las cargas de ``PRECARGAS`` para la generación ``valor``."""
+    def cargar(carga):
+        with en_generacion(valor):
+            return carga()
+
+    # Un hilo por carga: una derivada que espera a su fuente no deja a otra
+    # carga sin hilo.
+    ejecutor = ThreadPoolExecutor(max_workers=len(PRECARGAS), thread_name_prefix="uev-carga")
+    futuros = [ejecutor.submit(cargar, carga) for carga in PRECARGAS]
+    ejecutor.shutdown(wait=False)
+    return futuros
+
+
+def precargar():
+    """Empieza a cargar en hilos todas las tablas (una vez por proceso).
+
+    También arranca el refresco en segundo plano. Devuelve los futuros de
+    cada carga; no hace falta esperarlos, porque ``cargar_*`` ya espera la
+    carga en curso de su tabla.
+    """
+    global _precarga
+    actual = generacion()
+    with _candado:
+        if _precarga is None:
+            _precarga = cargar_en_hilos(actual)
+            if INTERVALO_REFRESCO > 0:
+                threading.Thread(target=_refrescar_siempre, name="uev-refresco", daemon=True).start()
+    return _precarga
+
+
+# ================== REFRESCO EN SEGUNDO PLANO ==================
+# Cada ``UEV_REFRESCO`` segundos (30 por defecto; 0 lo apaga) se compara la
+# firma de los CSV con la de la generación vigente. Si cambió (se reemplazó
+# un archivo o llegó un lote de ``ingesta.py``), la generación nueva se arma
+# en este hilo: fuentes al almacén, hechos, cubos, índices y el motor de
+# cálculo. Mientras tanto las páginas siguen con la anterior, y la caché de
+# resultados, que lleva la versión de los datos en la clave, sigue
+# sirviendo lo ya calculado. Al terminar, la nueva pasa a ser la vigente de
+# una vez y las tablas de la anterior se liberan.
+INTERVALO_REFRESCO = float(os.environ.get("UEV_REFRESCO") or 30)
+
+
+def construir_generacion(nueva):
+    """Carga todas las tablas de la generación ``nueva`` y prepara el motor de cálculo."""
+    import motores  # motores importa los motores, que importan este módulo
+
+    for futuro in cargar_en_hilos(nueva):
+        futuro.result()
+    with en_generacion(nueva):
+        version_datos()
+        motores.preparar()
+
+
+def refrescar():
+    """Si cambió alguna fuente, arma la generación nueva y la vuelve vigente.
+
+    Devuelve si hubo cambio.
+    """
+    nueva = firma_fuentes()
+    if nueva == generacion():
+        return False
+    inicio = time.perf_counter()
+    construir_generacion(nueva)
+    cambiar_generacion(nueva)
+    metricas.registrar_refresco(time.perf_counter() - inicio)
+    return True
+
+
+def _refrescar_siempre():
+    while True:
+        time.sleep(INTERVALO_REFRESCO)
+        try:
+            refrescar()
+        except Exception:
+            # Un CSV a medio copiar o un lote inválido: se reintenta en la
+            # próxima vuelta y la generación vigente sigue sirviendo.
+            metricas.registrar_refresco(None)
+            registro.exception("No se pudo refrescar los datos")
+
+
+# ================== INGESTA MANUAL ==================
+if __name__ == "__main__":
+    # python datos.py -> convierte (o valida) los tres CSV en el almacén columnar
+    for nombre in FUENTES:
+        print(f"{nombre}: {len(leer_fuente(nombre)):,} filas")
@@ -0,0 +1,261 @@
+"""Estados parciales de agregación que se combinan sin volver a leer filas.
+
+Los indicadores del tablero son conteos, promedios y tasas por grupo. En
+lugar de calcularlos de una vez sobre todas las filas, ``parcial`` resume
+un trozo de la tabla (una partición, un lote nuevo, el trabajo de un
+proceso) en un estado por grupo:
+
+- ``filas``: filas del grupo;
+- por cada medida numérica, ``n`` (valores no nulos), ``suma``, ``suma2``
+  (suma de cuadrados), ``min`` y ``max``;
+- por cada columna de conteo distinto, los pares (grupo, valor) únicos,
+  codificados como enteros.
+
+``combinar`` une estados de trozos disjuntos: suma conteos y sumas, toma
+el mínimo de los mínimos y el máximo de los máximos, y une los pares
+distintos. El resultado es el mismo estado que daría ``parcial`` sobre la
+unión de las filas, y de él salen media, varianza y tasas exactas (una
+tasa es la media de una columna booleana). Los conteos distintos necesitan
+los pares porque no se pueden sumar entre trozos: un estudiante puede
+estar en dos particiones.
+
+El cubo (``cubo.py``) es la versión preagregada y guardada de la misma
+idea para las dimensiones de los filtros: solo sumas y conteos, que es lo
+que necesitan sus indicadores.
+"""
+import numpy as np
+import pandas as pd
+
+from codificacion import claves, concatenar
+
+
+ESTADISTICOS = ["n", "suma", "suma2", "min", "max"]
+
+# Cómo se combina cada estadístico entre trozos.
+COMBINACION = {"n": "sum", "suma": "sum", "suma2": "sum", "min": "min", "max": "max"}
+
+
+class Estado:
+    """Estado de agregación por grupo de ``claves`` (ver el módulo)."""
+
+    def __init__(self, claves, momentos, distintos):
+        self.claves = list(claves)
+        # Una fila por grupo, indexada por las claves: ``filas`` y
+        # ``<medida>__<estadístico>`` por cada medida.
+        self.momentos = momentos
+        # Columna -> DataFrame con los pares únicos (``grupo``, columna);
+        # ``grupo`` es la posición del grupo en ``momentos``.
+        self.distintos = distintos
+
+    @property
+    def medidas(self):
+        return [c.rsplit("__", 1)[0] for c in self.momentos.columns if c.endswith("__n")]
+
+
+def _columna(medida, estadistico):
+    return f"{medida}__{estadistico}"
+
+
+def _codigos(serie):
+    """Códigos enteros de la columna (-1 para nulos) y sus valores distintos, en orden."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return claves(serie).astype(np.int64), serie.cat.categories
+    codigos, valores = pd.factorize(serie, sort=True)
+    return codigos.astype(np.int64), valores
+
+
+def _agrupar(df, claves):
+    """Grupo de cada fila (-1 si alguna clave es nula) y el índice de los grupos.
+
+    Igual que ``groupby(claves, observed=True)`` con grupos en orden de
+    claves, pero combinando los códigos enteros de cada clave en uno solo,
+    sin pasar por ``ngroup`` (que en pandas cuesta el doble que agrupar).
+    """
+    combinado = np.zeros(len(df), dtype=np.int64)
+    validas = np.ones(len(df), dtype=bool)
+    combinaciones = 1
+    for clave in claves:
+        codigos, valores = _codigos(df[clave])
+        validas &= codigos >= 0
+        if combinaciones > (2 ** 62) // (len(valores) + 1):
+            # Sin lugar para otra clave: se renumeran las combinaciones vistas.
+            combinado, vistas = pd.factorize(combinado, sort=True)
+            combinado, combinaciones = combinado.astype(np.int64), len(vistas)
+        combinado = combinado * len(valores) + np.maximum(codigos, 0)
+        combinaciones *= max(len(valores), 1)
+    completas = bool(validas.all())
+    if not completas:
+        combinado = combinado[validas]
+    if combinaciones <= 4 * len(df) + 1024:
+        # Pocas combinaciones posibles: basta con numerar las observadas.
+        observadas = np.bincount(combinado, minlength=combinaciones) > 0
+        grupos = (np.cumsum(observadas) - 1)[combinado]
+        n_grupos = int(observadas.sum())
+    else:
+        grupos, unicos = pd.factorize(combinado, sort=True)
+        n_grupos = len(unicos)
+    if completas:
+        todos, filas = grupos, np.arange(len(df))
+    else:
+        todos = np.full(len(df), -1, dtype=np.int64)
+        todos[validas] = grupos
+        filas = np.flatnonzero(validas)
+    # La primera fila de cada grupo da el valor de cada clave (al asignar
+    # en orden inverso, gana la primera aparición).
+    primera = np.empty(n_grupos, dtype=np.int64)
+    primera[grupos[::-1]] = filas[::-1]
+    arreglos = [df[clave].iloc[primera] for clave in claves]
+    if len(claves) == 1:
+        indice = pd.Index(arreglos[0], name=claves[0])
+    else:
+        indice = pd.MultiIndex.from_arrays(arreglos, names=claves)
+    return todos, indice
+
+
+def _pares(grupos, serie):
+    """Pares únicos (grupo, valor) de las filas con grupo y valor no nulos."""
+    codigos, valores = _codigos(serie)
+    validas = (grupos >= 0) & (codigos >= 0)
+    # Cada par se codifica en un solo entero para deduplicar con un hash.
+    base = len(valores) + 1
+    unicos = pd.unique(grupos[validas].astype(np.int64) * base + codigos[validas])
+    return pd.DataFrame({
+        "grupo": (unicos // base).astype(np.int32),
+        serie.name: pd.Categorical.from_codes(unicos % base, categories=valores),
+    })
+
+
+# ================== CONSTRUCCIÓN ==================
+def parcial(df, claves, medidas=(), distintos=()):
+    """Estado de las filas de ``df`` agrupadas por ``claves``.
+
+    Como ``groupby(..., observed=True)``: los grupos con alguna clave nula
+    no se cuentan.
+    """
+    claves = list(claves)
+    grupos, indice = _agrupar(df, claves)
+    n_grupos = len(indice)
+    en_grupo = grupos >= 0
+    completas = bool(en_grupo.all())
+    if not completas:
+        grupos_validos = grupos[en_grupo]
+
+    momentos = {"filas": np.bincount(grupos if completas else grupos_validos, minlength=n_grupos)}
+    for m in medidas:
+        valores = df[m].to_numpy(dtype=np.float64, na_value=np.nan)
+        nulos = np.isnan(valores)
+        if completas and not nulos.any():
+            # Caso habitual: sin claves ni valores nulos, no hace falta filtrar.
+            g, v = grupos, valores
+        else:
+            validas = en_grupo & ~nulos
+            g, v = grupos[validas], valores[validas]
+        n = np.bincount(g, minlength=n_grupos)
+        minimo = np.full(n_grupos, np.inf)
+        maximo = np.full(n_grupos, -np.inf)
+        np.minimum.at(minimo, g, v)
+        np.maximum.at(maximo, g, v)
+        momentos[_columna(m, "n")] = n
+        momentos[_columna(m, "suma")] = np.bincount(g, weights=v, minlength=n_grupos)
+        momentos[_columna(m, "suma2")] = np.bincount(g, weights=v * v, minlength=n_grupos)
+        momentos[_columna(m, "min")] = np.where(n > 0, minimo, np.nan)
+        momentos[_columna(m, "max")] = np.where(n > 0, maximo, np.nan)
+    momentos = pd.DataFrame(momentos, index=indice)
+    pares = {c: _pares(grupos, df[c]) for c in distintos}
+    return Estado(claves, momentos, pares)
+
+
+def combinar(estados, disjuntos=False):
+    """Estado de la unión de las filas de ``estados`` (trozos disjuntos, mismas claves).
+
+    Con ``disjuntos`` los trozos tampoco comparten grupos (se partieron por
+    una de las claves): los grupos solo se unen y ordenan, sin agregarlos
+    de nuevo, y sus pares distintos ya son únicos.
+    """
+    estados = list(estados)
+    primero = estados[0]
+    if len(estados) == 1:
+        return primero
+    claves = primero.claves
+    # Los trozos pueden traer diccionarios distintos en sus categóricas (un
+    # lote con un programa nuevo): se alinean antes de unirlos.
+    momentos = concatenar(*(e.momentos.reset_index() for e in estados))
+    if disjuntos:
+        # Cada grupo aparece en un solo trozo: basta ordenar, recordando de
+        # qué fila de la concatenación viene cada grupo.
+        momentos = momentos.assign(_fila=np.arange(len(momentos))).set_index(claves).sort_index()
+        posiciones = np.empty(len(momentos), dtype=np.int64)
+        posiciones[momentos.pop("_fila").to_numpy()] = np.arange(len(momentos))
+        inicios = np.cumsum([0] + [len(e.momentos) for e in estados])
+        traducciones = [posiciones[i:j] for i, j in zip(inicios[:-1], inicios[1:])]
+    else:
+        reglas = {"filas": "sum"}
+        for m in primero.medidas:
+            reglas.update({_columna(m, e): COMBINACION[e] for e in ESTADISTICOS})
+        momentos = momentos.groupby(claves, observed=True).agg(reglas)
+        traducciones = [momentos.index.get_indexer(e.momentos.index) for e in estados]
+
+    pares = {}
+    for c in primero.distintos:
+        # Los grupos de cada trozo se traducen a posiciones del estado combinado.
+        partes = [
+            e.distintos[c].assign(grupo=traduccion[e.distintos[c]["grupo"]])
+            for e, traduccion in zip(estados, traducciones)
+        ]
+        valores = partes[0][c].cat.categories
+        if all(p[c].cat.categories.equals(valores) for p in partes[1:]):
+            # Trozos de una misma tabla: mismo diccionario, se unen los códigos
+            # sin recodificar (unir categóricas calcula el hash del diccionario).
+            unidos = pd.DataFrame({
+                "grupo": np.concatenate([p["grupo"].to_numpy() for p in partes]),
+                c: pd.Categorical.from_codes(
+                    np.concatenate([p[c].cat.codes.to_numpy() for p in partes]), categories=valores
+                ),
+            })
+        else:
+            unidos = concatenar(*partes)
+        pares[c] = unidos if disjuntos else _pares(unidos["grupo"].to_numpy(), unidos[c])
+    return Estado(claves, momentos, pares)
+
+
+# ================== RESULTADOS ==================
+def filas(estado):
+    return estado.momentos["filas"]
+
+
+def conteo(estado, medida):
+    return estado.momentos[_columna(medida, "n")]
+
+
+def suma(estado, medida):
+    return estado.momentos[_columna(medida, "suma")]
+
+
+def media(estado, medida):
+    """Media por grupo (``NaN`` si el grupo no tiene valores)."""
+    return suma(estado, medida) / conteo(estado, medida).replace(0, np.nan)
+
+
+def varianza(estado, medida, ddof=1):
+    n = conteo(estado, medida)
+    s = suma(estado, medida)
+    resultado = (estado.momentos[_columna(medida, "suma2")] - s * s / n.replace(0, np.nan)) / (n - ddof)
+    # Los errores de redondeo pueden dar un valor apenas negativo.
+    return resultado.where(n > ddof).clip(lower=0)
+
+
+def minimo(estado, medida):
+    return estado.momentos[_columna(medida, "min")]
+
+
+def maximo(estado, medida):
+    return estado.momentos[_columna(medida, "max")]
+
+
+def distintos(estado, columna):
+    """Valores distintos (no nulos) de ``columna`` por grupo."""
+    grupos = estado.distintos[columna]["grupo"].to_numpy()
+    return pd.Series(
+        np.bincount(grupos, minlength=len(estado.momentos)),
+        index=estado.momentos.index,
+    )
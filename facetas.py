@@ -0,0 +1,114 @@
+"""Índice de facetas con bitmaps empaquetados para los filtros multiselect.
+
+Para cada dimensión de filtro y cada valor distinto se precalcula un bitmap
+(un bit por fila, empaquetado en ``uint8``) que marca las filas con ese
+valor. Una selección se resuelve con OR de los bitmaps dentro de cada
+dimensión y AND entre dimensiones, operando sobre ``n / 8`` bytes en lugar
+de comparar ``n`` valores por cada ``isin``. Las dimensiones con todos sus
+valores seleccionados (el caso por defecto) ni siquiera se evalúan.
+
+El índice se guarda como tabla derivada del almacén: es un DataFrame con
+una columna ``"dimension=valor"`` por bitmap, todas del mismo largo, que
+se mapea en memoria y se comparte entre procesos como las demás tablas.
+"""
+import numpy as np
+import pandas as pd
+
+from codificacion import claves
+
+
+SEPARADOR = "="
+
+# Marca de la columna que reúne las filas con la dimensión nula.
+NULO = "\x00nulo"
+
+# Cambiar este número obliga a reconstruir los índices guardados.
+VERSION_FACETAS = 1
+
+
+# ================== CONSTRUCCIÓN ==================
+def construir_indice(df, dimensiones):
+    """Bitmap empaquetado por cada valor de cada dimensión categórica."""
+    bitmaps = {}
+    for dimension in dimensiones:
+        codigos = claves(df[dimension])
+        for k, valor in enumerate(df[dimension].cat.categories):
+            bitmaps[f"{dimension}{SEPARADOR}{valor}"] = np.packbits(codigos == k)
+        nulos = codigos < 0
+        if nulos.any():
+            bitmaps[f"{dimension}{SEPARADOR}{NULO}"] = np.packbits(nulos)
+    return pd.DataFrame(bitmaps)
+
+
+def anexar_indice(indice, n_anteriores, lote, dimensiones):
+    """Índice de la tabla con ``lote`` agregado al final de sus ``n_anteriores`` filas.
+
+    ``lote`` debe tener ya los diccionarios alineados con la tabla completa
+    (``codificacion.alinear_diccionarios``): los valores nuevos reciben un
+    bitmap con ceros en las filas anteriores y el resultado es igual al que
+    daría ``construir_indice`` sobre la tabla completa.
+    """
+    vacio = np.zeros(n_anteriores, dtype=bool)
+
+    def extender(columna, bits_lote):
+        anteriores = vacio
+        if columna in indice.columns:
+            anteriores = np.unpackbits(indice[columna].to_numpy(), count=n_anteriores).astype(bool)
+        return np.packbits(np.concatenate([anteriores, bits_lote]))
+
+    bitmaps = {}
+    for dimension in dimensiones:
+        codigos = claves(lote[dimension])
+        for k, valor in enumerate(lote[dimension].cat.categories):
+            columna = f"{dimension}{SEPARADOR}{valor}"
+            bitmaps[columna] = extender(columna, codigos == k)
+        columna = f"{dimension}{SEPARADOR}{NULO}"
+        nulos = codigos < 0
+        if nulos.any() or columna in indice.columns:
+            bitmaps[columna] = extender(columna, nulos)
+    return pd.DataFrame(bitmaps)
+
+
+def _por_dimension(indice):
+    dimensiones = {}
+    for columna in indice.columns:
+        dimension, valor = columna.split(SEPARADOR, 1)
+        dimensiones.setdefault(dimension, {})[valor] = columna
+    return dimensiones
+
+
+# ================== CONSULTA ==================
+def mascara(indice, n_filas, selecciones):
+    """Máscara booleana de las filas que cumplen todas las selecciones.
+
+    ``selecciones`` es un diccionario dimensión -> valores elegidos, con la
+    misma semántica que encadenar ``df[dim].isin(valores)`` con ``&``.
+    Devuelve ``None`` si ninguna dimensión restringe (todas las filas pasan).
+    """
+    dimensiones = _por_dimension(indice)
+    resultado = None
+    for dimension, elegidos in selecciones.items():
+        columnas = dimensiones[dimension]
+        valores = {v for v in columnas if v != NULO}
+        elegidos = set(elegidos)
+        if NULO not in columnas and valores <= elegidos:
+            continue
+        presentes = [columnas[v] for v in elegidos if v in columnas and v != NULO]
+        if presentes:
+            bits = np.bitwise_or.reduce(
+                [indice[c].to_numpy() for c in presentes]
+            )
+        else:
+            bits = np.zeros(len(indice), dtype=np.uint8)
+        resultado = bits if resultado is None else resultado & bits
+    if resultado is None:
+        return None
+    return np.unpackbits(resultado, count=n_filas).astype(bool)
+
+
+def filtrar(df, indice, selecciones):
+    """Subconjunto de ``df`` según las selecciones, resuelto con el índice."""
+    filas = mascara(indice, len(df), selecciones)
+    if filas is None:
+        return df
+    return df[filas]
@@ -0,0 +1,63 @@
+"""Tabla de hechos matrícula × curso × docente.
+
+Las páginas 2 y 3 unían matrículas con docentes en cada rerun, y cada una
+con claves distintas. Aquí el cruce se hace una sola vez en la ingesta,
+siempre por ``id_curso`` (la clave del curso en ``docenteslimpios.csv``), y
+el resultado se guarda ordenado por curso para poder ubicar las matrículas
+de un curso con una búsqueda binaria sobre sus claves enteras.
+"""
+import numpy as np
+
+from codificacion import claves
+
+
+# Columnas del curso que se agregan a cada matrícula. semestre, facultad y
+# programa ya vienen en la matrícula y no se duplican.
+COLUMNAS_CURSO = [
+    "id_curso",
+    "nombre_curso",
+    "id_docente",
+    "antiguedad_docente_semestres",
+    "curso_entregado",
+    "creditos",
+]
+
+# Cambiar este número obliga a reconstruir la tabla de hechos guardada.
+VERSION_HECHOS = 2
+
+
+# ================== CONSTRUCCIÓN ==================
+def construir_hechos(mat, doc):
+    """Une cada matrícula con su curso y docente, ordenando por ``id_curso``."""
+    # La clave debe tener el mismo diccionario a ambos lados para que el
+    # cruce se haga por código y el resultado siga siendo categórico. Los
+    # cursos sin matrículas no aportan filas a un cruce por la izquierda.
+    cursos = doc[COLUMNAS_CURSO].assign(
+        id_curso=doc["id_curso"].cat.set_categories(mat["id_curso"].cat.categories)
+    )
+    cursos = cursos[cursos["id_curso"].notna()]
+    hechos = mat.merge(cursos, on="id_curso", how="left", validate="many_to_one")
+    # Se ordena por la clave entera (los nulos, con clave -1, quedan al inicio).
+    orden = np.argsort(claves(hechos["id_curso"]), kind="stable")
+    return hechos.iloc[orden].reset_index(drop=True)
+
+
+# ================== ÍNDICE POR CURSO ==================
+def indice_cursos(hechos):
+    """Posición inicial de cada curso en la tabla de hechos (por clave entera).
+
+    El arreglo tiene una entrada más que el diccionario de ``id_curso``: las
+    filas del curso con clave ``k`` son ``inicios[k]:inicios[k + 1]``.
+    """
+    codigos = claves(hechos["id_curso"])
+    total = len(hechos["id_curso"].cat.categories)
+    return np.searchsorted(codigos, np.arange(total + 1), side="left")
+
+
+def filas_curso(hechos, inicios, id_curso):
+    """Matrículas de un curso sin recorrer la tabla completa."""
+    categorias = hechos["id_curso"].cat.categories
+    posicion = categorias.get_indexer([id_curso])[0]
+    if posicion < 0:
+        return hechos.iloc[0:0]
+    return hechos.iloc[inicios[posicion]:inicios[posicion + 1]]
@@ -0,0 +1,207 @@
+"""Ingesta incremental de lotes de matrículas y casos de soporte.
+
+Cada día llegan matrículas y casos nuevos. En lugar de reemplazar el CSV y
+reconstruir todo, un lote (un CSV con el mismo encabezado que la fuente) se
+valida y se anexa:
+
+- sus líneas se agregan al final del CSV de la fuente, que sigue siendo la
+  copia completa de los datos;
+- la tabla del almacén se reescribe con las filas anteriores (leídas del
+  mapa en memoria, sin volver a interpretar el CSV) más las del lote
+  (``almacen.anexar``);
+- el índice de facetas extiende sus bitmaps con los bits del lote
+  (``facetas.anexar_indice``) y los cubos suman las celdas del lote a las
+  guardadas (``cubo.combinar``);
+- la tabla de hechos une solo el lote con los cursos y lo intercala en el
+  orden por ``id_curso``; su índice de facetas sí se recalcula, porque las
+  filas cambian de posición;
+- las particiones Hive del motor Polars reciben un archivo más por
+  partición tocada (``almacen.anexar_particiones``).
+
+Todas las derivadas quedan guardadas con la misma huella que tendrían tras
+una reconstrucción completa (``datos.DERIVADAS``), así que ninguna se vuelve
+a calcular al leerlas. La base DuckDB se regenera al abrirla, porque su
+versión cambia. Los procesos del tablero que ya estaban corriendo pasan a
+las tablas nuevas en su próximo refresco (``UEV_REFRESCO``, ver
+``datos.py``), sin reiniciarse.
+
+Uso:
+    python ingesta.py matriculas lote.csv
+    python ingesta.py soporte lote.csv
+"""
+import argparse
+import csv
+import time
+
+import numpy as np
+
+import almacen
+import cubo
+import datos
+import facetas
+import hechos
+import periodos
+from codificacion import concatenar, claves
+
+
+FUENTES = ["matriculas", "soporte"]
+
+# Columnas que toda fila del lote debe traer.
+OBLIGATORIAS = {
+    "matriculas": ["id_estudiante", "id_curso", "semestre", "facultad", "programa", "estado_academico"],
+    "soporte": ["id_caso", "semestre", "facultad", "programa"],
+}
+
+
+class ErrorIngesta(ValueError):
+    """El lote no se puede anexar; la fuente y el almacén quedan intactos."""
+
+
+# ================== VALIDACIÓN ==================
+def encabezado(ruta):
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        return next(csv.reader(archivo), [])
+
+
+def leer_lote(nombre, ruta_lote):
+    """Lote tipado con el esquema de la fuente ``nombre``."""
+    fuente = datos.FUENTES[nombre]
+    esperado = encabezado(fuente["ruta"])
+    recibido = encabezado(ruta_lote)
+    if recibido != esperado:
+        raise ErrorIngesta(
+            f"El encabezado del lote no coincide con {fuente['ruta'].name}: "
+            f"se esperaba {','.join(esperado)}"
+        )
+    try:
+        lote = almacen.leer_csv_tipado(
+            ruta_lote, fuente["tipos"], fuente.get("fechas"), fuente.get("derivar")
+        )
+    except (ValueError, TypeError) as error:
+        detalle = str(error).splitlines()[0] if str(error) else type(error).__name__
+        raise ErrorIngesta(f"El lote no cumple el esquema de {nombre}: {detalle}") from error
+    if lote.empty:
+        raise ErrorIngesta("El lote no tiene filas")
+    return lote
+
+
+def _exigir(condicion, mensaje):
+    malas = np.flatnonzero(~np.asarray(condicion, dtype=bool))
+    if len(malas):
+        # +2: la línea 1 es el encabezado.
+        lineas = ", ".join(str(i + 2) for i in malas[:5])
+        raise ErrorIngesta(f"{mensaje} ({len(malas)} filas; líneas {lineas}...)")
+
+
+def validar(nombre, lote, actual, doc=None):
+    """Revisa el lote contra las reglas de la fuente y la tabla ya guardada."""
+    for columna in OBLIGATORIAS[nombre]:
+        _exigir(lote[columna].notna(), f"{columna} vacío")
+    _exigir(
+        [periodos.clave_periodo(p)[0] == 0 for p in lote["semestre"]],
+        "semestre sin la forma AAAA-N",
+    )
+    if nombre == "matriculas":
+        _exigir(lote["id_curso"].isin(doc["id_curso"].cat.categories), "id_curso sin curso en docentes")
+        _exigir(
+            lote["estado_academico"].isin(actual["estado_academico"].cat.categories),
+            "estado_academico desconocido",
+        )
+        nota = lote["nota_final"]
+        _exigir(nota.isna() | nota.between(0, 5), "nota_final fuera de 0-5")
+    else:
+        _exigir(~lote["id_caso"].duplicated(), "id_caso repetido en el lote")
+        _exigir(~lote["id_caso"].isin(actual["id_caso"].cat.categories), "id_caso ya cargado")
+        satisfaccion = lote["satisfaccion_estudiante"]
+        _exigir(satisfaccion.between(1, 5), "satisfaccion_estudiante fuera de 1-5")
+        _exigir(lote["tiempo_respuesta_horas"] >= 0, "tiempo_respuesta_horas negativo")
+
+
+# ================== ACTUALIZACIÓN INCREMENTAL ==================
+def _guardar(nombre, df):
+    origenes, version = datos.DERIVADAS[nombre]
+    almacen.guardar_derivada(nombre, origenes, df, version)
+
+
+def _intercalar_hechos(anteriores, nuevos):
+    """Tabla de hechos de las matrículas anteriores más las del lote, por ``id_curso``.
+
+    El orden estable deja, dentro de cada curso, las filas anteriores antes
+    que las nuevas: el mismo resultado que ``hechos.construir_hechos`` sobre
+    la tabla completa.
+    """
+    unidos = concatenar(anteriores, nuevos)
+    orden = np.argsort(claves(unidos["id_curso"]), kind="stable")
+    return unidos.iloc[orden].reset_index(drop=True)
+
+
+def ingestar(nombre, ruta_lote):
+    """Valida y anexa el lote; devuelve (filas del lote, filas de la tabla completa)."""
+    if nombre not in FUENTES:
+        raise ErrorIngesta(f"{nombre!r} no admite lotes ({', '.join(FUENTES)})")
+    lote = leer_lote(nombre, ruta_lote)
+
+    # Primero todo al día con la fuente actual (sin la caché de Streamlit):
+    # las derivadas nuevas se calculan a partir de estas.
+    actual = datos.leer_fuente(nombre)
+    if nombre == "matriculas":
+        doc = datos.leer_docentes()
+        anteriores = {
+            "hechos_matricula": datos.leer_hechos(actual, doc),
+            "cubo_matriculas": datos.leer_cubo(actual),
+            "facetas_matriculas": datos.leer_facetas("matriculas", actual),
+        }
+        validar(nombre, lote, actual, doc)
+    else:
+        anteriores = {
+            "cubo_soporte": datos.leer_cubo_soporte(actual),
+            "facetas_soporte": datos.leer_facetas("soporte", actual),
+        }
+        validar(nombre, lote, actual)
+
+    origen_anterior = almacen.version_tabla(nombre)
+    completa, lote = almacen.anexar(nombre, datos.FUENTES[nombre]["ruta"], ruta_lote, lote)
+
+    _guardar(f"facetas_{nombre}", facetas.anexar_indice(
+        anteriores[f"facetas_{nombre}"], len(actual), lote, datos.FACETAS[nombre]
+    ))
+    if nombre == "matriculas":
+        _guardar("cubo_matriculas", cubo.combinar(
+            anteriores["cubo_matriculas"], cubo.construir_cubo(lote)
+        ))
+        tabla_hechos = _intercalar_hechos(
+            anteriores["hechos_matricula"], hechos.construir_hechos(lote, doc)
+        )
+        _guardar("hechos_matricula", tabla_hechos)
+        _guardar("facetas_hechos_matricula", facetas.construir_indice(
+            tabla_hechos, datos.FACETAS["hechos_matricula"]
+        ))
+    else:
+        _guardar("cubo_soporte", cubo.combinar(
+            anteriores["cubo_soporte"], cubo.construir_cubo_soporte(lote),
+            cubo.DIMENSIONES_SOPORTE, cubo.MEDIDAS_SOPORTE,
+        ))
+    almacen.anexar_particiones(nombre, almacen.PARTICIONES, lote, origen_anterior)
+    return len(lote), len(completa)
+
+
+# ================== LÍNEA DE COMANDOS ==================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fuente", choices=FUENTES)
+    parser.add_argument("lote", help="CSV con el mismo encabezado que la fuente")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    try:
+        agregadas, total = ingestar(args.fuente, args.lote)
+    except ErrorIngesta as error:
+        parser.exit(1, f"Lote rechazado: {error}\n")
+    print(
+        f"{args.fuente}: {agregadas:,} filas anexadas, {total:,} en total "
+        f"({time.perf_counter() - inicio:.2f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Métricas del proceso en formato de exposición de Prometheus.
+
+Reúne, por proceso de Streamlit:
+
+- ``uev_rerun_segundos``: histograma de la latencia de cada rerun por
+  página (lo alimenta ``perfil.cerrar()``);
+- ``uev_cache_resultados_*``: aciertos, fallos, proporción de aciertos y
+  ocupación de la caché de resultados (``resultados.py``);
+- ``uev_cache_disco_*``: aciertos, fallos y bytes de la caché de
+  resultados en disco;
+- ``uev_tabla_filas`` y ``uev_tabla_carga_segundos``: filas y duración de
+  la última carga de cada tabla del almacén;
+- ``uev_refrescos_total``, ``uev_refrescos_fallidos_total`` y
+  ``uev_refresco_segundos``: generaciones de datos armadas por el refresco
+  en segundo plano (``datos.py``) y duración del último;
+- ``uev_proceso_rss_bytes``: memoria residente del proceso (se omite si la
+  plataforma no permite leerla).
+
+La salida se activa con variables de entorno:
+
+- ``UEV_METRICAS_ARCHIVO=/ruta/uev.prom`` reescribe ese archivo (de forma
+  atómica, como mucho una vez por segundo) después de cada rerun, para el
+  *textfile collector* de node_exporter;
+- ``UEV_METRICAS_PUERTO=9464`` sirve ``/metrics`` en ese puerto local. El
+  servidor no arranca al importar el módulo: lo abre ``app.py`` con
+  ``iniciar_servidor()``, así que otros procesos que importan ``datos.py``
+  (la API, los benchmarks) no compiten por el puerto.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Límites superiores de los buckets del histograma de reruns (segundos).
+BUCKETS_RERUN = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+INTERVALO_ARCHIVO = 1.0
+
+_candado = threading.Lock()
+_reruns = {}
+_cargas = {}
+_refrescos = {"total": 0, "fallidos": 0, "segundos": 0.0}
+_ultima_escritura = 0.0
+
+
+# ================== REGISTRO ==================
+class Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.conteos[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+def observar_rerun(pagina, segundos):
+    """Registra la duración de un rerun completo de ``pagina``."""
+    with _candado:
+        _reruns.setdefault(pagina, Histograma(BUCKETS_RERUN)).observar(segundos)
+    escribir_archivo()
+
+
+def registrar_carga(tabla, filas, segundos):
+    """Filas y duración de la última carga de ``tabla`` en este proceso."""
+    with _candado:
+        _cargas[tabla] = (filas, segundos)
+
+
+def registrar_refresco(segundos):
+    """Un refresco de los datos en segundo plano; ``segundos`` es ``None`` si falló."""
+    with _candado:
+        if segundos is None:
+            _refrescos["fallidos"] += 1
+        else:
+            _refrescos["total"] += 1
+            _refrescos["segundos"] = segundos
+
+
+# ================== EXPOSICIÓN ==================
+def _etiquetas(**valores):
+    partes = []
+    for clave, valor in valores.items():
+        texto = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        partes.append(f'{clave}="{texto}"')
+    return "{" + ",".join(partes) + "}"
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def rss_bytes():
+    """Memoria residente actual (``/proc``); fuera de Linux, el pico del proceso.
+
+    ``None`` si la plataforma no ofrece ninguna de las dos.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS lo da en bytes; Linux y los BSD, en KiB.
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def texto():
+    """Todas las métricas del proceso en formato de exposición de Prometheus."""
+    import resultados
+
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+
+    with _candado:
+        reruns = {p: (list(h.conteos), h.suma, h.total) for p, h in _reruns.items()}
+        cargas = dict(_cargas)
+        refrescos = dict(_refrescos)
+
+    metrica("uev_rerun_segundos", "histogram", "Latencia de cada rerun por página.")
+    for pagina, (conteos, suma, total) in sorted(reruns.items()):
+        acumulado = 0
+        for limite, conteo in zip(BUCKETS_RERUN + ["+Inf"], conteos):
+            acumulado += conteo
+            lineas.append(f"uev_rerun_segundos_bucket{_etiquetas(pagina=pagina, le=limite)} {acumulado}")
+        lineas.append(f"uev_rerun_segundos_sum{_etiquetas(pagina=pagina)} {_numero(suma)}")
+        lineas.append(f"uev_rerun_segundos_count{_etiquetas(pagina=pagina)} {total}")
+
+    cache = resultados.estadisticas()
+    consultas = cache["aciertos"] + cache["fallos"]
+    metrica("uev_cache_resultados_aciertos_total", "counter", "Aciertos de la caché de resultados.")
+    lineas.append(f"uev_cache_resultados_aciertos_total {cache['aciertos']}")
+    metrica("uev_cache_resultados_fallos_total", "counter", "Fallos de la caché de resultados.")
+    lineas.append(f"uev_cache_resultados_fallos_total {cache['fallos']}")
+    metrica("uev_cache_resultados_ratio_aciertos", "gauge", "Aciertos sobre consultas a la caché de resultados.")
+    lineas.append(f"uev_cache_resultados_ratio_aciertos {_numero(cache['aciertos'] / consultas if consultas else 0.0)}")
+    metrica("uev_cache_resultados_entradas", "gauge", "Entradas ocupadas en la caché de resultados.")
+    lineas.append(f"uev_cache_resultados_entradas {cache['entradas']}")
+
+    disco = resultados.estadisticas_disco()
+    metrica("uev_cache_disco_aciertos_total", "counter", "Aciertos de la caché de resultados en disco.")
+    lineas.append(f"uev_cache_disco_aciertos_total {disco['aciertos']}")
+    metrica("uev_cache_disco_fallos_total", "counter", "Fallos de la caché de resultados en disco.")
+    lineas.append(f"uev_cache_disco_fallos_total {disco['fallos']}")
+    metrica("uev_cache_disco_bytes", "gauge", "Bytes ocupados por la caché de resultados en disco.")
+    lineas.append(f"uev_cache_disco_bytes {disco['bytes']}")
+
+    metrica("uev_tabla_filas", "gauge", "Filas de cada tabla cargada en el proceso.")
+    for tabla, (filas, _) in sorted(cargas.items()):
+        lineas.append(f"uev_tabla_filas{_etiquetas(tabla=tabla)} {filas}")
+    metrica("uev_tabla_carga_segundos", "gauge", "Duración de la última carga de cada tabla.")
+    for tabla, (_, segundos) in sorted(cargas.items()):
+        lineas.append(f"uev_tabla_carga_segundos{_etiquetas(tabla=tabla)} {_numero(segundos)}")
+
+    metrica("uev_refrescos_total", "counter", "Generaciones de datos armadas en segundo plano.")
+    lineas.append(f"uev_refrescos_total {refrescos['total']}")
+    metrica("uev_refrescos_fallidos_total", "counter", "Refrescos de datos que fallaron.")
+    lineas.append(f"uev_refrescos_fallidos_total {refrescos['fallidos']}")
+    metrica("uev_refresco_segundos", "gauge", "Duración del último refresco de datos.")
+    lineas.append(f"uev_refresco_segundos {_numero(refrescos['segundos'])}")
+
+    rss = rss_bytes()
+    if rss is not None:
+        metrica("uev_proceso_rss_bytes", "gauge", "Memoria residente del proceso.")
+        lineas.append(f"uev_proceso_rss_bytes {rss}")
+    return "\n".join(lineas) + "\n"
+
+
+# ================== SALIDAS ==================
+def escribir_archivo(forzar=False):
+    """Reescribe ``UEV_METRICAS_ARCHIVO`` si está configurado."""
+    global _ultima_escritura
+    ruta = os.environ.get("UEV_METRICAS_ARCHIVO")
+    if not ruta:
+        return
+    ahora = time.monotonic()
+    if not forzar and ahora - _ultima_escritura < INTERVALO_ARCHIVO:
+        return
+    _ultima_escritura = ahora
+    ruta = Path(ruta)
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+    temporal.write_text(texto(), encoding="utf-8")
+    os.replace(temporal, ruta)
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        cuerpo = texto().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+_servidor = None
+
+
+def iniciar_servidor(puerto=None):
+    """Sirve ``/metrics`` en ``127.0.0.1`` (una sola vez por proceso)."""
+    global _servidor
+    puerto = puerto or os.environ.get("UEV_METRICAS_PUERTO")
+    with _candado:
+        if _servidor is not None or not puerto:
+            return _servidor
+        _servidor = ThreadingHTTPServer(("127.0.0.1", int(puerto)), _Manejador)
+    threading.Thread(target=_servidor.serve_forever, name="uev-metricas", daemon=True).start()
+    return _servidor
+
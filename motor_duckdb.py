@@ -0,0 +1,411 @@
+"""Motor DuckDB: los agregados de ``consultas.py`` como SQL vectorizado.
+
+Las tablas del almacén (matrículas, docentes, soporte y la tabla de hechos)
+se copian una vez a una base DuckDB en disco, ``.almacen/uev-<versión>.duckdb``,
+ordenadas por semestre, facultad y programa: así los mapas de zonas
+(mínimo/máximo por grupo de filas) descartan grupos completos cuando el
+filtro es selectivo. Cada consulta aplica los filtros en el ``WHERE`` (los
+empuja al escaneo) y agrupa en el mismo plan, en varios hilos.
+
+Cada generación de datos (ver ``datos.py``) usa la base de la versión de
+sus tablas tal como se cargaron; si cambia, se construye otra base, en
+otro archivo, y la anterior se borra. Se abre en solo lectura, de modo que
+varios procesos (Streamlit, la API) la comparten. Los resultados tienen
+las mismas columnas, índice y orden que los de ``analitica.py``; las
+dimensiones vuelven como texto en lugar de categóricas.
+
+Se activa con ``UEV_MOTOR=duckdb`` (ver ``motores.py``).
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+import almacen
+import datos
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - dependencia opcional
+    duckdb = None
+
+
+# Cambiar este número obliga a reconstruir la base.
+VERSION_BASE = 1
+
+# Tabla de DuckDB -> función de datos.py que la carga.
+TABLAS = {
+    "matriculas": datos.cargar_matriculas,
+    "docentes": datos.cargar_docentes,
+    "soporte": datos.cargar_soporte,
+    "hechos_matricula": datos.cargar_hechos,
+}
+
+ORDEN_FISICO = ["semestre", "facultad", "programa"]
+
+_candado = threading.Lock()
+_bases = {}  # generación de datos.py -> conexión
+_construidas = set()  # archivos de base que armó este proceso
+_hilos = threading.local()
+
+
+# ================== BASE EN DISCO ==================
+def ruta_base():
+    """Archivo de la base para la versión de las tablas de la generación actual.
+
+    Cada versión va en su propio archivo: DuckDB reutiliza la base que el
+    proceso ya tiene abierta en una ruta, así que una base reconstruida en
+    el mismo archivo no se vería mientras quede una conexión a la anterior.
+    """
+    huella = hashlib.sha256(_version().encode("utf-8")).hexdigest()[:16]
+    return almacen.DIR_ALMACEN / f"uev-{huella}.duckdb"
+
+
+def _version():
+    # Las versiones de las tablas que copia construir_base, no las del disco:
+    # tras un lote, la generación cargada sigue siendo la anterior.
+    return json.dumps([VERSION_BASE, *(almacen.version_de(cargar()) for cargar in TABLAS.values())])
+
+
+def _version_guardada(ruta):
+    try:
+        with duckdb.connect(str(ruta), read_only=True) as con:
+            return con.execute("SELECT version FROM _version").fetchone()[0]
+    except (duckdb.Error, TypeError):
+        return None
+
+
+def construir_base(ruta):
+    """Copia las tablas cargadas a una base nueva y la deja en ``ruta``."""
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+    temporal.unlink(missing_ok=True)
+    with duckdb.connect(str(temporal)) as con:
+        for nombre, cargar in TABLAS.items():
+            df = cargar()
+            # Las categóricas se guardan como texto (DuckDB las comprime por
+            # diccionario) para comparar contra cualquier valor de filtro.
+            columnas = ", ".join(
+                f'CAST("{c}" AS VARCHAR) AS "{c}"' if str(df[c].dtype) == "category" else f'"{c}"'
+                for c in df.columns
+            )
+            orden = ", ".join(f'"{c}"' for c in ORDEN_FISICO if c in df.columns)
+            con.register("origen", df)
+            con.execute(
+                f'CREATE TABLE "{nombre}" AS SELECT {columnas} FROM origen'
+                + (f" ORDER BY {orden}" if orden else "")
+            )
+            con.unregister("origen")
+        con.execute("CREATE TABLE _version AS SELECT ? AS version", [_version()])
+    os.replace(temporal, ruta)
+
+
+def base():
+    """Conexión de solo lectura de la generación de datos actual (construye la base si hace falta)."""
+    if duckdb is None:
+        raise RuntimeError("UEV_MOTOR=duckdb requiere el paquete duckdb")
+    generacion = datos.generacion()
+    with _candado:
+        if generacion not in _bases:
+            ruta = ruta_base()
+            if _version_guardada(ruta) != _version():
+                ruta.parent.mkdir(parents=True, exist_ok=True)
+                construir_base(ruta)
+                # Solo se borran las bases que armó este proceso para
+                # generaciones anteriores: otro proceso puede estar usando
+                # (o acabando de armar) las demás. Las conexiones abiertas a
+                # las bases viejas siguen leyendo sus archivos aunque se borren.
+                for vieja in _construidas - {ruta}:
+                    vieja.unlink(missing_ok=True)
+                _construidas.clear()
+                _construidas.add(ruta)
+            _bases[generacion] = duckdb.connect(str(ruta), read_only=True)
+        return _bases[generacion]
+
+
+@datos.al_descartar
+def _descartar(generacion):
+    # Sin cerrarla: una consulta en curso puede estar usando un cursor suyo.
+    with _candado:
+        _bases.pop(generacion, None)
+
+
+def preparar():
+    """Construye (o valida) la base antes de la primera consulta."""
+    base()
+
+
+def _cursor():
+    # Una conexión de DuckDB no se comparte entre hilos: cada sesión de
+    # Streamlit (o hilo de la API) usa su propio cursor sobre la misma base.
+    actual = base()
+    if getattr(_hilos, "base", None) is not actual:
+        _hilos.cursor = actual.cursor()
+        _hilos.base = actual
+    return _hilos.cursor
+
+
+def consultar(sql, parametros=()):
+    return _cursor().execute(sql, list(parametros)).df()
+
+
+# ================== FILTROS ==================
+def donde(selecciones, claves=()):
+    """Cláusula ``WHERE`` y parámetros para las selecciones.
+
+    Igual que ``facetas.filtrar``: un valor nulo nunca está en la selección
+    y una lista vacía no deja pasar nada. ``claves`` excluye además los
+    nulos de las columnas de agrupación, como hace ``groupby`` en pandas.
+    """
+    condiciones, parametros = [], []
+    for dimension, valores in selecciones.items():
+        valores = [str(v) for v in valores]
+        if not valores:
+            condiciones.append("FALSE")
+            continue
+        condiciones.append(f'"{dimension}" IN ({", ".join("?" * len(valores))})')
+        parametros += valores
+    condiciones += [f'"{c}" IS NOT NULL' for c in claves]
+    if not condiciones:
+        return "", parametros
+    return "WHERE " + " AND ".join(condiciones), parametros
+
+
+def _sin_region(selecciones):
+    return {d: v for d, v in selecciones.items() if d != "region"}
+
+
+def _numero(valor):
+    return np.nan if valor is None else valor
+
+
+# ================== DESCRIPCIÓN GENERAL ==================
+def totales_generales(selecciones):
+    fila = consultar("""
+        SELECT
+            (SELECT count(DISTINCT id_estudiante) FROM matriculas),
+            (SELECT count(*) FROM matriculas),
+            (SELECT count(DISTINCT programa) FROM matriculas),
+            (SELECT count(DISTINCT id_curso) FROM docentes),
+            (SELECT count(DISTINCT id_docente) FROM docentes),
+            (SELECT count(DISTINCT id_caso) FROM soporte),
+            (SELECT avg(es_desercion::DOUBLE) * 100 FROM matriculas),
+            (SELECT avg(es_reprob::DOUBLE) * 100 FROM matriculas),
+            (SELECT avg(nota_final) FROM matriculas)
+    """).iloc[0].tolist()
+    claves = [
+        "estudiantes", "matriculas", "programas", "cursos", "docentes",
+        "casos_soporte", "tasa_desercion", "tasa_reprob", "nota_promedio",
+    ]
+    # La fila mezcla conteos y promedios: .tolist() deja todo en float.
+    fila[:6] = [int(valor) for valor in fila[:6]]
+    return {clave: _numero(valor) for clave, valor in zip(claves, fila)}
+
+
+# count_if devuelve HUGEINT, que llega a pandas como float64: aquí y en las
+# consultas siguientes se convierte a BIGINT para que los conteos sean
+# enteros, como en el motor de pandas.
+def programas_en_riesgo(selecciones):
+    filtro, parametros = donde(selecciones, ["programa"])
+    return consultar(f"""
+        SELECT
+            programa,
+            count(DISTINCT id_estudiante) AS estudiantes,
+            count_if(es_desercion_o_reprob)::BIGINT AS desertores,
+            count_if(es_desercion)::BIGINT AS cancelados,
+            count_if(es_reprob)::BIGINT AS reprobados,
+            count_if(es_desercion_o_reprob)::BIGINT / count(DISTINCT id_estudiante) * 100
+                AS tasa_desercion_reprob
+        FROM matriculas {filtro}
+        GROUP BY programa
+        ORDER BY tasa_desercion_reprob DESC, programa
+        LIMIT 3
+    """, parametros)
+
+
+# ================== MATRÍCULAS Y DESEMPEÑO ==================
+def resumen_matriculas(selecciones):
+    filtro, parametros = donde(selecciones)
+    matriculas, deserciones, reprobaciones, nota = consultar(f"""
+        SELECT count(*), count_if(es_desercion)::BIGINT, count_if(es_reprob)::BIGINT, avg(nota_final)
+        FROM matriculas {filtro}
+    """, parametros).iloc[0].tolist()
+    if matriculas == 0:
+        return {"matriculas": 0, "tasa_desercion": 0, "tasa_reprob": 0, "nota_promedio": 0}
+    return {
+        "matriculas": int(matriculas),
+        "tasa_desercion": deserciones / matriculas * 100,
+        "tasa_reprob": reprobaciones / matriculas * 100,
+        "nota_promedio": _numero(nota),
+    }
+
+
+def estados_por_programa(selecciones):
+    filtro, parametros = donde(selecciones, ["programa", "estado_academico"])
+    return consultar(f"""
+        SELECT programa, estado_academico, count(*) AS n
+        FROM matriculas {filtro}
+        GROUP BY programa, estado_academico
+        ORDER BY programa, estado_academico
+    """, parametros)
+
+
+def indicadores_programa(selecciones):
+    filtro, parametros = donde(selecciones, ["programa"])
+    return consultar(f"""
+        SELECT
+            programa,
+            count(*) AS matriculas,
+            count_if(es_desercion)::BIGINT AS deserciones,
+            count_if(es_reprob)::BIGINT AS reprobaciones,
+            count_if(es_desercion)::BIGINT / count(*) * 100 AS "tasa_desercion_%",
+            count_if(es_reprob)::BIGINT / count(*) * 100 AS "tasa_reprob_%"
+        FROM matriculas {filtro}
+        GROUP BY programa
+        ORDER BY "tasa_desercion_%" DESC, programa
+    """, parametros).set_index("programa")
+
+
+def indicadores_curso(selecciones):
+    filtro, parametros = donde(selecciones, ["nombre_curso"])
+    return consultar(f"""
+        SELECT
+            nombre_curso,
+            count(id_estudiante) AS matriculas,
+            count_if(es_desercion)::BIGINT AS deserciones,
+            count_if(es_reprob)::BIGINT AS reprobaciones,
+            count_if(es_desercion)::BIGINT / count(id_estudiante) * 100 AS "tasa_desercion_%",
+            count_if(es_reprob)::BIGINT / count(id_estudiante) * 100 AS "tasa_reprob_%"
+        FROM hechos_matricula {filtro}
+        GROUP BY nombre_curso
+        ORDER BY nombre_curso
+    """, parametros)
+
+
+def segmentos_riesgo(selecciones):
+    filtro, parametros = donde(selecciones, ["modalidad", "subperiodo"])
+    return consultar(f"""
+        SELECT
+            modalidad,
+            subperiodo,
+            count(*) AS matriculas,
+            count_if(es_desercion_o_reprob)::BIGINT AS deserciones,
+            count_if(es_desercion_o_reprob)::BIGINT / count(*) * 100 AS "tasa_desercion_reprob_%"
+        FROM matriculas {filtro}
+        GROUP BY modalidad, subperiodo
+        ORDER BY modalidad, subperiodo
+    """, parametros)
+
+
+# ================== DOCENTES Y CURSOS ==================
+def agregar_curso_docente(selecciones):
+    claves = ["id_curso", "nombre_curso", "id_docente", "facultad", "programa",
+              "antiguedad_docente_semestres"]
+    filtro, parametros = donde(selecciones, claves)
+    grupo = ", ".join(claves)
+    return consultar(f"""
+        SELECT
+            {grupo},
+            count(DISTINCT id_estudiante) AS estudiantes,
+            avg(nota_final) AS nota_promedio,
+            avg(es_reprob::DOUBLE) * 100 AS tasa_reprobacion,
+            avg(es_desercion::DOUBLE) * 100 AS tasa_desercion
+        FROM hechos_matricula {filtro}
+        GROUP BY {grupo}
+        ORDER BY {grupo}
+    """, parametros)
+
+
+def agregar_docente(selecciones):
+    claves = ["id_docente", "facultad", "antiguedad_docente_semestres"]
+    filtro, parametros = donde(selecciones, claves)
+    grupo = ", ".join(claves)
+    return consultar(f"""
+        SELECT
+            {grupo},
+            count(DISTINCT id_curso) AS cursos,
+            count(DISTINCT id_estudiante) AS estudiantes,
+            avg(nota_final) AS nota_promedio,
+            avg(es_reprob::DOUBLE) * 100 AS tasa_reprobacion,
+            avg(es_desercion::DOUBLE) * 100 AS tasa_desercion
+        FROM hechos_matricula {filtro}
+        GROUP BY {grupo}
+        ORDER BY {grupo}
+    """, parametros)
+
+
+# ================== SOPORTE Y ATENCIONES ==================
+def resumen_soporte(selecciones):
+    filtro_sup, parametros_sup = donde(selecciones)
+    filtro_mat, parametros_mat = donde(_sin_region(selecciones))
+    casos, tiempo, satisfaccion, matriculas, deserciones = consultar(f"""
+        SELECT s.*, m.*
+        FROM (SELECT count(*), avg(tiempo_respuesta_horas), avg(satisfaccion_estudiante)
+              FROM soporte {filtro_sup}) AS s,
+             (SELECT count(*), count_if(es_desercion)::BIGINT FROM matriculas {filtro_mat}) AS m
+    """, parametros_sup + parametros_mat).iloc[0].tolist()
+    return {
+        "casos": int(casos),
+        "tiempo_respuesta": _numero(tiempo) if casos > 0 else 0,
+        "satisfaccion": _numero(satisfaccion) if casos > 0 else 0,
+        "tasa_desercion": deserciones / matriculas * 100 if matriculas > 0 else 0,
+    }
+
+
+def agregar_motivos(selecciones):
+    filtro, parametros = donde(selecciones, ["motivo"])
+    return consultar(f"""
+        SELECT motivo, count(*) AS casos
+        FROM soporte {filtro}
+        GROUP BY motivo
+        ORDER BY casos DESC, motivo
+    """, parametros)
+
+
+def agregar_tipo_atencion(selecciones):
+    filtro, parametros = donde(selecciones, ["tipo_atencion"])
+    return consultar(f"""
+        SELECT tipo_atencion, avg(tiempo_respuesta_horas) AS tiempo_respuesta_horas
+        FROM soporte {filtro}
+        GROUP BY tipo_atencion
+        ORDER BY tipo_atencion
+    """, parametros)
+
+
+def agregar_satisfaccion_region(selecciones):
+    filtro, parametros = donde(selecciones, ["region"])
+    return consultar(f"""
+        SELECT region, avg(satisfaccion_estudiante) AS satisfaccion_estudiante
+        FROM soporte {filtro}
+        GROUP BY region
+        ORDER BY region
+    """, parametros)
+
+
+def cruzar_segmentos(selecciones):
+    claves = ["semestre", "facultad", "programa"]
+    filtro_mat, parametros_mat = donde(_sin_region(selecciones), claves)
+    filtro_sup, parametros_sup = donde(selecciones, claves)
+    return consultar(f"""
+        WITH mat_seg AS (
+            SELECT semestre, facultad, programa,
+                   count(id_estudiante) AS matriculas,
+                   count_if(es_desercion)::BIGINT AS desertores
+            FROM matriculas {filtro_mat}
+            GROUP BY semestre, facultad, programa
+        ), sup_seg AS (
+            SELECT semestre, facultad, programa,
+                   count(id_caso) AS casos_soporte,
+                   avg(tiempo_respuesta_horas) AS tiempo_resp_prom,
+                   avg(satisfaccion_estudiante) AS satis_prom
+            FROM soporte {filtro_sup}
+            GROUP BY semestre, facultad, programa
+        )
+        SELECT
+            semestre, facultad, programa, matriculas, desertores,
+            desertores / matriculas * 100 AS "tasa_desercion_%",
+            casos_soporte, tiempo_resp_prom, satis_prom
+        FROM mat_seg JOIN sup_seg USING (semestre, facultad, programa)
+        ORDER BY semestre, facultad, programa
+    """, parametros_mat + parametros_sup)
@@ -0,0 +1,233 @@
+"""Motor paralelo: los agregados por filas más pesados, repartidos en procesos.
+
+Las tablas por curso-docente y por docente (página 3) y el cruce de
+segmentos de matrícula y soporte (página 4) agrupan todas las filas
+filtradas en el hilo de la sesión. Aquí cada consulta se parte en
+``UEV_PROCESOS`` particiones, cada proceso del pool calcula el estado
+parcial de la suya (``estados.py``) y el proceso principal los combina; el
+resultado es el mismo que el de ``analitica.py``.
+
+La partición la elige ``UEV_PARTICION``:
+
+- ``id_curso`` (por defecto): hash del curso (el código de su diccionario
+  módulo el número de particiones); reparte parejo. El soporte, que no
+  tiene curso, se reparte por ``id_caso``;
+- ``semestre`` o ``facultad``: una partición por valor (o grupo de valores);
+  con menos valores que procesos, algunos quedan sin trabajo.
+
+Los procesos del pool no reciben filas: cada uno abre las tablas del
+almacén por su cuenta (mapeadas en memoria, así que las páginas se
+comparten con el proceso principal) y solo recibe la selección y el número
+de su partición. Devuelve su estado parcial, que ocupa una fracción de las
+filas, junto con la versión de las tablas que leyó: si llegó un lote y el
+proceso del pool ya leyó las nuevas mientras el principal sigue con las
+anteriores, ese pedido se calcula en el proceso principal. Arrancan con ``spawn`` (el tablero y la API tienen hilos, que no
+sobreviven a un ``fork``) y cargan sus tablas al iniciar.
+
+Se activa con ``UEV_MOTOR=paralelo`` (ver ``motores.py``); las demás
+consultas siguen en pandas. Con ``UEV_PROCESOS=1`` todo corre en el
+proceso principal, sin pool.
+"""
+import contextlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import analitica
+import datos
+import estados
+from codificacion import claves
+
+
+PROCESOS = max(int(os.environ.get("UEV_PROCESOS") or os.cpu_count() or 1), 1)
+
+PARTICION = (os.environ.get("UEV_PARTICION") or "id_curso").strip().lower()
+
+# Criterio de partición -> columna que lo implementa en cada tabla.
+PARTICIONES = {
+    "id_curso": {"hechos_matricula": "id_curso", "matriculas": "id_curso", "soporte": "id_caso"},
+    "semestre": {"hechos_matricula": "semestre", "matriculas": "semestre", "soporte": "semestre"},
+    "facultad": {"hechos_matricula": "facultad", "matriculas": "facultad", "soporte": "facultad"},
+}
+
+if PARTICION not in PARTICIONES:
+    raise ValueError(
+        f"UEV_PARTICION={PARTICION!r} no es una partición conocida ({', '.join(PARTICIONES)})"
+    )
+
+# Estado parcial (``analitica.ESTADOS``) -> tabla que recorre.
+TABLAS = {
+    "curso_docente": "hechos_matricula",
+    "docente": "hechos_matricula",
+    "segmentos_matricula": "matriculas",
+    "segmentos_soporte": "soporte",
+}
+
+FILTROS = {
+    "hechos_matricula": datos.filtrar_hechos,
+    "matriculas": datos.filtrar_matriculas,
+    "soporte": datos.filtrar_soporte,
+}
+
+_candado = threading.Lock()
+_pool = None
+
+
+# ================== TRABAJO DE CADA PARTICIÓN ==================
+def _iniciar():
+    """Carga en el proceso del pool las tablas e índices que usan las particiones."""
+    for nombre in FILTROS:
+        FILTROS[nombre]({})
+
+
+def _presente():
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def parcial(estado, selecciones, particion, numero, total, generacion=None):
+    """(versión de los datos, estado ``estado`` de la partición ``numero`` de ``total``).
+
+    Corre en el pool. ``generacion`` es la de las tablas del proceso
+    principal (ver ``datos.py``): si el refresco la cambió, el proceso del
+    pool también.
+    """
+    if generacion is not None:
+        datos.cambiar_generacion(generacion)
+    tabla = TABLAS[estado]
+    df = FILTROS[tabla](selecciones)
+    if total > 1:
+        codigos = claves(df[PARTICIONES[particion][tabla]])
+        # Solo se copian las columnas que usa el estado. Los nulos (código
+        # -1) van a la última partición.
+        df = df[analitica.columnas_estado(estado)][codigos % total == numero]
+    return datos.version_datos(), analitica.calcular_estado(estado, df)
+
+
+# ================== POOL DE PROCESOS ==================
+@contextlib.contextmanager
+def _sin_principal():
+    """Oculta el ``__main__`` del proceso mientras arrancan procesos con ``spawn``.
+
+    Un proceso nuevo vuelve a importar el ``__main__`` de su padre. En el
+    tablero ese módulo es la página que Streamlit está ejecutando: el hijo
+    la volvería a correr e intentaría abrir su propio pool. Los procesos
+    del pool no necesitan nada de ``__main__``, solo este módulo.
+    """
+    principal = sys.modules["__main__"]
+    guardados = {a: principal.__dict__[a] for a in ("__file__", "__spec__") if a in principal.__dict__}
+    principal.__dict__.pop("__file__", None)
+    principal.__spec__ = None
+    try:
+        yield
+    finally:
+        principal.__dict__.pop("__spec__", None)
+        principal.__dict__.update(guardados)
+
+
+def pool():
+    """Pool del proceso (``None`` si ``UEV_PROCESOS`` es 1)."""
+    global _pool
+    if PROCESOS == 1:
+        return None
+    with _candado:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PROCESOS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar,
+            )
+            # El pool arranca un proceso por tarea enviada hasta llegar a
+            # PROCESOS: se arrancan todos aquí, con __main__ oculto.
+            with _sin_principal():
+                for _ in range(PROCESOS):
+                    _pool.submit(os.getpid)
+    return _pool
+
+
+def preparar():
+    """Arranca el pool y espera a que cada proceso tenga sus tablas cargadas."""
+    ejecutor = pool()
+    if ejecutor is None:
+        _iniciar()
+        return
+    # Cada proceso responde después de su _iniciar; se repite hasta que
+    # respondieron todos (uno libre puede tomar varias tareas seguidas).
+    listos = set()
+    while len(listos) < PROCESOS:
+        futuros = [ejecutor.submit(_presente) for _ in range(PROCESOS)]
+        listos.update(f.result() for f in futuros)
+
+
+def cerrar():
+    """Detiene el pool.
+
+    En un proceso normal lo hace solo al salir; dentro de un proceso de
+    ``multiprocessing`` hay que llamarla antes de terminar, porque ese
+    proceso espera a sus hijos antes de que el pool se pueda cerrar.
+    """
+    global _pool
+    with _candado:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _disjuntos(estado):
+    """Si la columna de partición es una clave del estado (las particiones no comparten grupos)."""
+    claves_estado, _, _ = analitica.ESTADOS[estado]
+    return PARTICIONES[PARTICION][TABLAS[estado]] in claves_estado
+
+
+def combinados(pedidos):
+    """Estados combinados de cada ``(estado, selecciones)``, calculados en el pool.
+
+    Todas las particiones de todos los pedidos se encolan a la vez, así que
+    una consulta con dos tablas (el cruce de segmentos) también se reparte.
+    """
+    ejecutor = pool()
+    if ejecutor is None:
+        return [parcial(estado, selecciones, PARTICION, 0, 1)[1] for estado, selecciones in pedidos]
+    generacion = datos.generacion()
+    futuros = [
+        [
+            ejecutor.submit(parcial, estado, selecciones, PARTICION, numero, PROCESOS, generacion)
+            for numero in range(PROCESOS)
+        ]
+        for estado, selecciones in pedidos
+    ]
+    version = datos.version_datos()
+    resultado = []
+    for (estado, selecciones), particiones in zip(pedidos, futuros):
+        versiones, parciales = zip(*(f.result() for f in particiones))
+        if any(v != version for v in versiones):
+            resultado.append(parcial(estado, selecciones, PARTICION, 0, 1)[1])
+        else:
+            resultado.append(estados.combinar(parciales, disjuntos=_disjuntos(estado)))
+    return resultado
+
+
+# ================== CONSULTAS ==================
+def _sin_region(selecciones):
+    return {d: v for d, v in selecciones.items() if d != "region"}
+
+
+def agregar_curso_docente(selecciones):
+    estado, = combinados([("curso_docente", selecciones)])
+    return analitica.curso_docente_de_estado(estado)
+
+
+def agregar_docente(selecciones):
+    estado, = combinados([("docente", selecciones)])
+    return analitica.docente_de_estado(estado)
+
+
+def cruzar_segmentos(selecciones):
+    estado_mat, estado_sup = combinados([
+        ("segmentos_matricula", _sin_region(selecciones)),
+        ("segmentos_soporte", selecciones),
+    ])
+    return analitica.segmentos_de_estado(estado_mat, estado_sup)
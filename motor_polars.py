@@ -0,0 +1,367 @@
+"""Motor Polars: los agregados de ``consultas.py`` como planes perezosos.
+
+Cada tabla del almacén (matrículas, docentes, soporte y la tabla de hechos)
+se copia particionada por semestre y facultad (``almacen.particionar``).
+Una consulta toma solo las particiones que pueden cumplir sus filtros
+(``almacen.podar``), cada una leída una vez por proceso a un ``DataFrame``
+de Polars, y arma sobre ellas un único plan perezoso (filtro, agrupación
+y, si hace falta, unión); al ejecutarlo, el optimizador empuja el filtro,
+proyecta solo las columnas que usa y reparte el trabajo en varios hilos.
+Así el costo de elegir un semestre o una facultad depende del tamaño de
+esas particiones, no de cuántos periodos tenga el almacén.
+
+Los resultados vuelven como DataFrames de pandas con las mismas columnas,
+índice y orden que los de ``analitica.py``, así que las páginas los dibujan
+sin cambios; como en ``motor_duckdb.py``, las dimensiones vuelven como
+texto en lugar de categóricas.
+
+Se activa con ``UEV_MOTOR=polars`` (ver ``motores.py``).
+"""
+import threading
+
+import numpy as np
+
+import almacen
+import datos
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - dependencia opcional
+    pl = None
+
+
+# Tabla del almacén -> función de datos.py que la carga (y deja el archivo al día).
+TABLAS = {
+    "matriculas": datos.cargar_matriculas,
+    "docentes": datos.cargar_docentes,
+    "soporte": datos.cargar_soporte,
+    "hechos_matricula": datos.cargar_hechos,
+}
+
+_candado = threading.Lock()
+# Por (generación de datos.py, tabla o archivo).
+_particiones = {}
+_partes = {}
+
+
+# ================== PARTICIONES EN MEMORIA ==================
+def _listar(nombre):
+    clave = (datos.generacion(), nombre)
+    with _candado:
+        if clave not in _particiones:
+            _particiones[clave] = almacen.particionar(
+                nombre, almacen.PARTICIONES, TABLAS[nombre]()
+            )
+    return _particiones[clave]
+
+
+def _parte(ruta):
+    # Cada partición se lee una vez por proceso y solo cuando una consulta
+    # la necesita; leer el archivo en cada consulta obligaría a decodificar
+    # de nuevo los diccionarios de las categóricas.
+    clave = (datos.generacion(), ruta)
+    with _candado:
+        if clave not in _partes:
+            _partes[clave] = pl.read_ipc(ruta)
+    return _partes[clave]
+
+
+@datos.al_descartar
+def _descartar(generacion):
+    with _candado:
+        for guardadas in (_particiones, _partes):
+            for clave in [c for c in guardadas if c[0] == generacion]:
+                del guardadas[clave]
+
+
+def tabla(nombre, selecciones=None):
+    """``LazyFrame`` con las particiones de la tabla que pueden cumplir ``selecciones``.
+
+    La poda solo descarta particiones completas (por semestre y facultad);
+    las consultas aplican igual el filtro completo con ``donde``.
+    """
+    if pl is None:
+        raise RuntimeError("UEV_MOTOR=polars requiere el paquete polars")
+    rutas = almacen.podar(_listar(nombre), selecciones or {})
+    if not rutas:
+        return pl.LazyFrame(schema=pl.read_ipc_schema(almacen.rutas_tabla(nombre)[0]))
+    return pl.concat([_parte(ruta).lazy() for ruta in rutas], how="vertical")
+
+
+def preparar():
+    """Deja al día las particiones de cada tabla antes de la primera consulta."""
+    for nombre in TABLAS:
+        _listar(nombre)
+
+
+# ================== FILTROS Y AGREGADOS ==================
+def donde(selecciones, claves=()):
+    """Predicado para las selecciones.
+
+    Igual que ``facetas.filtrar``: un valor nulo nunca está en la selección
+    y una lista vacía no deja pasar nada. ``claves`` excluye además los
+    nulos de las columnas de agrupación, como hace ``groupby`` en pandas.
+    """
+    condiciones = [
+        pl.col(dimension).is_in([str(v) for v in valores])
+        for dimension, valores in selecciones.items()
+    ]
+    condiciones += [pl.col(c).is_not_null() for c in claves]
+    return pl.all_horizontal(condiciones) if condiciones else pl.lit(True)
+
+
+def filas(nombre, selecciones, claves=()):
+    """Plan con las filas de ``selecciones`` (ver ``donde``), leyendo solo sus particiones."""
+    return tabla(nombre, selecciones).filter(donde(selecciones, claves))
+
+
+def agrupar(plan, claves, **agregados):
+    """``group_by`` con las claves categóricas devueltas como texto."""
+    return plan.group_by(claves).agg(**agregados).with_columns(
+        pl.col(pl.Categorical).cast(pl.String)
+    )
+
+
+def _conteo(columna=None):
+    return (pl.len() if columna is None else pl.col(columna).count()).cast(pl.Int64)
+
+
+def _suma(columna):
+    return pl.col(columna).sum().cast(pl.Int64)
+
+
+def _distintos(columna):
+    return pl.col(columna).drop_nulls().n_unique().cast(pl.Int64)
+
+
+def _tasa(columna):
+    return pl.col(columna).cast(pl.Float64).mean() * 100
+
+
+def _fila(*planes):
+    """Primera fila de los planes puestos lado a lado, como diccionario."""
+    return pl.concat(planes, how="horizontal").collect().row(0, named=True)
+
+
+def _sin_region(selecciones):
+    return {d: v for d, v in selecciones.items() if d != "region"}
+
+
+def _numero(valor):
+    return np.nan if valor is None else valor
+
+
+# ================== DESCRIPCIÓN GENERAL ==================
+def totales_generales(selecciones):
+    mat, doc, sup = tabla("matriculas"), tabla("docentes"), tabla("soporte")
+    fila = _fila(
+        mat.select(
+            estudiantes=_distintos("id_estudiante"),
+            matriculas=_conteo(),
+            programas=_distintos("programa"),
+            tasa_desercion=_tasa("es_desercion"),
+            tasa_reprob=_tasa("es_reprob"),
+            nota_promedio=pl.col("nota_final").cast(pl.Float64).mean(),
+        ),
+        doc.select(cursos=_distintos("id_curso"), docentes=_distintos("id_docente")),
+        sup.select(casos_soporte=_distintos("id_caso")),
+    )
+    claves = [
+        "estudiantes", "matriculas", "programas", "cursos", "docentes",
+        "casos_soporte", "tasa_desercion", "tasa_reprob", "nota_promedio",
+    ]
+    return {clave: _numero(fila[clave]) for clave in claves}
+
+
+def programas_en_riesgo(selecciones):
+    plan = agrupar(
+        filas("matriculas", selecciones, ["programa"]),
+        ["programa"],
+        estudiantes=_distintos("id_estudiante"),
+        desertores=_suma("es_desercion_o_reprob"),
+        cancelados=_suma("es_desercion"),
+        reprobados=_suma("es_reprob"),
+    )
+    return (
+        plan.with_columns(
+            tasa_desercion_reprob=pl.col("desertores") / pl.col("estudiantes") * 100
+        )
+        .sort(["tasa_desercion_reprob", "programa"], descending=[True, False])
+        .head(3)
+        .collect()
+        .to_pandas()
+    )
+
+
+# ================== MATRÍCULAS Y DESEMPEÑO ==================
+def resumen_matriculas(selecciones):
+    fila = _fila(
+        filas("matriculas", selecciones).select(
+            matriculas=_conteo(),
+            deserciones=_suma("es_desercion"),
+            reprobaciones=_suma("es_reprob"),
+            nota=pl.col("nota_final").cast(pl.Float64).mean(),
+        )
+    )
+    matriculas = fila["matriculas"]
+    if matriculas == 0:
+        return {"matriculas": 0, "tasa_desercion": 0, "tasa_reprob": 0, "nota_promedio": 0}
+    return {
+        "matriculas": matriculas,
+        "tasa_desercion": fila["deserciones"] / matriculas * 100,
+        "tasa_reprob": fila["reprobaciones"] / matriculas * 100,
+        "nota_promedio": _numero(fila["nota"]),
+    }
+
+
+def estados_por_programa(selecciones):
+    claves = ["programa", "estado_academico"]
+    plan = agrupar(filas("matriculas", selecciones, claves), claves, n=_conteo())
+    return plan.sort(claves).collect().to_pandas()
+
+
+def _indicadores(plan, clave, columna_conteo=None):
+    return agrupar(
+        plan,
+        [clave],
+        matriculas=_conteo(columna_conteo),
+        deserciones=_suma("es_desercion"),
+        reprobaciones=_suma("es_reprob"),
+    ).with_columns(
+        (pl.col("deserciones") / pl.col("matriculas") * 100).alias("tasa_desercion_%"),
+        (pl.col("reprobaciones") / pl.col("matriculas") * 100).alias("tasa_reprob_%"),
+    )
+
+
+def indicadores_programa(selecciones):
+    plan = _indicadores(
+        filas("matriculas", selecciones, ["programa"]), "programa"
+    )
+    return (
+        plan.sort(["tasa_desercion_%", "programa"], descending=[True, False])
+        .collect()
+        .to_pandas()
+        .set_index("programa")
+    )
+
+
+def indicadores_curso(selecciones):
+    plan = _indicadores(
+        filas("hechos_matricula", selecciones, ["nombre_curso"]),
+        "nombre_curso",
+        columna_conteo="id_estudiante",
+    )
+    return plan.sort("nombre_curso").collect().to_pandas()
+
+
+def segmentos_riesgo(selecciones):
+    claves = ["modalidad", "subperiodo"]
+    plan = agrupar(
+        filas("matriculas", selecciones, claves),
+        claves,
+        matriculas=_conteo(),
+        deserciones=_suma("es_desercion_o_reprob"),
+    )
+    return (
+        plan.with_columns(
+            (pl.col("deserciones") / pl.col("matriculas") * 100).alias("tasa_desercion_reprob_%")
+        )
+        .sort(claves)
+        .collect()
+        .to_pandas()
+    )
+
+
+# ================== DOCENTES Y CURSOS ==================
+def _por_docente(selecciones, claves, **conteos):
+    return (
+        agrupar(
+            filas("hechos_matricula", selecciones, claves),
+            claves,
+            **conteos,
+            estudiantes=_distintos("id_estudiante"),
+            nota_promedio=pl.col("nota_final").cast(pl.Float64).mean(),
+            tasa_reprobacion=_tasa("es_reprob"),
+            tasa_desercion=_tasa("es_desercion"),
+        )
+        .sort(claves)
+        .collect()
+        .to_pandas()
+    )
+
+
+def agregar_curso_docente(selecciones):
+    claves = ["id_curso", "nombre_curso", "id_docente", "facultad", "programa",
+              "antiguedad_docente_semestres"]
+    return _por_docente(selecciones, claves)
+
+
+def agregar_docente(selecciones):
+    claves = ["id_docente", "facultad", "antiguedad_docente_semestres"]
+    return _por_docente(selecciones, claves, cursos=_distintos("id_curso"))
+
+
+# ================== SOPORTE Y ATENCIONES ==================
+def resumen_soporte(selecciones):
+    fila = _fila(
+        filas("soporte", selecciones).select(
+            casos=_conteo(),
+            tiempo=pl.col("tiempo_respuesta_horas").mean(),
+            satisfaccion=pl.col("satisfaccion_estudiante").cast(pl.Float64).mean(),
+        ),
+        filas("matriculas", _sin_region(selecciones)).select(
+            matriculas=_conteo(),
+            deserciones=_suma("es_desercion"),
+        ),
+    )
+    casos, matriculas = fila["casos"], fila["matriculas"]
+    return {
+        "casos": casos,
+        "tiempo_respuesta": _numero(fila["tiempo"]) if casos > 0 else 0,
+        "satisfaccion": _numero(fila["satisfaccion"]) if casos > 0 else 0,
+        "tasa_desercion": fila["deserciones"] / matriculas * 100 if matriculas > 0 else 0,
+    }
+
+
+def agregar_motivos(selecciones):
+    plan = agrupar(
+        filas("soporte", selecciones, ["motivo"]), ["motivo"], casos=_conteo()
+    )
+    return plan.sort(["casos", "motivo"], descending=[True, False]).collect().to_pandas()
+
+
+def _promedio_por(selecciones, clave, columna):
+    plan = agrupar(
+        filas("soporte", selecciones, [clave]),
+        [clave],
+        **{columna: pl.col(columna).cast(pl.Float64).mean()},
+    )
+    return plan.sort(clave).collect().to_pandas()
+
+
+def agregar_tipo_atencion(selecciones):
+    return _promedio_por(selecciones, "tipo_atencion", "tiempo_respuesta_horas")
+
+
+def agregar_satisfaccion_region(selecciones):
+    return _promedio_por(selecciones, "region", "satisfaccion_estudiante")
+
+
+def cruzar_segmentos(selecciones):
+    claves = ["semestre", "facultad", "programa"]
+    mat_seg = agrupar(
+        filas("matriculas", _sin_region(selecciones), claves),
+        claves,
+        matriculas=_conteo("id_estudiante"),
+        desertores=_suma("es_desercion"),
+    ).with_columns(
+        (pl.col("desertores") / pl.col("matriculas") * 100).alias("tasa_desercion_%")
+    )
+    sup_seg = agrupar(
+        filas("soporte", selecciones, claves),
+        claves,
+        casos_soporte=_conteo("id_caso"),
+        tiempo_resp_prom=pl.col("tiempo_respuesta_horas").mean(),
+        satis_prom=pl.col("satisfaccion_estudiante").cast(pl.Float64).mean(),
+    )
+    return mat_seg.join(sup_seg, on=claves, how="inner").sort(claves).collect().to_pandas()
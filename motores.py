@@ -0,0 +1,47 @@
+"""Motor de cálculo de los agregados de ``consultas.py``.
+
+``UEV_MOTOR`` elige, por proceso, dónde se filtran y agregan los datos:
+
+- ``pandas`` (por defecto): índices de facetas, cubo y ``groupby`` sobre las
+  tablas en memoria (``analitica.py``);
+- ``duckdb``: SQL vectorizado sobre una base DuckDB en disco
+  (``motor_duckdb.py``);
+- ``polars``: planes perezosos de Polars sobre las tablas del almacén
+  (``motor_polars.py``);
+- ``paralelo``: los agregados por filas más pesados, repartidos por
+  particiones en un pool de procesos (``motor_paralelo.py``).
+
+Un motor es un módulo con ``preparar()`` (deja listos sus datos) y las
+funciones de ``consultas.py`` que quiera implementar, con el mismo nombre,
+firma y forma de resultado; las demás siguen en pandas. La caché de
+resultados y el registro de ``perfil.py`` envuelven a la función elegida,
+así que funcionan igual con cualquier motor.
+"""
+import importlib
+import os
+
+
+MOTORES = {
+    "pandas": None,
+    "duckdb": "motor_duckdb",
+    "polars": "motor_polars",
+    "paralelo": "motor_paralelo",
+}
+
+MOTOR = (os.environ.get("UEV_MOTOR") or "pandas").strip().lower()
+
+if MOTOR not in MOTORES:
+    raise ValueError(f"UEV_MOTOR={MOTOR!r} no es un motor conocido ({', '.join(MOTORES)})")
+
+_modulo = importlib.import_module(MOTORES[MOTOR]) if MOTORES[MOTOR] else None
+
+
+def preparar():
+    """Deja listos los datos del motor configurado (nada que hacer con pandas)."""
+    if _modulo is not None:
+        _modulo.preparar()
+
+
+def alternativo(funcion):
+    """Decorador: la versión del motor configurado si la define; si no, ``funcion``."""
+    return getattr(_modulo, funcion.__name__, funcion)
@@ -1,6 +1,14 @@
 import streamlit as st
 import pandas as pd
 
+import analitica
+import perfil
+from consultas import indicadores_periodo, programas_en_riesgo, totales_generales
+from datos import cargar_periodos, precargar, texto_periodos
+
+perfil.pagina("Descripción general")
+precargar()
+
 
 # ================== HEADER CORPORATIVO ==================
 def header_data_damz():
@@ -23,7 +31,7 @@ def header_data_damz():
                     'Proyecto analítico · Unidad de Educación Virtual – ITM'
                 '</div>'
                 '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                    'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                    f'Periodo de análisis: <b>{texto_periodos()}</b>'
                 '</div>'
             '</div>'
         '</div>'
@@ -36,49 +44,22 @@ header_data_damz()
 
 st.title("📌 Descripción general")
 
-@st.cache_data
-def load_data():
-    mat = pd.read_csv("matriculaslimpias.csv")
-    doc = pd.read_csv("docenteslimpios.csv")
-    sup = pd.read_csv("soporte_atenciones_focus.csv")
-    return mat, doc, sup
-
-mat, doc, sup = load_data()
-
 # ================== CÁLCULOS PRINCIPALES ==================
-mat["es_desercion"] = mat["estado_academico"] == "Cancelado"
-mat["es_reprob"] = mat["estado_academico"] == "Reprobado"
-mat["es_desercion_o_reprob"] = mat["es_desercion"] | mat["es_reprob"]
-
-total_estudiantes = mat["id_estudiante"].nunique()
-total_matriculas = len(mat)
-total_programas = mat["programa"].nunique()
-total_cursos = doc["id_curso"].nunique()
-total_docentes = doc["id_docente"].nunique()
-total_casos_soporte = sup["id_caso"].nunique()
-
-tasa_desercion_global = mat["es_desercion"].mean() * 100
-tasa_reprob_global = mat["es_reprob"].mean() * 100
-nota_prom_global = mat["nota_final"].mean()
+perfil.seccion("Cálculos principales")
+totales = totales_generales({})
+total_estudiantes = totales["estudiantes"]
+total_matriculas = totales["matriculas"]
+total_programas = totales["programas"]
+total_cursos = totales["cursos"]
+total_docentes = totales["docentes"]
+total_casos_soporte = totales["casos_soporte"]
+
+tasa_desercion_global = totales["tasa_desercion"]
+tasa_reprob_global = totales["tasa_reprob"]
+nota_prom_global = totales["nota_promedio"]
 
 # Top 3 programas en riesgo (deserción + reprobación)
-prog_agg = (
-    mat.groupby("programa")
-    .agg(
-        estudiantes=("id_estudiante", "nunique"),
-        desertores=("es_desercion_o_reprob", "sum"),
-        cancelados=("es_desercion", "sum"),
-        reprobados=("es_reprob", "sum"),
-    )
-)
-prog_agg["tasa_desercion_reprob"] = (
-    prog_agg["desertores"] / prog_agg["estudiantes"] * 100
-)
-top_prog_riesgo = (
-    prog_agg.sort_values("tasa_desercion_reprob", ascending=False)
-    .head(3)
-    .reset_index()
-)
+top_prog_riesgo = programas_en_riesgo({})
 
 # ================== SUBTÍTULO ==================
 st.markdown(
@@ -89,6 +70,7 @@ st.markdown(
 st.markdown("")
 
 # ================== KPIs EN CARDS (MISMO ESTILO QUE app.py) ==================
+perfil.seccion("KPIs")
 col1, col2, col3, col4 = st.columns(4)
 
 card_1 = (
@@ -150,7 +132,70 @@ st.markdown(
     f"**{total_docentes} docentes** y respaldados por **{total_casos_soporte} casos de soporte registrados**."
 )
 
+# ================== COMPARACIÓN ENTRE PERIODOS ==================
+perfil.seccion("Comparación entre periodos")
+st.markdown("---")
+st.markdown("### Comparación entre periodos")
+
+# Indicador -> (formato del valor, formato de la diferencia).
+FORMATOS_PERIODO = {
+    "tasa_desercion": ("{:.1f}%", "{:+.1f} pp"),
+    "tasa_reprob": ("{:.1f}%", "{:+.1f} pp"),
+    "nota_promedio": ("{:.2f}", "{:+.2f}"),
+    "tiempo_respuesta": ("{:.1f} h", "{:+.1f} h"),
+}
+
+periodos_disponibles = cargar_periodos()
+
+if len(periodos_disponibles) >= 2:
+    cp1, cp2 = st.columns(2)
+    periodo_base = cp1.selectbox(
+        "Periodo base", periodos_disponibles, index=len(periodos_disponibles) - 2
+    )
+    periodo_comparado = cp2.selectbox(
+        "Periodo a comparar", periodos_disponibles, index=len(periodos_disponibles) - 1
+    )
+
+    # Sale de los cubos por periodo (cacheados), no de las filas de matrícula.
+    ind_periodo = indicadores_periodo({})
+    comparacion = analitica.comparar_periodos(ind_periodo, periodo_base, periodo_comparado)
+
+    for columna, (indicador, fila) in zip(st.columns(len(comparacion)), comparacion.iterrows()):
+        etiqueta, menor_es_mejor = analitica.INDICADORES_PERIODO[indicador]
+        formato_valor, formato_delta = FORMATOS_PERIODO[indicador]
+        columna.metric(
+            etiqueta,
+            "—" if pd.isna(fila["comparado"]) else formato_valor.format(fila["comparado"]),
+            delta=None if pd.isna(fila["diferencia"]) else formato_delta.format(fila["diferencia"]),
+            delta_color="inverse" if menor_es_mejor else "normal",
+        )
+
+    st.markdown(
+        f"Cada indicador muestra su valor en **{periodo_comparado}** y la diferencia frente a "
+        f"**{periodo_base}**. En deserción, reprobación y tiempo de respuesta una diferencia negativa "
+        "es una mejora; en la nota promedio, una positiva."
+    )
+
+    with perfil.paso("st.dataframe"):
+        st.dataframe(
+            ind_periodo.rename(
+                columns={
+                    "matriculas": "Matrículas",
+                    "tasa_desercion": "Deserción (%)",
+                    "tasa_reprob": "Reprobación (%)",
+                    "nota_promedio": "Nota promedio",
+                    "casos_soporte": "Casos de soporte",
+                    "tiempo_respuesta": "Tiempo de respuesta (h)",
+                    "satisfaccion": "Satisfacción",
+                }
+            ),
+            use_container_width=True,
+        )
+else:
+    st.info("La comparación necesita al menos dos periodos con datos.")
+
 # ================== TOP PROGRAMAS EN RIESGO (PREGUNTA FOCAL) ==================
+perfil.seccion("Programas con mayor riesgo")
 st.markdown("---")
 st.markdown("### Programas con mayor riesgo de deserción y reprobación")
 
@@ -170,7 +215,8 @@ if not top_prog_riesgo.empty:
             "tasa_desercion_reprob": "Tasa deserción+reprob (%)",
         }
     )
-    st.dataframe(tabla_prog, use_container_width=True)
+    with perfil.paso("st.dataframe"):
+        st.dataframe(tabla_prog, use_container_width=True)
 else:
     st.info("No se encontraron programas con registros suficientes para este cálculo.")
 
@@ -181,6 +227,7 @@ st.markdown(
 )
 
 # ================== RELACIÓN CON LAS PREGUNTAS DE NEGOCIO ==================
+perfil.seccion("Preguntas de negocio")
 st.markdown("---")
 st.markdown("### Cómo se conectan las demás páginas con las preguntas de negocio")
 
@@ -224,6 +271,7 @@ st.markdown(
     "y DATA DAMZ SAS."
 )
 
+perfil.seccion("(pie y navegación)")
 st.markdown(
     """
     <hr style="margin-top:40px; margin-bottom:10px; border: 1px solid #1e293b;">
@@ -299,7 +347,7 @@ header_html = (
                 'Proyecto analítico · Unidad de Educación Virtual – ITM'
             '</div>'
             '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                f'Periodo de análisis: <b>{texto_periodos()}</b>'
             '</div>'
         '</div>'
     '</div>'
@@ -377,3 +425,5 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+perfil.cerrar()
@@ -1,7 +1,20 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
 
+import analitica
+import perfil
+from consultas import (
+    estados_por_programa,
+    indicadores_curso,
+    indicadores_programa,
+    resumen_matriculas,
+    segmentos_riesgo,
+)
+from datos import cargar_hechos, precargar, texto_periodos
+
+perfil.pagina("Matrículas y Desempeño")
+precargar()
+
 # ================== HEADER CORPORATIVO ==================
 def header_data_damz():
     header_html = (
@@ -23,7 +36,7 @@ def header_data_damz():
                     'Proyecto analítico · Unidad de Educación Virtual – ITM'
                 '</div>'
                 '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                    'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                    f'Periodo de análisis: <b>{texto_periodos()}</b>'
                 '</div>'
             '</div>'
         '</div>'
@@ -35,24 +48,9 @@ header_data_damz()
 # ================== TÍTULO PRINCIPAL ==================
 st.title("🎓 Matrículas y Desempeño Académico")
 
-@st.cache_data
-def load_data():
-    mat = pd.read_csv("matriculaslimpias.csv")
-    doc = pd.read_csv("docenteslimpios.csv")
-    return mat, doc
-
-mat, doc = load_data()
-
-# Unimos info de matrícula + curso/docente
-df = mat.merge(
-    doc[["id_curso", "nombre_curso", "id_docente", "facultad", "programa"]],
-    on=["id_curso", "facultad", "programa"],
-    how="left"
-)
-
-df["es_desercion"] = df["estado_academico"] == "Cancelado"
-df["es_reprob"] = df["estado_academico"] == "Reprobado"
-df["es_desercion_o_reprob"] = df["es_desercion"] | df["es_reprob"]
+# Matrículas ya unidas con su curso y docente (tabla de hechos precalculada)
+with perfil.paso("carga de datos"):
+    df = cargar_hechos()
 
 st.markdown(
     "En esta vista analizamos el comportamiento de las matrículas por **programa, modalidad y asignatura**, "
@@ -62,6 +60,7 @@ st.markdown(
 )
 
 # ================== FILTROS ==================
+perfil.seccion("Filtros de análisis")
 st.markdown("### Filtros de análisis")
 
 c1, c2, c3, c4 = st.columns(4)
@@ -76,20 +75,18 @@ fac_sel = c2.multiselect("Facultad", facultades, default=facultades)
 prog_sel = c3.multiselect("Programa", programas, default=programas)
 mod_sel = c4.multiselect("Modalidad", modalidades, default=modalidades)
 
-df_f = df[
-    df["semestre"].isin(sem_sel)
-    & df["facultad"].isin(fac_sel)
-    & df["programa"].isin(prog_sel)
-    & df["modalidad"].isin(mod_sel)
-]
+selecciones = {"semestre": sem_sel, "facultad": fac_sel, "programa": prog_sel, "modalidad": mod_sel}
+
 
 # ================== KPIs LOCALES ==================
+perfil.seccion("KPIs")
 st.markdown("### Resumen de matrículas en los filtros seleccionados")
 
-total_matr = len(df_f)
-tasa_deserc = df_f["es_desercion"].mean() * 100 if total_matr > 0 else 0
-tasa_reprob = df_f["es_reprob"].mean() * 100 if total_matr > 0 else 0
-nota_prom = df_f["nota_final"].mean() if total_matr > 0 else 0
+resumen = resumen_matriculas(selecciones)
+total_matr = resumen["matriculas"]
+tasa_deserc = resumen["tasa_desercion"]
+tasa_reprob = resumen["tasa_reprob"]
+nota_prom = resumen["nota_promedio"]
 
 k1, k2, k3, k4 = st.columns(4)
 
@@ -153,15 +150,12 @@ st.markdown(
 )
 
 # ================== 1. ESTADOS POR PROGRAMA ==================
+perfil.seccion("1. Estados académicos por programa")
 st.markdown("---")
 st.markdown("### 1. Estados académicos por programa")
 
-if not df_f.empty:
-    estados_prog = (
-        df_f.groupby(["programa", "estado_academico"])
-        .size()
-        .reset_index(name="n")
-    )
+if total_matr > 0:
+    estados_prog = estados_por_programa(selecciones)
 
     chart_prog = (
         alt.Chart(estados_prog)
@@ -174,7 +168,8 @@ if not df_f.empty:
         )
     )
 
-    st.altair_chart(chart_prog, use_container_width=True)
+    with perfil.paso("Altair"):
+        st.altair_chart(chart_prog, use_container_width=True)
 
     st.markdown(
         """
@@ -193,22 +188,14 @@ else:
     st.info("No hay registros para los filtros seleccionados.")
 
 # ================== 2. INDICADORES POR PROGRAMA ==================
+perfil.seccion("2. Indicadores por programa")
 st.markdown("### 2. Indicadores de deserción y reprobación por programa")
 
-if not df_f.empty:
-    prog_ind = (
-        df_f.groupby("programa")
-        .agg(
-            matriculas=("id_estudiante", "count"),
-            deserciones=("es_desercion", "sum"),
-            reprobaciones=("es_reprob", "sum"),
-        )
-    )
-    prog_ind["tasa_desercion_%"] = prog_ind["deserciones"] / prog_ind["matriculas"] * 100
-    prog_ind["tasa_reprob_%"] = prog_ind["reprobaciones"] / prog_ind["matriculas"] * 100
-    prog_ind = prog_ind.sort_values("tasa_desercion_%", ascending=False)
+if total_matr > 0:
+    prog_ind = indicadores_programa(selecciones)
 
-    st.dataframe(prog_ind, use_container_width=True)
+    with perfil.paso("st.dataframe"):
+        st.dataframe(prog_ind, use_container_width=True)
 
     st.markdown(
         """
@@ -228,23 +215,14 @@ else:
     st.info("No hay registros para los filtros seleccionados.")
 
 # ================== 3. ASIGNATURAS EN MAYOR RIESGO ==================
+perfil.seccion("3. Asignaturas en mayor riesgo")
 st.markdown("---")
 st.markdown("### 3. Asignaturas con mayor tasa de deserción / reprobación")
 
-if not df_f.empty:
-    curso_ind = (
-        df_f.groupby("nombre_curso")
-        .agg(
-            matriculas=("id_estudiante", "count"),
-            deserciones=("es_desercion", "sum"),
-            reprobaciones=("es_reprob", "sum"),
-        )
-        .reset_index()
-    )
-    curso_ind["tasa_desercion_%"] = curso_ind["deserciones"] / curso_ind["matriculas"] * 100
-    curso_ind["tasa_reprob_%"] = curso_ind["reprobaciones"] / curso_ind["matriculas"] * 100
+if total_matr > 0:
+    curso_ind = indicadores_curso(selecciones)
 
-    top_cursos = curso_ind.sort_values("tasa_desercion_%", ascending=False).head(10)
+    top_cursos = analitica.cursos_en_riesgo(curso_ind, n=10)
 
     chart_cursos = (
         alt.Chart(top_cursos)
@@ -263,7 +241,8 @@ if not df_f.empty:
         )
     )
 
-    st.altair_chart(chart_cursos, use_container_width=True)
+    with perfil.paso("Altair"):
+        st.altair_chart(chart_cursos, use_container_width=True)
 
     st.markdown(
         """
@@ -284,19 +263,12 @@ else:
     st.info("No hay registros para los filtros seleccionados.")
 
 # ================== 4. SEGMENTOS (MODALIDAD Y SUBPERIODO) ==================
+perfil.seccion("4. Segmentos (modalidad y subperiodo)")
 st.markdown("---")
 st.markdown("### 4. Segmentos con mayor riesgo (modalidad y subperiodo)")
 
-if not df_f.empty:
-    seg = (
-        df_f.groupby(["modalidad", "subperiodo"])
-        .agg(
-            matriculas=("id_estudiante", "count"),
-            deserciones=("es_desercion_o_reprob", "sum"),
-        )
-        .reset_index()
-    )
-    seg["tasa_desercion_reprob_%"] = seg["deserciones"] / seg["matriculas"] * 100
+if total_matr > 0:
+    seg = segmentos_riesgo(selecciones)
 
     chart_seg = (
         alt.Chart(seg)
@@ -315,7 +287,8 @@ if not df_f.empty:
         )
     )
 
-    st.altair_chart(chart_seg, use_container_width=True)
+    with perfil.paso("Altair"):
+        st.altair_chart(chart_seg, use_container_width=True)
 
     st.markdown(
         """
@@ -331,6 +304,7 @@ if not df_f.empty:
 else:
     st.info("No hay registros para los filtros seleccionados.")
 
+perfil.seccion("(pie y navegación)")
 st.markdown(
     """
     <hr style="margin-top:40px; margin-bottom:10px; border: 1px solid #1e293b;">
@@ -407,7 +381,7 @@ header_html = (
                 'Proyecto analítico · Unidad de Educación Virtual – ITM'
             '</div>'
             '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                f'Periodo de análisis: <b>{texto_periodos()}</b>'
             '</div>'
         '</div>'
     '</div>'
@@ -485,3 +459,5 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+perfil.cerrar()
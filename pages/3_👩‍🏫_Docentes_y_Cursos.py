@@ -1,7 +1,14 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
 
+import analitica
+import perfil
+from consultas import agregar_curso_docente, agregar_docente
+from datos import cargar_hechos, matriculas_del_curso, precargar, texto_periodos
+
+perfil.pagina("Docentes y Cursos")
+precargar()
+
 # ================== HEADER CORPORATIVO ==================
 def header_data_damz():
     header_html = (
@@ -23,7 +30,7 @@ def header_data_damz():
                     'Proyecto analítico · Unidad de Educación Virtual – ITM'
                 '</div>'
                 '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                    'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                    f'Periodo de análisis: <b>{texto_periodos()}</b>'
                 '</div>'
             '</div>'
         '</div>'
@@ -32,21 +39,11 @@ def header_data_damz():
 
 
 # ================== CARGA DE DATOS ==================
-@st.cache_data
-def load_data():
-    mat = pd.read_csv("matriculaslimpias.csv")
-    doc = pd.read_csv("docenteslimpios.csv")
-    return mat, doc
-
-mat, doc = load_data()
-
-# Unimos matrículas con información del curso y del docente
-# -> mantenemos los nombres de las columnas de matrícula SIN sufijos
-# -> las columnas que se repitan en docentes tendrán el sufijo "_doc"
-df = mat.merge(doc, on="id_curso", how="left", suffixes=("", "_doc"))
-
-df["es_reprobado"] = df["estado_academico"] == "Reprobado"
-df["es_cancelado"] = df["estado_academico"] == "Cancelado"
+perfil.seccion("Carga de datos")
+# Matrículas con la información del curso y del docente ya unida por id_curso
+# (tabla de hechos precalculada en la ingesta, ver hechos.py)
+with perfil.paso("carga de datos"):
+    df = cargar_hechos()
 
 # ================== HEADER + TÍTULO ==================
 header_data_damz()
@@ -60,6 +57,7 @@ st.markdown(
 )
 
 # ================== FILTROS ==================
+perfil.seccion("Filtros de análisis")
 st.markdown("### Filtros de análisis")
 
 c1, c2, c3 = st.columns(3)
@@ -72,72 +70,25 @@ sem_sel = c1.multiselect("Semestre", semestres, default=semestres)
 fac_sel = c2.multiselect("Facultad", facultades, default=facultades)
 prog_sel = c3.multiselect("Programa", programas, default=programas)
 
-df_f = df[
-    df["semestre"].isin(sem_sel)
-    & df["facultad"].isin(fac_sel)
-    & df["programa"].isin(prog_sel)
-]
-
-# ================== AGREGACIONES ==================
-# Por curso-docente: tamaño de grupo, nota promedio, tasas
-if not df_f.empty:
-    curso_doc = (
-        df_f.groupby(
-            [
-                "id_curso",
-                "nombre_curso",
-                "id_docente",
-                "facultad",
-                "programa",
-                "antiguedad_docente_semestres",  # viene del CSV de docentes
-            ],
-            as_index=False,
-        )
-        .agg(
-            estudiantes=("id_estudiante", "nunique"),
-            nota_promedio=("nota_final", "mean"),
-            tasa_reprobacion=("es_reprobado", "mean"),
-            tasa_desercion=("es_cancelado", "mean"),
-        )
-    )
-    curso_doc["tasa_reprobacion"] *= 100
-    curso_doc["tasa_desercion"] *= 100
-else:
-    curso_doc = pd.DataFrame()
-
-# Por docente: consolidado de cursos, estudiantes y resultados
-if not df_f.empty:
-    doc_agg = (
-        df_f.groupby(
-            ["id_docente", "facultad", "antiguedad_docente_semestres"],
-            as_index=False,
-        )
-        .agg(
-            cursos=("id_curso", "nunique"),
-            estudiantes=("id_estudiante", "nunique"),
-            nota_promedio=("nota_final", "mean"),
-            tasa_reprobacion=("es_reprobado", "mean"),
-            tasa_desercion=("es_cancelado", "mean"),
-        )
-    )
-    doc_agg["tasa_reprobacion"] *= 100
-    doc_agg["tasa_desercion"] *= 100
-else:
-    doc_agg = pd.DataFrame()
+selecciones = {"semestre": sem_sel, "facultad": fac_sel, "programa": prog_sel}
+
+
+# ================== AGREGACIONES (CACHÉ POR FILTROS) ==================
+# Por curso-docente (tamaño de grupo, nota, tasas) y por docente (consolidado)
+curso_doc = agregar_curso_docente(selecciones)
+doc_agg = agregar_docente(selecciones)
 
 # ================== KPIs ==================
+perfil.seccion("KPIs")
 st.markdown("### Resumen de carga y desempeño")
 
-if not curso_doc.empty:
-    prom_tam_grupo = curso_doc["estudiantes"].mean()
-    prom_nota = curso_doc["nota_promedio"].mean()
-    prom_reprob = curso_doc["tasa_reprobacion"].mean()
-    prom_deser = curso_doc["tasa_desercion"].mean()
-    n_cursos = len(curso_doc)
-    n_docentes = curso_doc["id_docente"].nunique()
-else:
-    prom_tam_grupo = prom_nota = prom_reprob = prom_deser = 0
-    n_cursos = n_docentes = 0
+resumen = analitica.resumen_cursos(curso_doc)
+prom_tam_grupo = resumen["tam_grupo"]
+prom_nota = resumen["nota_promedio"]
+prom_reprob = resumen["tasa_reprob"]
+prom_deser = resumen["tasa_desercion"]
+n_cursos = resumen["cursos"]
+n_docentes = resumen["docentes"]
 
 k1, k2, k3, k4 = st.columns(4)
 
@@ -192,6 +143,7 @@ st.markdown(
 )
 
 # ================== 1. TAMAÑO DE GRUPO VS NOTA (POR CURSO) ==================
+perfil.seccion("1. Tamaño de grupo vs. nota")
 st.markdown("---")
 st.markdown("### 1. Tamaño de grupo vs. nota promedio por curso")
 
@@ -216,7 +168,8 @@ if not curso_doc.empty:
         )
     )
 
-    st.altair_chart(chart_carga, use_container_width=True)
+    with perfil.paso("Altair"):
+        st.altair_chart(chart_carga, use_container_width=True)
 
     st.markdown(
         """
@@ -237,6 +190,7 @@ else:
     st.info("No hay datos suficientes para construir este gráfico con los filtros seleccionados.")
 
 # ================== 2. ANTIGÜEDAD DOCENTE Y RESULTADOS ==================
+perfil.seccion("2. Antigüedad docente y resultados")
 st.markdown("---")
 st.markdown("### 2. Antigüedad del docente y desempeño académico")
 
@@ -264,7 +218,8 @@ if not doc_agg.empty:
         )
     )
 
-    st.altair_chart(chart_ant, use_container_width=True)
+    with perfil.paso("Altair"):
+        st.altair_chart(chart_ant, use_container_width=True)
 
     st.markdown(
         """
@@ -289,30 +244,28 @@ else:
     st.info("No hay datos suficientes para analizar la antigüedad docente con los filtros seleccionados.")
 
 # ================== 3. DOCENTES CON MAYOR REPROBACIÓN / DESERCIÓN ==================
+perfil.seccion("3. Docentes con mayor reprobación / deserción")
 st.markdown("---")
 st.markdown("### 3. Docentes con mayores tasas de reprobación y deserción")
 
 if not doc_agg.empty:
-    top_doc = (
-        doc_agg.sort_values("tasa_reprobacion", ascending=False)
-        .head(10)
-        .reset_index(drop=True)
-    )
-
-    st.dataframe(
-        top_doc[
-            [
-                "id_docente",
-                "facultad",
-                "cursos",
-                "estudiantes",
-                "nota_promedio",
-                "tasa_reprobacion",
-                "tasa_desercion",
-            ]
-        ],
-        use_container_width=True,
-    )
+    top_doc = analitica.docentes_en_riesgo(doc_agg, n=10)
+
+    with perfil.paso("st.dataframe"):
+        st.dataframe(
+            top_doc[
+                [
+                    "id_docente",
+                    "facultad",
+                    "cursos",
+                    "estudiantes",
+                    "nota_promedio",
+                    "tasa_reprobacion",
+                    "tasa_desercion",
+                ]
+            ],
+            use_container_width=True,
+        )
 
     st.markdown(
         """
@@ -331,6 +284,62 @@ if not doc_agg.empty:
 else:
     st.info("No hay información suficiente para construir esta tabla con los filtros actuales.")
 
+# ================== 4. DETALLE POR CURSO ==================
+perfil.seccion("4. Detalle por curso")
+st.markdown("---")
+st.markdown("### 4. Detalle de las matrículas de un curso")
+
+if not curso_doc.empty:
+    cursos = curso_doc.drop_duplicates("id_curso").sort_values("id_curso")
+    nombres = dict(zip(cursos["id_curso"].astype(str), cursos["nombre_curso"].astype(str)))
+    id_curso = st.selectbox(
+        "Curso", list(nombres), format_func=lambda curso: f"{curso} · {nombres[curso]}"
+    )
+
+    # Las matrículas del curso salen del índice por id_curso de la tabla de
+    # hechos (ver hechos.py), sin recorrer la tabla; los filtros de la página
+    # se aplican solo a esas filas.
+    detalle = matriculas_del_curso(id_curso)
+    detalle = detalle[
+        detalle["semestre"].isin(sem_sel)
+        & detalle["facultad"].isin(fac_sel)
+        & detalle["programa"].isin(prog_sel)
+    ]
+
+    d1, d2 = st.columns([1, 2])
+    with d1:
+        estados_curso = (
+            detalle["estado_academico"].value_counts().rename_axis("estado_academico")
+            .reset_index(name="matriculas")
+        )
+        st.dataframe(estados_curso, use_container_width=True)
+    with d2:
+        with perfil.paso("st.dataframe"):
+            st.dataframe(
+                detalle[
+                    [
+                        "id_estudiante",
+                        "semestre",
+                        "programa",
+                        "id_docente",
+                        "estado_academico",
+                        "nota_final",
+                    ]
+                ],
+                use_container_width=True,
+            )
+
+    st.markdown(
+        """
+        Este detalle permite bajar de los indicadores agregados a las **matrículas concretas** de un curso:
+        cuántos estudiantes aprobaron, reprobaron o cancelaron y con qué nota final. Es útil para revisar
+        con el docente o la coordinación un caso puntual identificado en los gráficos anteriores.
+        """
+    )
+else:
+    st.info("No hay cursos para mostrar con los filtros actuales.")
+
+perfil.seccion("(pie y navegación)")
 st.markdown(
     """
     <hr style="margin-top:40px; margin-bottom:10px; border: 1px solid #1e293b;">
@@ -407,7 +416,7 @@ header_html = (
                 'Proyecto analítico · Unidad de Educación Virtual – ITM'
             '</div>'
             '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                f'Periodo de análisis: <b>{texto_periodos()}</b>'
             '</div>'
         '</div>'
     '</div>'
@@ -485,3 +494,5 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+perfil.cerrar()
@@ -1,7 +1,19 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
 
+import perfil
+from consultas import (
+    agregar_motivos,
+    agregar_satisfaccion_region,
+    agregar_tipo_atencion,
+    cruzar_segmentos,
+    resumen_soporte,
+)
+from datos import cargar_soporte, precargar, texto_periodos
+
+perfil.pagina("Soporte y Atenciones")
+precargar()
+
 # ================== HEADER CORPORATIVO ==================
 def header_data_damz():
     header_html = (
@@ -23,7 +35,7 @@ def header_data_damz():
                     'Proyecto analítico · Unidad de Educación Virtual – ITM'
                 '</div>'
                 '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                    'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                    f'Periodo de análisis: <b>{texto_periodos()}</b>'
                 '</div>'
             '</div>'
         '</div>'
@@ -32,14 +44,9 @@ def header_data_damz():
 
 
 # ================== CARGA DE DATOS ==================
-@st.cache_data
-def load_data():
-    mat = pd.read_csv("matriculaslimpias.csv")
-    sup = pd.read_csv("soporte_atenciones_focus.csv")
-    return mat, sup
-
-mat, sup = load_data()
-mat["es_desercion"] = mat["estado_academico"] == "Cancelado"
+perfil.seccion("Carga de datos")
+with perfil.paso("carga de datos"):
+    sup = cargar_soporte()
 
 # ================== HEADER + TÍTULO ==================
 header_data_damz()
@@ -55,6 +62,7 @@ st.markdown(
 )
 
 # ================== FILTROS ==================
+perfil.seccion("Filtros de análisis")
 st.markdown("### Filtros de análisis")
 
 c1, c2, c3, c4 = st.columns(4)
@@ -69,30 +77,19 @@ fac_sel = c2.multiselect("Facultad", facultades, default=facultades)
 prog_sel = c3.multiselect("Programa", programas, default=programas)
 reg_sel = c4.multiselect("Región", regiones, default=regiones)
 
-sup_f = sup[
-    sup["semestre"].isin(sem_sel)
-    & sup["facultad"].isin(fac_sel)
-    & sup["programa"].isin(prog_sel)
-    & sup["region"].isin(reg_sel)
-]
+# Matrículas no tienen región: consultas.py las filtra con las demás dimensiones.
+selecciones = {"semestre": sem_sel, "facultad": fac_sel, "programa": prog_sel, "region": reg_sel}
 
-mat_f = mat[
-    mat["semestre"].isin(sem_sel)
-    & mat["facultad"].isin(fac_sel)
-    & mat["programa"].isin(prog_sel)
-]
 
 # ================== KPIs ==================
+perfil.seccion("KPIs")
 st.markdown("### Resumen de actividad de soporte y riesgo académico")
 
-total_casos = len(sup_f)
-prom_tiempo = sup_f["tiempo_respuesta_horas"].mean() if total_casos > 0 else 0
-prom_satis = sup_f["satisfaccion_estudiante"].mean() if total_casos > 0 else 0
-
-if not mat_f.empty:
-    tasa_deserc_global = mat_f["es_desercion"].mean() * 100
-else:
-    tasa_deserc_global = 0
+resumen = resumen_soporte(selecciones)
+total_casos = resumen["casos"]
+prom_tiempo = resumen["tiempo_respuesta"]
+prom_satis = resumen["satisfaccion"]
+tasa_deserc_global = resumen["tasa_desercion"]
 
 k1, k2, k3, k4 = st.columns(4)
 
@@ -158,16 +155,12 @@ st.markdown(
 # =========================================================
 # 1. MOTIVOS DE SOPORTE (P3) – GRÁFICO MEJORADO
 # =========================================================
+perfil.seccion("1. Motivos de soporte (P3)")
 st.markdown("---")
 st.markdown("### 1. Motivos de soporte más frecuentes (P3)")
 
-if not sup_f.empty:
-    motivo_agg = (
-        sup_f.groupby("motivo")
-        .size()
-        .reset_index(name="casos")
-        .sort_values("casos", ascending=False)
-    )
+if total_casos > 0:
+    motivo_agg = agregar_motivos(selecciones)
 
     color_bar = "#60a5fa"
 
@@ -207,7 +200,8 @@ if not sup_f.empty:
         )
     )
 
-    st.altair_chart(chart_motivos + labels_motivos, use_container_width=True)
+    with perfil.paso("Altair"):
+        st.altair_chart(chart_motivos + labels_motivos, use_container_width=True)
 
     st.markdown(
         """
@@ -230,14 +224,12 @@ else:
 # =========================================================
 # 2. TIEMPO DE RESPUESTA POR TIPO DE ATENCIÓN – MEJORADO
 # =========================================================
+perfil.seccion("2. Tiempo de respuesta por tipo de atención")
 st.markdown("---")
 st.markdown("### 2. Tiempo de respuesta por tipo de atención")
 
-if not sup_f.empty:
-    tipo_agg = (
-        sup_f.groupby("tipo_atencion", as_index=False)["tiempo_respuesta_horas"]
-        .mean()
-    )
+if total_casos > 0:
+    tipo_agg = agregar_tipo_atencion(selecciones)
 
     color_tipo = "#34d399"  # verde suave
 
@@ -277,7 +269,8 @@ if not sup_f.empty:
         )
     )
 
-    st.altair_chart(chart_tipo + labels_tipo, use_container_width=True)
+    with perfil.paso("Altair"):
+        st.altair_chart(chart_tipo + labels_tipo, use_container_width=True)
 
     st.markdown(
         """
@@ -298,14 +291,12 @@ else:
 # =========================================================
 # 3. SATISFACCIÓN POR REGIÓN – GRÁFICO MEJORADO
 # =========================================================
+perfil.seccion("3. Satisfacción por región")
 st.markdown("---")
 st.markdown("### 3. Satisfacción del estudiante por región")
 
-if not sup_f.empty:
-    sat_reg = (
-        sup_f.groupby("region", as_index=False)["satisfaccion_estudiante"]
-        .mean()
-    )
+if total_casos > 0:
+    sat_reg = agregar_satisfaccion_region(selecciones)
 
     base_sat = alt.Chart(sat_reg).encode(
         x=alt.X("region:N", title="Región"),
@@ -330,7 +321,8 @@ if not sup_f.empty:
         .encode(y="mean(satisfaccion_estudiante):Q")
     )
 
-    st.altair_chart(puntos_sat + linea_prom, use_container_width=True)
+    with perfil.paso("Altair"):
+        st.altair_chart(puntos_sat + linea_prom, use_container_width=True)
 
     st.markdown(
         """
@@ -353,33 +345,12 @@ else:
 # =========================================================
 # 4. TIEMPO DE RESPUESTA VS DESERCIÓN (P5) – MEJORADO
 # =========================================================
+perfil.seccion("4. Relación entre tiempo de respuesta y deserción (P5)")
 st.markdown("---")
 st.markdown("### 4. Relación entre tiempo de respuesta y deserción (P5)")
 
-if not sup_f.empty and not mat_f.empty:
-    mat_seg = (
-        mat_f.groupby(["semestre", "facultad", "programa"], as_index=False)
-        .agg(
-            matriculas=("id_estudiante", "count"),
-            desertores=("es_desercion", "sum"),
-        )
-    )
-    mat_seg["tasa_desercion_%"] = mat_seg["desertores"] / mat_seg["matriculas"] * 100
-
-    sup_seg = (
-        sup_f.groupby(["semestre", "facultad", "programa"], as_index=False)
-        .agg(
-            casos_soporte=("id_caso", "count"),
-            tiempo_resp_prom=("tiempo_respuesta_horas", "mean"),
-            satis_prom=("satisfaccion_estudiante", "mean"),
-        )
-    )
-
-    seg = mat_seg.merge(
-        sup_seg,
-        on=["semestre", "facultad", "programa"],
-        how="inner",
-    )
+if total_casos > 0:
+    seg = cruzar_segmentos(selecciones)
 
     if not seg.empty:
         scatter_rel = (
@@ -403,7 +374,8 @@ if not sup_f.empty and not mat_f.empty:
             .properties(height=420)
         )
 
-        st.altair_chart(scatter_rel, use_container_width=True)
+        with perfil.paso("Altair"):
+            st.altair_chart(scatter_rel, use_container_width=True)
 
         st.markdown(
             """
@@ -429,6 +401,7 @@ if not sup_f.empty and not mat_f.empty:
 else:
     st.info("Se requieren datos tanto de matrículas como de soporte para construir esta relación.")
 
+perfil.seccion("(pie y navegación)")
 st.markdown(
     """
     <hr style="margin-top:40px; margin-bottom:10px; border: 1px solid #1e293b;">
@@ -505,7 +478,7 @@ header_html = (
                 'Proyecto analítico · Unidad de Educación Virtual – ITM'
             '</div>'
             '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                f'Periodo de análisis: <b>{texto_periodos()}</b>'
             '</div>'
         '</div>'
     '</div>'
@@ -583,3 +556,5 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+perfil.cerrar()
@@ -1,5 +1,9 @@
 import streamlit as st
 
+from datos import precargar, texto_periodos
+
+precargar()
+
 # ================== HEADER CORPORATIVO ==================
 def header_data_damz():
     header_html = (
@@ -21,7 +25,7 @@ def header_data_damz():
                     'Proyecto analítico · Unidad de Educación Virtual – ITM'
                 '</div>'
                 '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                    'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                    f'Periodo de análisis: <b>{texto_periodos()}</b>'
                 '</div>'
             '</div>'
         '</div>'
@@ -35,10 +39,10 @@ header_data_damz()
 st.title("📘 Conclusiones y Recomendaciones Estratégicas")
 
 st.markdown(
-    """
+    f"""
     Esta sección presenta una síntesis ejecutiva del análisis realizado por **DATA DAMZ SAS** con base en 
     las matrículas, el rendimiento académico, la carga docente y la actividad de soporte en los periodos 
-    **2024-1 y 2024-2** de la Unidad de Educación Virtual del ITM.
+    **{texto_periodos()}** de la Unidad de Educación Virtual del ITM.
 
     El objetivo es ofrecer una lectura clara y fundamentada que permita a la institución tomar **decisiones 
     estratégicas basadas en evidencia**, respondiendo directamente a la **Pregunta Focal** del estudio.
@@ -225,7 +229,7 @@ header_html = (
                 'Proyecto analítico · Unidad de Educación Virtual – ITM'
             '</div>'
             '<div style="font-size:16px; color:#94a3b8; margin-top:4px;">'
-                'Periodo de análisis: <b>2024-1 y 2024-2</b>'
+                f'Periodo de análisis: <b>{texto_periodos()}</b>'
             '</div>'
         '</div>'
     '</div>'
@@ -0,0 +1,152 @@
+"""Medición de tiempos por sección de cada rerun de una página.
+
+Cada página marca el inicio de sus secciones numeradas con
+``seccion("2. Indicadores por programa")``: la sección anterior se cierra
+al abrir la siguiente y la última con ``cerrar()``. Dentro de una sección,
+``paso("Altair")`` (contexto) o ``@medido("agregación")`` (decorador)
+separan la carga, las agregaciones y el armado/serialización de gráficos
+y tablas.
+
+Al cerrar, el desglose del rerun:
+
+- se escribe como una línea JSON en el logger ``uev.perfil`` (nivel INFO;
+  con ``UEV_PERFIL_LOG=/ruta/perfil.jsonl`` también a ese archivo);
+- alimenta el histograma de latencia por página de ``metricas.py``;
+- se muestra en un panel desplegable al final de la página si la URL trae
+  ``?perfil=1`` o si ``UEV_PERFIL=1``.
+
+Las marcas son de tiempo de reloj con ``perf_counter``; su costo es
+despreciable frente a cualquier sección.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+import metricas
+
+
+registro = logging.getLogger("uev.perfil")
+
+if os.environ.get("UEV_PERFIL_LOG") and not registro.handlers:
+    _archivo = logging.FileHandler(os.environ["UEV_PERFIL_LOG"], encoding="utf-8")
+    _archivo.setFormatter(logging.Formatter("%(message)s"))
+    registro.addHandler(_archivo)
+    registro.setLevel(logging.INFO)
+
+# Cada sesión de Streamlit ejecuta su script en un hilo propio.
+_estado = threading.local()
+
+
+# ================== MARCAS ==================
+def pagina(nombre):
+    """Empieza el registro de un rerun de la página ``nombre``."""
+    _estado.pagina = nombre
+    _estado.tiempos = []
+    _estado.inicio = time.perf_counter()
+    _estado.seccion = None
+    seccion("(inicio)")
+
+
+def _cerrar_seccion():
+    if getattr(_estado, "seccion", None) is None:
+        return
+    nombre, inicio = _estado.seccion
+    _estado.tiempos.append({
+        "seccion": nombre,
+        "paso": None,
+        "ms": (time.perf_counter() - inicio) * 1000,
+    })
+    _estado.seccion = None
+
+
+def seccion(nombre):
+    """Cierra la sección en curso y abre ``nombre``."""
+    if getattr(_estado, "tiempos", None) is None:
+        return
+    _cerrar_seccion()
+    _estado.seccion = (nombre, time.perf_counter())
+
+
+@contextmanager
+def paso(nombre):
+    """Mide un paso dentro de la sección en curso."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos = getattr(_estado, "tiempos", None)
+        if tiempos is not None:
+            actual = _estado.seccion[0] if _estado.seccion else None
+            tiempos.append({
+                "seccion": actual,
+                "paso": nombre,
+                "ms": (time.perf_counter() - inicio) * 1000,
+            })
+
+
+def medido(nombre):
+    """Decorador: cada llamada a la función se registra como ``paso(nombre)``."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with paso(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+# ================== SALIDA ==================
+def activo():
+    """Panel visible si la URL trae ``?perfil=1`` o si ``UEV_PERFIL=1``."""
+    if os.environ.get("UEV_PERFIL") == "1":
+        return True
+    try:
+        return st.query_params.get("perfil") == "1"
+    except Exception:  # fuera de una sesión de Streamlit
+        return False
+
+
+def cerrar():
+    """Cierra la última sección, registra el rerun y muestra el panel si aplica."""
+    if getattr(_estado, "tiempos", None) is None:
+        return None
+    _cerrar_seccion()
+    # Los pasos se registran antes que el total de su sección: se reordenan
+    # para que cada sección aparezca seguida de sus pasos.
+    tiempos, pasos = [], []
+    for t in _estado.tiempos:
+        if t["paso"] is None:
+            tiempos += [t, *pasos]
+            pasos = []
+        else:
+            pasos.append(t)
+    resumen = {
+        "pagina": _estado.pagina,
+        "total_ms": round((time.perf_counter() - _estado.inicio) * 1000, 3),
+        "tiempos": [{**t, "ms": round(t["ms"], 3)} for t in tiempos],
+    }
+    _estado.tiempos = None
+    registro.info(json.dumps(resumen, ensure_ascii=False))
+    metricas.observar_rerun(resumen["pagina"], resumen["total_ms"] / 1000)
+    if activo():
+        mostrar_panel(resumen)
+    return resumen
+
+
+def mostrar_panel(resumen):
+    with st.expander(f"⏱️ Perfil del rerun · {resumen['total_ms']:.0f} ms", expanded=False):
+        filas = [
+            {
+                "sección": t["seccion"],
+                "paso": t["paso"] or "(total sección)",
+                "ms": t["ms"],
+            }
+            for t in resumen["tiempos"]
+        ]
+        st.dataframe(filas, use_container_width=True, hide_index=True)
@@ -0,0 +1,38 @@
+"""Catálogo de periodos académicos del tablero.
+
+Los periodos salen de los datos (los semestres presentes en las tablas de
+matrículas y soporte, ver ``datos.cargar_periodos``), no de una lista fija:
+al cargar un periodo nuevo aparece en los encabezados, en los filtros y en
+la comparación entre periodos sin tocar las páginas.
+
+Un periodo tiene la forma ``AAAA-N`` (año y número de semestre) y se ordena
+por año y luego por número; cualquier otro texto va al final, en orden
+alfabético.
+"""
+import re
+
+
+_PATRON = re.compile(r"^\s*(\d{4})-(\d+)\s*$")
+
+
+def clave_periodo(periodo):
+    """Clave de orden cronológico de un periodo."""
+    coincidencia = _PATRON.match(str(periodo))
+    if coincidencia is None:
+        return (1, 0, 0, str(periodo))
+    return (0, int(coincidencia.group(1)), int(coincidencia.group(2)), "")
+
+
+def ordenar(periodos):
+    """Periodos únicos (sin nulos) en orden cronológico."""
+    return sorted({str(p) for p in periodos if p == p and p is not None}, key=clave_periodo)
+
+
+def etiqueta(periodos):
+    """Texto del encabezado: ``2024-1 y 2024-2``, o el rango si hay más de dos."""
+    periodos = ordenar(periodos)
+    if not periodos:
+        return "sin periodos cargados"
+    if len(periodos) <= 2:
+        return " y ".join(periodos)
+    return f"{periodos[0]} a {periodos[-1]}"
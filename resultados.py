@@ -0,0 +1,244 @@
+"""Caché acotada de resultados de agregación por combinación de filtros.
+
+Las mismas combinaciones de filtros (sobre todo la de "todo seleccionado",
+con la que llega cada usuario) se recalculaban en cada rerun. Cada bloque
+de agregación (``consultas.py``) se declara con ``@por_filtros(nombre)`` y su
+resultado se guarda bajo la selección normalizada (tuplas ordenadas) más la
+versión de los datos cargados. La caché es una sola por proceso, la
+comparten todas las sesiones y descarta la entrada usada hace más tiempo
+(LRU) al superar ``MAXIMO_RESULTADOS``.
+
+Detrás de la caché en memoria hay otra en disco (``CacheDisco``), en el
+almacén del juego de datos, que sobrevive a reinicios y despliegues: un
+proceso nuevo lee de ahí lo que ya calculó otro. Cada archivo se nombra
+por el hash de su clave completa (bloque, selección, hash de las fuentes,
+motor y hash del código que calcula), así que un cambio de datos o de
+código nunca sirve un resultado viejo. ``UEV_CACHE_DISCO_MB`` acota su
+tamaño (256 por defecto; 0 la apaga) y se borran primero los archivos
+usados hace más tiempo.
+
+Los resultados se comparten entre sesiones: igual que las tablas de
+``datos.py``, son de solo lectura.
+"""
+import functools
+import hashlib
+import importlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import almacen
+import datos
+import motores
+
+
+MAXIMO_RESULTADOS = 256
+
+MAXIMO_DISCO_MB = float(os.environ.get("UEV_CACHE_DISCO_MB") or 256)
+
+# Cambiar este número invalida todos los resultados guardados en disco.
+VERSION_DISCO = 1
+
+# Módulos cuyo código determina los resultados: si cambia alguno, cambian
+# las claves en disco. Las páginas no están: solo dibujan.
+MODULOS_CALCULO = [
+    "analitica", "codificacion", "consultas", "cubo", "datos", "estados",
+    "facetas", "hechos", "periodos",
+]
+
+
+# ================== CACHÉ LRU ==================
+class CacheLRU:
+    """Diccionario acotado con desalojo LRU y contadores de aciertos/fallos."""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, clave, calcular):
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave]
+            self.fallos += 1
+        # Se calcula fuera del candado: dos sesiones con la misma clave
+        # pueden calcularla a la vez, pero ninguna bloquea a las demás.
+        valor = calcular()
+        with self._candado:
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+        return valor
+
+    def estadisticas(self):
+        with self._candado:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "entradas": len(self._entradas),
+                "maximo": self.maximo,
+            }
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.aciertos = self.fallos = 0
+
+
+# ================== CACHÉ EN DISCO ==================
+class CacheDisco:
+    """Resultados serializados en archivos nombrados por el hash de su clave.
+
+    Varios procesos pueden compartir el directorio: cada archivo se escribe
+    a un temporal y se reemplaza, y un archivo borrado por el desalojo de
+    otro proceso es solo un fallo más.
+    """
+
+    def __init__(self, maximo_bytes):
+        self.maximo_bytes = maximo_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self._ocupados = None  # bytes en disco; se cuentan en la primera escritura
+        self._candado = threading.Lock()
+
+    def directorio(self):
+        return almacen.DIR_ALMACEN / "resultados"
+
+    def ruta(self, clave):
+        huella = hashlib.sha256(repr(clave).encode("utf-8")).hexdigest()
+        return self.directorio() / huella[:2] / f"{huella}.pkl"
+
+    def obtener(self, clave, calcular):
+        if self.maximo_bytes <= 0:
+            return calcular()
+        ruta = self.ruta(clave)
+        try:
+            with open(ruta, "rb") as archivo:
+                valor = pickle.load(archivo)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Truncado, de otra versión de pandas o con una clase que ya no
+            # existe: cualquier error al leerlo es un fallo y se recalcula.
+            try:
+                ruta.unlink(missing_ok=True)
+            except OSError:
+                pass
+        else:
+            # La fecha de modificación marca el último uso para el desalojo.
+            with self._candado:
+                self.aciertos += 1
+            try:
+                os.utime(ruta)
+            except OSError:
+                pass
+            return valor
+        with self._candado:
+            self.fallos += 1
+        valor = calcular()
+        self._guardar(ruta, valor)
+        return valor
+
+    def _guardar(self, ruta, valor):
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temporal, "wb") as archivo:
+            pickle.dump(valor, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        tamano = temporal.stat().st_size
+        os.replace(temporal, ruta)
+        with self._candado:
+            if self._ocupados is None:
+                self._ocupados = sum(t for _, t, _ in self._archivos())
+            else:
+                self._ocupados += tamano
+            if self._ocupados > self.maximo_bytes:
+                self._desalojar()
+
+    def _archivos(self):
+        """(ruta, bytes, último uso) de cada resultado guardado."""
+        archivos = []
+        for ruta in self.directorio().glob("*/*.pkl"):
+            try:
+                estado = ruta.stat()
+            except OSError:  # lo borró otro proceso
+                continue
+            archivos.append((ruta, estado.st_size, estado.st_mtime_ns))
+        return archivos
+
+    def _desalojar(self):
+        # Se vuelve a contar desde el disco: otros procesos también escriben.
+        archivos = sorted(self._archivos(), key=lambda a: a[2])
+        self._ocupados = sum(t for _, t, _ in archivos)
+        for ruta, tamano, _ in archivos:
+            if self._ocupados <= self.maximo_bytes:
+                break
+            ruta.unlink(missing_ok=True)
+            self._ocupados -= tamano
+
+    def estadisticas(self):
+        with self._candado:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "bytes": self._ocupados or 0,
+                "maximo_bytes": self.maximo_bytes,
+            }
+
+
+RESULTADOS = CacheLRU(MAXIMO_RESULTADOS)
+
+DISCO = CacheDisco(int(MAXIMO_DISCO_MB * 1024 * 1024))
+
+
+# ================== CLAVES ==================
+def normalizar_selecciones(selecciones):
+    """Selección como tupla ordenada: el orden de los clics no cambia la clave."""
+    return tuple(
+        (dimension, tuple(sorted(str(v) for v in valores)))
+        for dimension, valores in sorted(selecciones.items())
+    )
+
+
+@functools.cache
+def version_codigo():
+    """Hash del código de ``MODULOS_CALCULO`` y del motor configurado."""
+    sha = hashlib.sha256()
+    modulos = MODULOS_CALCULO + ([motores._modulo.__name__] if motores._modulo else [])
+    for modulo in modulos:
+        with open(importlib.import_module(modulo).__file__, "rb") as archivo:
+            sha.update(archivo.read())
+    return sha.hexdigest()
+
+
+def por_filtros(nombre):
+    """Decorador para funciones ``f(selecciones)`` que agregan datos filtrados.
+
+    ``nombre`` identifica el bloque en la clave (las páginas se ejecutan
+    todas como ``__main__``, así que el nombre de la función no basta).
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(selecciones):
+            clave = (nombre, datos.version_datos(), normalizar_selecciones(selecciones))
+            clave_disco = (VERSION_DISCO, *clave, motores.MOTOR, version_codigo())
+            return RESULTADOS.obtener(
+                clave, lambda: DISCO.obtener(clave_disco, lambda: funcion(selecciones))
+            )
+        return envoltura
+    return decorador
+
+
+def estadisticas():
+    """Aciertos, fallos y ocupación de la caché de resultados del proceso."""
+    return RESULTADOS.estadisticas()
+
+
+def estadisticas_disco():
+    """Aciertos, fallos y bytes de la caché en disco vistos por este proceso."""
+    return DISCO.estadisticas()
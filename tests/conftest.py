@@ -0,0 +1,70 @@
+"""Entorno común de las pruebas.
+
+Las pruebas corren sobre una copia de los tres CSV del repositorio en una
+carpeta temporal (``UEV_DIR_DATOS``), así que el almacén y las cachés en
+disco que generan no tocan los del repositorio. Las variables se fijan
+aquí, antes de que las pruebas importen ``datos.py`` o ``motores.py``, que
+las leen al importarse. Lo que depende de otro motor (``UEV_MOTOR``) corre
+en un proceso aparte con ``ejecutar``.
+"""
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+
+CSV = ["matriculaslimpias.csv", "docenteslimpios.csv", "soporte_atenciones_focus.csv"]
+
+DIR_DATOS = Path(tempfile.mkdtemp(prefix="uev-pruebas-"))
+for _nombre in CSV:
+    shutil.copy(RAIZ / _nombre, DIR_DATOS / _nombre)
+
+os.environ.update({
+    "UEV_DIR_DATOS": str(DIR_DATOS),
+    "UEV_MOTOR": "pandas",
+    "UEV_REFRESCO": "0",
+    "UEV_CACHE_DISCO_MB": "0",
+})
+os.environ.pop("UEV_METRICAS_PUERTO", None)
+os.environ.pop("UEV_METRICAS_ARCHIVO", None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(DIR_DATOS, ignore_errors=True)
+
+
+def ejecutar(codigo, tmp_path, **entorno):
+    """Corre ``codigo`` en un proceso nuevo con las variables ``entorno``.
+
+    ``codigo`` deja su resultado en la variable ``resultado``; se devuelve
+    deserializado.
+    """
+    salida = tmp_path / f"resultado-{len(list(tmp_path.iterdir()))}.pkl"
+    programa = (
+        "import pickle\n"
+        "def main():\n"
+        + "".join(f"    {linea}\n" for linea in codigo.strip().splitlines())
+        + f"    with open({str(salida)!r}, 'wb') as f:\n"
+        + "        pickle.dump(resultado, f)\n"
+        + "if __name__ == '__main__':\n"
+        + "    main()\n"
+    )
+    proceso = subprocess.run(
+        [sys.executable, "-c", programa],
+        cwd=RAIZ,
+        env={**os.environ, "PYTHONPATH": str(RAIZ), **entorno},
+        capture_output=True,
+        text=True,
+        timeout=600,
+    )
+    if proceso.returncode != 0:
+        pytest.fail(f"el proceso terminó con {proceso.returncode}:\n{proceso.stderr[-3000:]}")
+    with open(salida, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,81 @@
+"""Códigos de estado y formatos de la API local."""
+import json
+import threading
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import api
+
+
+@pytest.fixture(scope="module")
+def url():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), api.Manejador)
+    servidor.daemon_threads = True
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _get(url, ruta, **encabezados):
+    peticion = urllib.request.Request(url + quote(ruta, safe="/?=&%"), headers=encabezados)
+    try:
+        with urllib.request.urlopen(peticion, timeout=60) as respuesta:
+            return respuesta.status, respuesta.headers["Content-Type"], respuesta.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers["Content-Type"], error.read()
+
+
+@pytest.mark.parametrize("ruta", ["/", *api.RUTAS])
+def test_rutas_responden_json(url, ruta):
+    estado, tipo, cuerpo = _get(url, ruta)
+    assert estado == 200
+    assert tipo == api.TIPO_JSON
+    json.loads(cuerpo)
+
+
+@pytest.mark.parametrize("ruta, estado", [
+    ("/no_existe", 404),
+    ("/kpis/general?facultad=Ingeniería", 400),  # no admite filtros
+    ("/prog_ind?region=Antioquia", 400),  # dimensión de otra tabla
+    ("/prog_ind?formato=xml", 400),
+    ("/prog_ind?facultad=Ingeniería&facultad=Artes%20y%20Humanidades", 200),
+    ("/prog_ind/", 200),
+])
+def test_codigos_de_estado(url, ruta, estado):
+    codigo, tipo, cuerpo = _get(url, ruta)
+    assert codigo == estado
+    assert tipo == api.TIPO_JSON
+    if estado != 200:
+        assert "error" in json.loads(cuerpo)
+
+
+def test_filtros_restringen(url):
+    _, _, todos = _get(url, "/prog_ind")
+    _, _, ingenieria = _get(url, "/prog_ind?facultad=Ingeniería")
+    _, _, vacio = _get(url, "/prog_ind?programa=")
+    assert 0 < len(json.loads(ingenieria)) < len(json.loads(todos))
+    assert json.loads(vacio) == []
+
+
+def test_formato_arrow(url):
+    pa = pytest.importorskip("pyarrow")
+    for ruta, encabezados in [
+        ("/curso_ind?formato=arrow", {}),
+        ("/curso_ind", {"Accept": api.TIPO_ARROW}),
+    ]:
+        estado, tipo, cuerpo = _get(url, ruta, **encabezados)
+        assert (estado, tipo) == (200, api.TIPO_ARROW)
+        tabla = pa.ipc.open_stream(cuerpo).read_all()
+        assert "nombre_curso" in tabla.column_names
+
+
+def test_arrow_sin_pyarrow(url, monkeypatch):
+    monkeypatch.setattr(api, "pa", None)
+    estado, _, _ = _get(url, "/curso_ind?formato=arrow")
+    assert estado == 406
@@ -0,0 +1,21 @@
+"""Las claves sustitutas y sus diccionarios devuelven los valores originales."""
+import pandas as pd
+import pytest
+
+import codificacion
+import datos
+
+
+@pytest.mark.parametrize("nombre", list(datos.FUENTES))
+def test_codificar_y_decodificar(nombre):
+    df = datos.leer_fuente(nombre)
+    claves = codificacion.tabla_claves(df)
+    diccionarios = codificacion.diccionarios(df)
+    assert list(claves.columns) == list(diccionarios)
+    assert set(claves.columns) == set(codificacion.COLUMNAS_CODIFICADAS) & set(df.columns)
+    for columna in claves.columns:
+        assert claves[columna].dtype == "int32"
+        decodificada = codificacion.decodificar(claves[columna], diccionarios[columna])
+        pd.testing.assert_series_equal(
+            pd.Series(decodificada, index=df.index, name=columna), df[columna]
+        )
@@ -0,0 +1,58 @@
+"""El cubo preagregado da los mismos totales que agrupar las filas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import cubo
+import datos
+
+
+def _por_filas(mat, selecciones, por):
+    mascara = np.ones(len(mat), dtype=bool)
+    for dimension, valores in selecciones.items():
+        mascara &= mat[dimension].isin(valores).to_numpy()
+    return (
+        mat[mascara]
+        .assign(nota=lambda d: d["nota_final"].astype(np.float64))
+        .groupby(por, observed=True)
+        .agg(
+            matriculas=("nota", "size"),
+            suma_nota=("nota", "sum"),
+            notas=("nota", "count"),
+            deserciones=("es_desercion", "sum"),
+            reprobaciones=("es_reprob", "sum"),
+            desercion_o_reprob=("es_desercion_o_reprob", "sum"),
+        )
+    )
+
+
+@pytest.mark.parametrize("por", [["programa"], ["semestre", "modalidad"], ["programa", "estado_academico"]])
+@pytest.mark.parametrize("selecciones", [
+    {},
+    {"facultad": ["Ingeniería"]},
+    {"semestre": ["2024-2"], "modalidad": ["AMV"]},
+    {"programa": []},
+])
+def test_enrollar_igual_que_groupby(selecciones, por):
+    mat = datos.leer_matriculas()
+    enrollado = cubo.enrollar(cubo.filtrar_cubo(cubo.construir_cubo(mat), selecciones), por)
+    esperado = _por_filas(mat, selecciones, por)
+    pd.testing.assert_frame_equal(enrollado, esperado, check_dtype=False)
+
+
+def test_kpis_igual_que_filas():
+    mat = datos.leer_matriculas()
+    kpis = cubo.kpis(cubo.construir_cubo(mat))
+    assert kpis["matriculas"] == len(mat)
+    assert kpis["tasa_desercion"] == pytest.approx(mat["es_desercion"].mean() * 100)
+    assert kpis["tasa_reprob"] == pytest.approx(mat["es_reprob"].mean() * 100)
+    assert kpis["nota_promedio"] == pytest.approx(mat["nota_final"].astype(np.float64).mean())
+
+
+def test_combinar_igual_que_construir():
+    mat = datos.leer_matriculas()
+    mitad = len(mat) // 2
+    combinado = cubo.combinar(
+        cubo.construir_cubo(mat.iloc[:mitad]), cubo.construir_cubo(mat.iloc[mitad:])
+    )
+    pd.testing.assert_frame_equal(combinado, cubo.construir_cubo(mat), check_dtype=False)
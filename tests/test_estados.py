@@ -0,0 +1,85 @@
+"""Combinar los estados de varios trozos da el estado de una sola pasada."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import datos
+import estados
+
+CLAVES = ["facultad", "programa"]
+MEDIDAS = ["nota_final", "es_desercion", "es_reprob"]
+DISTINTOS = ["id_estudiante", "id_curso"]
+
+
+def _comparar(combinado, directo):
+    assert combinado.claves == directo.claves
+    momentos = combinado.momentos
+    pd.testing.assert_frame_equal(momentos, directo.momentos[momentos.columns], check_dtype=False)
+    for columna in DISTINTOS:
+        pd.testing.assert_series_equal(
+            estados.distintos(combinado, columna), estados.distintos(directo, columna)
+        )
+    for medida in MEDIDAS:
+        pd.testing.assert_series_equal(estados.media(combinado, medida), estados.media(directo, medida))
+        pd.testing.assert_series_equal(
+            estados.varianza(combinado, medida), estados.varianza(directo, medida)
+        )
+
+
+def _parcial(df):
+    return estados.parcial(df, CLAVES, MEDIDAS, DISTINTOS)
+
+
+@pytest.mark.parametrize("trozos", [1, 2, 7])
+def test_combinar_trozos_igual_que_una_pasada(trozos):
+    mat = datos.leer_matriculas()
+    # Trozos al azar: comparten grupos, estudiantes y cursos.
+    orden = np.random.default_rng(trozos).permutation(len(mat))
+    partes = [mat.iloc[np.sort(i)] for i in np.array_split(orden, trozos)]
+    _comparar(estados.combinar(_parcial(p) for p in partes), _parcial(mat))
+
+
+def test_combinar_particiones_disjuntas():
+    mat = datos.leer_matriculas()
+    partes = [parte for _, parte in mat.groupby("facultad", observed=True)]
+    _comparar(estados.combinar((_parcial(p) for p in partes), disjuntos=True), _parcial(mat))
+
+
+def test_combinar_con_diccionarios_distintos():
+    # Un lote con un programa que la tabla anterior no tenía.
+    anterior = pd.DataFrame({
+        "facultad": pd.Categorical(["A", "A", "B"]),
+        "programa": pd.Categorical(["p1", "p2", "p1"]),
+        "nota_final": [3.0, np.nan, 4.5],
+        "es_desercion": [False, True, False],
+        "es_reprob": [True, False, False],
+        "id_estudiante": pd.Categorical(["e1", "e2", "e1"]),
+        "id_curso": pd.Categorical(["c1", "c1", "c2"]),
+    })
+    lote = pd.DataFrame({
+        "facultad": pd.Categorical(["B", "A", None]),
+        "programa": pd.Categorical(["p3", "p1", "p1"]),
+        "nota_final": [2.0, 1.0, 5.0],
+        "es_desercion": [False, False, True],
+        "es_reprob": [True, True, False],
+        "id_estudiante": pd.Categorical(["e3", "e1", "e4"]),
+        "id_curso": pd.Categorical(["c3", "c1", "c1"]),
+    })
+    completa = pd.concat([anterior, lote], ignore_index=True)
+    completa = completa.astype({c: "category" for c in ["facultad", "programa", "id_estudiante", "id_curso"]})
+    _comparar(estados.combinar([_parcial(anterior), _parcial(lote)]), _parcial(completa))
+
+
+def test_parcial_igual_que_groupby():
+    mat = datos.leer_matriculas()
+    estado = _parcial(mat)
+    grupos = mat.groupby(CLAVES, observed=True)
+    pd.testing.assert_series_equal(estados.filas(estado), grupos.size(), check_names=False)
+    pd.testing.assert_series_equal(
+        estados.media(estado, "nota_final"), grupos["nota_final"].mean().astype(np.float64),
+        check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        estados.distintos(estado, "id_estudiante"), grupos["id_estudiante"].nunique(),
+        check_names=False,
+    )
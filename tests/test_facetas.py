@@ -0,0 +1,66 @@
+"""El índice de facetas filtra igual que encadenar ``isin``."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import datos
+import facetas
+
+
+def _con_isin(df, selecciones):
+    mascara = np.ones(len(df), dtype=bool)
+    for dimension, valores in selecciones.items():
+        mascara &= df[dimension].isin(valores).to_numpy()
+    return df[mascara]
+
+
+SELECCIONES = [
+    {},
+    {"semestre": ["2024-1", "2024-2"]},
+    {"facultad": ["Ingeniería"]},
+    {"facultad": ["Ingeniería", "Artes y Humanidades"], "semestre": ["2024-2"]},
+    {"programa": []},
+    {"facultad": ["NoExiste"]},
+    {"facultad": ["NoExiste", "Ingeniería"], "programa": ["Ingeniería de Sistemas"]},
+]
+
+
+@pytest.mark.parametrize("selecciones", SELECCIONES)
+def test_filtrar_igual_que_isin(selecciones):
+    mat = datos.leer_matriculas()
+    indice = facetas.construir_indice(mat, datos.FACETAS["matriculas"])
+    pd.testing.assert_frame_equal(
+        facetas.filtrar(mat, indice, selecciones), _con_isin(mat, selecciones)
+    )
+
+
+def _con_nulos():
+    return pd.DataFrame({
+        "facultad": pd.Categorical(["A", None, "B", "A", None, "C", "B", "A", "C"]),
+        "region": pd.Categorical(["x", "y", None, "y", "x", "x", None, "y", "x"]),
+        "valor": np.arange(9),
+    })
+
+
+@pytest.mark.parametrize("selecciones", [
+    {"facultad": ["A", "B", "C"]},  # todos los valores: los nulos igual quedan fuera
+    {"facultad": ["A"], "region": ["x", "y"]},
+    {"region": []},
+    {"facultad": ["B", "Z"]},
+])
+def test_filtrar_con_nulos(selecciones):
+    df = _con_nulos()
+    indice = facetas.construir_indice(df, ["facultad", "region"])
+    pd.testing.assert_frame_equal(
+        facetas.filtrar(df, indice, selecciones), _con_isin(df, selecciones)
+    )
+
+
+def test_anexar_indice_igual_que_reconstruir():
+    df = _con_nulos()
+    anteriores, lote = df.iloc[:5], df.iloc[5:]
+    indice = facetas.construir_indice(anteriores, ["facultad", "region"])
+    anexado = facetas.anexar_indice(indice, len(anteriores), lote, ["facultad", "region"])
+    completo = facetas.construir_indice(df, ["facultad", "region"])
+    assert sorted(anexado.columns) == sorted(completo.columns)
+    pd.testing.assert_frame_equal(anexado[completo.columns], completo)
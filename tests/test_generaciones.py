@@ -0,0 +1,83 @@
+"""Un lote que llega entre la carga y el refresco no mezcla generaciones.
+
+Las claves de la caché de resultados (también en disco) y la base DuckDB
+deben describir las tablas que la generación cargó, no las que ya dejó la
+ingesta en el almacén.
+"""
+import importlib.util
+import shutil
+
+import pytest
+
+from conftest import CSV, DIR_DATOS, ejecutar
+
+LOTE = 40
+
+CONSULTAR = """
+import datos, consultas, motores
+def contar():
+    filas = len(datos.cargar_matriculas())
+    vistas = [consultas.totales_generales({})["matriculas"],
+              consultas.resumen_matriculas({})["matriculas"],
+              int(consultas.indicadores_programa({})["matriculas"].sum()),
+              int(consultas.indicadores_curso({})["matriculas"].sum()),
+              int(consultas.segmentos_riesgo({})["matriculas"].sum()),
+              int(consultas.cruzar_segmentos({})["matriculas"].sum())]
+    if motores.MOTOR == "duckdb":
+        import motor_duckdb
+        vistas.append(int(motor_duckdb.consultar("SELECT count(*) AS n FROM matriculas")["n"][0]))
+    return filas, vistas
+"""
+
+MOTORES = {
+    "pandas": {},
+    "duckdb": {"UEV_MOTOR": "duckdb"},
+    "polars": {"UEV_MOTOR": "polars"},
+    "paralelo": {"UEV_MOTOR": "paralelo", "UEV_PROCESOS": "2"},
+}
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_lote_entre_carga_y_refresco(tmp_path, motor):
+    if motor in ("duckdb", "polars") and importlib.util.find_spec(motor) is None:
+        pytest.skip(f"{motor} no está instalado")
+    carpeta = tmp_path / "datos"
+    carpeta.mkdir()
+    for nombre in CSV:
+        shutil.copy(DIR_DATOS / nombre, carpeta / nombre)
+    fuente = carpeta / "matriculaslimpias.csv"
+    lineas = fuente.read_text(encoding="utf-8").splitlines(keepends=True)
+    fuente.write_text("".join(lineas[:-LOTE]), encoding="utf-8")
+    lote = tmp_path / "lote.csv"
+    lote.write_text(lineas[0] + "".join(lineas[-LOTE:]), encoding="utf-8")
+    entorno = {"UEV_DIR_DATOS": str(carpeta), "UEV_CACHE_DISCO_MB": "64", **MOTORES[motor]}
+
+    # Las tablas se cargan, pero la primera consulta llega después del lote.
+    entre, despues = ejecutar(
+        CONSULTAR
+        + "import ingesta\n"
+        "for futuro in datos.precargar():\n"
+        "    futuro.result()\n"
+        f"ingesta.ingestar('matriculas', {str(lote)!r})\n"
+        "entre = contar()\n"
+        "assert datos.refrescar()\n"
+        "despues = contar()\n"
+        "if hasattr(motores._modulo, 'cerrar'):\n"
+        "    motores._modulo.cerrar()\n"
+        "resultado = entre, despues",
+        tmp_path, **entorno,
+    )
+    total = len(lineas) - 1
+    # Hasta el refresco se sirve la generación cargada, completa y sin el lote.
+    assert entre == (total - LOTE, [total - LOTE] * len(entre[1]))
+    assert despues == (total, [total] * len(despues[1]))
+
+    # Un proceso nuevo lee la caché en disco que dejó el anterior.
+    nuevo = ejecutar(
+        CONSULTAR
+        + "resultado = contar()\n"
+        "if hasattr(motores._modulo, 'cerrar'):\n"
+        "    motores._modulo.cerrar()",
+        tmp_path, **entorno,
+    )
+    assert nuevo == despues
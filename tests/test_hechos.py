@@ -0,0 +1,24 @@
+"""El índice por curso de la tabla de hechos da las mismas filas que filtrarla."""
+import pandas as pd
+
+import datos
+import hechos
+
+
+def test_filas_curso_igual_que_filtrar():
+    tabla = datos.leer_hechos(datos.leer_matriculas(), datos.leer_docentes())
+    inicios = hechos.indice_cursos(tabla)
+    for id_curso in tabla["id_curso"].cat.categories:
+        pd.testing.assert_frame_equal(
+            hechos.filas_curso(tabla, inicios, id_curso),
+            tabla[tabla["id_curso"] == id_curso],
+        )
+    assert hechos.filas_curso(tabla, inicios, "CURSO-QUE-NO-EXISTE").empty
+
+
+def test_matriculas_del_curso_de_la_generacion():
+    tabla = datos.cargar_hechos()
+    id_curso = tabla["id_curso"].cat.categories[0]
+    pd.testing.assert_frame_equal(
+        datos.matriculas_del_curso(id_curso), tabla[tabla["id_curso"] == id_curso]
+    )
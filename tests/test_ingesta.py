@@ -0,0 +1,110 @@
+"""Anexar un lote deja las mismas tablas que reconstruir desde el CSV completo."""
+import shutil
+
+import pandas as pd
+import pytest
+
+from conftest import CSV, DIR_DATOS, ejecutar
+
+LOTES = {"matriculas": "matriculaslimpias.csv", "soporte": "soporte_atenciones_focus.csv"}
+
+LEER_TABLAS = """
+import datos
+mat = datos.leer_fuente("matriculas")
+doc = datos.leer_docentes()
+sup = datos.leer_fuente("soporte")
+resultado = {
+    "matriculas": mat,
+    "soporte": sup,
+    "hechos_matricula": datos.leer_hechos(mat, doc),
+    "cubo_matriculas": datos.leer_cubo(mat),
+    "cubo_soporte": datos.leer_cubo_soporte(sup),
+    "facetas_matriculas": datos.leer_facetas("matriculas", mat),
+    "facetas_soporte": datos.leer_facetas("soporte", sup),
+    "facetas_hechos_matricula": datos.leer_facetas(
+        "hechos_matricula", datos.leer_hechos(mat, doc)
+    ),
+}
+"""
+
+
+def _copiar(destino):
+    destino.mkdir()
+    for nombre in CSV:
+        shutil.copy(DIR_DATOS / nombre, destino / nombre)
+    return destino
+
+
+def _separar(carpeta, archivo, filas_lote):
+    """Deja en el CSV todo menos las últimas ``filas_lote`` líneas; devuelve el lote."""
+    ruta = carpeta / archivo
+    lineas = ruta.read_text(encoding="utf-8").splitlines(keepends=True)
+    ruta.write_text("".join(lineas[:-filas_lote]), encoding="utf-8")
+    lote = carpeta.parent / f"lote-{archivo}"
+    lote.write_text(lineas[0] + "".join(lineas[-filas_lote:]), encoding="utf-8")
+    return lote
+
+
+def _comparar(esperado, obtenido):
+    # Un valor nuevo del lote va al final del diccionario de la categórica;
+    # la reconstrucción lo ordena: se comparan los valores, no los códigos.
+    assert list(esperado.columns) == list(obtenido.columns)
+    for columna in esperado.columns:
+        if isinstance(esperado[columna].dtype, pd.CategoricalDtype):
+            assert set(esperado[columna].cat.categories) == set(obtenido[columna].cat.categories)
+            esperado = esperado.assign(**{columna: esperado[columna].astype(str)})
+            obtenido = obtenido.assign(**{columna: obtenido[columna].astype(str)})
+    pd.testing.assert_frame_equal(esperado, obtenido, check_dtype=False)
+
+
+def test_ingestar_igual_que_reconstruir(tmp_path):
+    completo = _copiar(tmp_path / "completo")
+    incremental = _copiar(tmp_path / "incremental")
+    lotes = {nombre: _separar(incremental, archivo, 150) for nombre, archivo in LOTES.items()}
+
+    # Se arma el almacén con las fuentes recortadas y luego llegan los lotes.
+    ejecutar(
+        "import datos, ingesta\n"
+        "datos.leer_fuente('matriculas'); datos.leer_fuente('soporte')\n"
+        + "".join(f"ingesta.ingestar({n!r}, {str(r)!r})\n" for n, r in lotes.items())
+        + "resultado = None",
+        tmp_path, UEV_DIR_DATOS=str(incremental),
+    )
+    for archivo in LOTES.values():
+        assert (incremental / archivo).read_bytes() == (completo / archivo).read_bytes()
+
+    esperado = ejecutar(LEER_TABLAS, tmp_path, UEV_DIR_DATOS=str(completo))
+    obtenido = ejecutar(LEER_TABLAS, tmp_path, UEV_DIR_DATOS=str(incremental))
+    for tabla in esperado:
+        try:
+            _comparar(esperado[tabla], obtenido[tabla])
+        except AssertionError as error:
+            raise AssertionError(f"{tabla}: {error}") from error
+
+
+@pytest.mark.parametrize("reemplazo, mensaje", [
+    ((",", ";"), "encabezado"),
+    (("2024-1", "2024-X"), "semestre"),
+])
+def test_lote_rechazado_no_toca_la_fuente(tmp_path, reemplazo, mensaje):
+    carpeta = _copiar(tmp_path / "datos")
+    lote = _separar(carpeta, LOTES["matriculas"], 50)
+    lineas = lote.read_text(encoding="utf-8").splitlines(keepends=True)
+    if reemplazo[0] == ",":
+        lineas[0] = lineas[0].replace(*reemplazo)
+    else:
+        lineas[1:] = [linea.replace(*reemplazo) for linea in lineas[1:]]
+    lote.write_text("".join(lineas), encoding="utf-8")
+    antes = (carpeta / LOTES["matriculas"]).read_bytes()
+
+    error = ejecutar(
+        "import ingesta\n"
+        "try:\n"
+        f"    ingesta.ingestar('matriculas', {str(lote)!r})\n"
+        "    resultado = None\n"
+        "except ingesta.ErrorIngesta as e:\n"
+        "    resultado = str(e)",
+        tmp_path, UEV_DIR_DATOS=str(carpeta),
+    )
+    assert error is not None and mensaje in error
+    assert (carpeta / LOTES["matriculas"]).read_bytes() == antes
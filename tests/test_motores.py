@@ -0,0 +1,128 @@
+"""Cada motor de ``UEV_MOTOR`` da los mismos agregados que pandas."""
+import importlib.util
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import consultas
+from conftest import ejecutar
+
+MATRICULAS = ["semestre", "facultad", "programa", "modalidad"]
+SOPORTE = ["semestre", "facultad", "programa", "region"]
+
+# Función de consultas.py -> dimensiones que acepta (como en api.py).
+FUNCIONES = {
+    "totales_generales": [],
+    "programas_en_riesgo": ["semestre", "facultad", "programa"],
+    "indicadores_periodo": ["facultad", "programa"],
+    "resumen_matriculas": MATRICULAS,
+    "estados_por_programa": MATRICULAS,
+    "indicadores_programa": MATRICULAS,
+    "indicadores_curso": MATRICULAS,
+    "segmentos_riesgo": MATRICULAS,
+    "agregar_curso_docente": MATRICULAS,
+    "agregar_docente": MATRICULAS,
+    "resumen_docentes": MATRICULAS,
+    "resumen_soporte": SOPORTE,
+    "agregar_motivos": SOPORTE,
+    "agregar_tipo_atencion": SOPORTE,
+    "agregar_satisfaccion_region": SOPORTE,
+    "cruzar_segmentos": SOPORTE,
+}
+
+SELECCIONES = [
+    {},
+    {"facultad": ["Ingeniería"]},
+    {"semestre": ["2024-2"], "facultad": ["Ciencias Económicas", "Artes y Humanidades"]},
+    {"semestre": ["2024-1"], "region": ["Antioquia"], "modalidad": ["AMV"]},
+    {"programa": []},  # selección vacía: ninguna fila
+    {"facultad": ["NoExiste"]},
+]
+
+MOTORES = {
+    "duckdb": {"UEV_MOTOR": "duckdb"},
+    "polars": {"UEV_MOTOR": "polars"},
+    "paralelo": {"UEV_MOTOR": "paralelo", "UEV_PROCESOS": "2"},
+}
+REQUIERE = {"duckdb": "duckdb", "polars": "polars"}
+
+CALCULAR = f"""
+import consultas, motores
+FUNCIONES = {FUNCIONES!r}
+SELECCIONES = {SELECCIONES!r}
+resultado = {{}}
+for nombre, dimensiones in FUNCIONES.items():
+    for i, seleccion in enumerate(SELECCIONES):
+        seleccion = {{d: v for d, v in seleccion.items() if d in dimensiones}}
+        resultado[nombre, i] = getattr(consultas, nombre)(seleccion)
+if hasattr(motores._modulo, "cerrar"):
+    motores._modulo.cerrar()
+"""
+
+
+def _con_pandas():
+    resultado = {}
+    for nombre, dimensiones in FUNCIONES.items():
+        for i, seleccion in enumerate(SELECCIONES):
+            seleccion = {d: v for d, v in seleccion.items() if d in dimensiones}
+            resultado[nombre, i] = getattr(consultas, nombre)(seleccion)
+    return resultado
+
+
+def _comparar_diccionario(esperado, obtenido):
+    assert esperado.keys() == obtenido.keys()
+    for clave, valor in esperado.items():
+        otro = obtenido[clave]
+        if pd.isna(valor):
+            assert pd.isna(otro), clave
+            continue
+        assert math.isclose(float(valor), float(otro), rel_tol=1e-5), clave
+        if isinstance(valor, (int, np.integer)):
+            assert isinstance(otro, (int, np.integer)), f"{clave}: {otro!r} no es entero"
+
+
+def _comparar_tabla(esperado, obtenido):
+    assert list(esperado.columns) == list(obtenido.columns)
+    assert esperado.index.name == obtenido.index.name
+    esperado = esperado.reset_index(drop=esperado.index.name is None)
+    obtenido = obtenido.reset_index(drop=obtenido.index.name is None)
+    for columna in esperado.columns:
+        if esperado[columna].dtype.kind in "iu":
+            assert obtenido[columna].dtype.kind in "iu" or obtenido.empty, f"{columna} no es entera"
+        if esperado[columna].dtype.kind in "ifub":
+            esperado[columna] = esperado[columna].astype(np.float64)
+            obtenido[columna] = obtenido[columna].astype(np.float64)
+        else:
+            esperado[columna] = esperado[columna].astype(str)
+            obtenido[columna] = obtenido[columna].astype(str)
+    # Los empates (p. ej. motivos con los mismos casos) pueden salir en otro orden.
+    columnas = list(esperado.columns)
+    pd.testing.assert_frame_equal(
+        esperado.sort_values(columnas).reset_index(drop=True),
+        obtenido.sort_values(columnas).reset_index(drop=True),
+        check_dtype=False,
+        rtol=1e-5,
+    )
+
+
+@pytest.fixture(scope="module")
+def con_pandas():
+    return _con_pandas()
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_motor_igual_que_pandas(motor, con_pandas, tmp_path):
+    if motor in REQUIERE and importlib.util.find_spec(REQUIERE[motor]) is None:
+        pytest.skip(f"{REQUIERE[motor]} no está instalado")
+    obtenido = ejecutar(CALCULAR, tmp_path, **MOTORES[motor])
+    assert obtenido.keys() == con_pandas.keys()
+    for clave, esperado in con_pandas.items():
+        try:
+            if isinstance(esperado, dict):
+                _comparar_diccionario(esperado, obtenido[clave])
+            else:
+                _comparar_tabla(esperado, obtenido[clave])
+        except AssertionError as error:
+            raise AssertionError(f"{motor} {clave}: {error}") from error
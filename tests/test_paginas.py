@@ -0,0 +1,34 @@
+"""Cada página se ejecuta completa con ``AppTest``, sin servidor."""
+import pytest
+
+from conftest import RAIZ, ejecutar
+
+PAGINAS = ["app.py"] + sorted(str(p.relative_to(RAIZ)) for p in (RAIZ / "pages").glob("*.py"))
+
+
+def _renderizar(paginas, tmp_path, **entorno):
+    codigo = f"""
+from streamlit.testing.v1 import AppTest
+import motores
+resultado = {{}}
+for pagina in {paginas!r}:
+    prueba = AppTest.from_file({str(RAIZ)!r} + "/" + pagina, default_timeout=600)
+    prueba.run()
+    resultado[pagina] = [str(e.value) for e in prueba.exception]
+if hasattr(motores._modulo, "cerrar"):
+    motores._modulo.cerrar()
+"""
+    return ejecutar(codigo, tmp_path, **entorno)
+
+
+def test_paginas_sin_errores(tmp_path):
+    assert _renderizar(PAGINAS, tmp_path) == {p: [] for p in PAGINAS}
+
+
+@pytest.mark.parametrize("procesos", ["1", "2"])
+def test_paginas_con_motor_paralelo(tmp_path, procesos):
+    # Streamlit instala la página como __main__: los procesos del pool no
+    # deben volver a ejecutarla (ver motor_paralelo._sin_principal).
+    paginas = [p for p in PAGINAS if p.startswith(("pages/3_", "pages/4_"))]
+    resultado = _renderizar(paginas, tmp_path, UEV_MOTOR="paralelo", UEV_PROCESOS=procesos)
+    assert resultado == {p: [] for p in paginas}
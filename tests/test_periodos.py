@@ -0,0 +1,28 @@
+"""Catálogo de periodos de los encabezados (periodos.py y ``datos.cargar_periodos``)."""
+from conftest import ejecutar
+import periodos
+
+
+def test_orden_cronologico():
+    assert periodos.ordenar(["2024-2", "2023-10", None, "2024-1", "otro", "2023-2", "2024-1"]) == [
+        "2023-2", "2023-10", "2024-1", "2024-2", "otro",
+    ]
+    assert periodos.etiqueta(["2024-2", "2024-1"]) == "2024-1 y 2024-2"
+    assert periodos.etiqueta(["2024-1", "2023-1", "2023-2"]) == "2023-1 a 2024-1"
+    assert periodos.etiqueta([]) == "sin periodos cargados"
+
+
+def test_periodos_sin_esperar_los_cubos(tmp_path):
+    # El encabezado sale de las tablas ya cargadas: los cubos no se tocan.
+    obtenido, esperado = ejecutar(
+        "import datos, periodos\n"
+        "def sin_cubo():\n"
+        "    raise AssertionError('el encabezado no debe esperar a los cubos')\n"
+        "datos.cargar_cubo = datos.cargar_cubo_soporte = sin_cubo\n"
+        "mat, sup = datos.cargar_matriculas(), datos.cargar_soporte()\n"
+        "resultado = (datos.texto_periodos(), periodos.etiqueta(\n"
+        "    [*mat['semestre'].dropna().unique(), *sup['semestre'].dropna().unique()]\n"
+        "))",
+        tmp_path,
+    )
+    assert obtenido == esperado == "2024-1 y 2024-2"
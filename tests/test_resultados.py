@@ -0,0 +1,46 @@
+"""Cachés de resultados en memoria y en disco."""
+import pickle
+
+import pytest
+
+from resultados import CacheDisco, CacheLRU
+
+
+@pytest.fixture
+def disco(tmp_path, monkeypatch):
+    cache = CacheDisco(10 * 1024 * 1024)
+    monkeypatch.setattr(cache, "directorio", lambda: tmp_path)
+    return cache
+
+
+def test_lru_desaloja_la_menos_usada():
+    cache = CacheLRU(2)
+    cache.obtener("a", lambda: 1)
+    cache.obtener("b", lambda: 2)
+    cache.obtener("a", lambda: 0)
+    cache.obtener("c", lambda: 3)
+    assert cache.obtener("b", lambda: "nuevo") == "nuevo"
+    assert cache.estadisticas()["aciertos"] == 1
+
+
+def test_disco_guarda_y_lee(disco):
+    assert disco.obtener(("k", 1), lambda: {"x": 1}) == {"x": 1}
+    assert disco.obtener(("k", 1), lambda: pytest.fail("debió leerse del disco")) == {"x": 1}
+    assert disco.estadisticas()["aciertos"] == 1
+
+
+@pytest.mark.parametrize("contenido", [
+    b"",
+    b"no es un pickle",
+    pickle.dumps({"x": 1})[:-3],
+    b"cresultados\nClaseQueNoExiste\n.",  # clase que ya no existe (AttributeError)
+])
+def test_disco_recalcula_entradas_ilegibles(disco, contenido):
+    ruta = disco.ruta(("k", 1))
+    ruta.parent.mkdir(parents=True)
+    ruta.write_bytes(contenido)
+    assert disco.obtener(("k", 1), lambda: "recalculado") == "recalculado"
+    assert disco.estadisticas()["fallos"] == 1
+    # La entrada dañada se reemplazó por la recalculada.
+    with open(ruta, "rb") as archivo:
+        assert pickle.load(archivo) == "recalculado"